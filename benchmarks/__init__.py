@@ -0,0 +1 @@
+""" Stand-alone performance benchmarks, run with python -m benchmarks.<name> """
@@ -0,0 +1,70 @@
+""" Times the numpy analytics against a per entry python loop """
+import argparse
+import datetime
+from collections import defaultdict
+
+from benchmarks.utils import generate_entries, timed
+from clockpuncher.analytics import EntryArrays, daily_project_series, weekday_hour_heatmap
+from clockpuncher.models import EntryBatch
+
+
+def python_heatmap(entries):
+    """
+    Reference hour of day x weekday heatmap, walking each entry hour by hour
+    """
+    heatmap = [[0.0] * 24 for _ in range(7)]
+    for entry in entries:
+        current = entry.start_time
+        while current < entry.end_time:
+            next_hour = current.replace(minute=0, second=0, microsecond=0)
+            next_hour += datetime.timedelta(hours=1)
+            piece_end = min(next_hour, entry.end_time)
+            heatmap[current.weekday()][current.hour] += (
+                piece_end - current
+            ).total_seconds() / 3600
+            current = piece_end
+    return heatmap
+
+
+def python_daily_series(entries):
+    """
+    Reference per project daily hours, walking each entry day by day
+    """
+    series = defaultdict(lambda: defaultdict(float))
+    for entry in entries:
+        current = entry.start_time
+        while current < entry.end_time:
+            next_day = datetime.datetime.combine(current.date(), datetime.time.min)
+            next_day += datetime.timedelta(days=1)
+            piece_end = min(next_day, entry.end_time)
+            series[entry.project_name][current.date()] += (
+                piece_end - current
+            ).total_seconds() / 3600
+            current = piece_end
+    return series
+
+
+def run(rows: int) -> None:
+    """
+    Builds the heatmap and daily series both ways over rows generated entries
+    :param rows: Number of entries
+    """
+    entries = list(generate_entries(rows))
+    batch = EntryBatch.from_entries(entries)
+
+    with timed("python loop heatmap", rows):
+        python_heatmap(entries)
+    with timed("python loop daily series", rows):
+        python_daily_series(entries)
+    with timed("numpy arrays from EntryBatch", rows):
+        arrays = EntryArrays.from_batch(batch)
+    with timed("numpy heatmap", rows):
+        weekday_hour_heatmap(arrays)
+    with timed("numpy daily series", rows):
+        daily_project_series(arrays)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    run(parser.parse_args().rows)
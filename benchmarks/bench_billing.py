@@ -0,0 +1,36 @@
+""" Times compute_billing over years of generated history """
+import argparse
+
+from benchmarks.utils import PROJECT_NAMES, generate_entries, temporary_database, timed
+from clockpuncher.billing import compute_billing, total_billed
+from clockpuncher.models import Project
+
+
+def run(rows: int) -> None:
+    """
+    Loads rows back to back entries, roughly 4 years at the default, then bills them
+    :param rows: Number of entries to insert
+    """
+    with temporary_database() as db:
+        for frequency, project_name in enumerate(PROJECT_NAMES, start=1):
+            db.add_project(
+                Project(
+                    id=None,
+                    weekly_hour_allotment=20,
+                    monthly_frequency=frequency,
+                    rate=25 * frequency,
+                    client=f"client {frequency % 2}",
+                    project_name=project_name,
+                )
+            )
+        db.add_entries(generate_entries(rows))
+
+        with timed("compute_billing, all history", rows):
+            billing_lines = compute_billing(db)
+        print(f"{len(billing_lines):,} billing lines, {total_billed(billing_lines):,.2f} billed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=30_000)
+    run(parser.parse_args().rows)
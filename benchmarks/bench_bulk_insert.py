@@ -0,0 +1,31 @@
+""" Compares Database.add_entry against Database.add_entries batched inserts """
+import argparse
+
+from benchmarks.utils import generate_entries, temporary_database, timed
+
+
+def run(sizes, batch_size: int, single_insert_rows: int) -> None:
+    """
+    Runs the insert benchmark for every size in sizes
+    :param sizes: Row counts to bulk insert
+    :param batch_size: add_entries batch size
+    :param single_insert_rows: Rows to insert one by one as the baseline
+    """
+    with temporary_database() as db:
+        with timed("add_entry (one transaction per row)", single_insert_rows):
+            for entry in generate_entries(single_insert_rows):
+                db.add_entry(entry)
+
+    for size in sizes:
+        with temporary_database() as db:
+            with timed(f"add_entries (batch_size={batch_size})", size):
+                db.add_entries(generate_entries(size), batch_size=batch_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--single-insert-rows", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.sizes, args.batch_size, args.single_insert_rows)
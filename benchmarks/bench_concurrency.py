@@ -0,0 +1,128 @@
+""" Stress tests one sqlite file with writer and reader processes, reports throughput and p99 """
+import argparse
+import datetime
+import tempfile
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import List, Tuple
+
+from benchmarks.utils import generate_entries
+from clockpuncher.database import Database
+
+# (role, latencies in seconds, rows touched, errors)
+WorkerResult = Tuple[str, List[float], int, int]
+
+
+def writer(db_path: Path, seconds: float, batch: int, seed: int) -> WorkerResult:
+    """
+    Inserts batch entries per transaction until seconds have passed
+    :param db_path: Shared sqlite file
+    :param seconds: How long to run
+    :param batch: Entries per write transaction
+    :param seed: Keeps each writer's generated entries distinct
+    """
+    db = Database(db_path)
+    entries = generate_entries(10_000_000, datetime.datetime(2000 + seed, 1, 1), seed)
+    latencies, rows, errors = list(), 0, 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        chunk = [next(entries) for _ in range(batch)]
+        started = time.perf_counter()
+        try:
+            rows += db.add_entries(chunk, batch_size=batch)
+        except Exception:  # pylint: disable=broad-except
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    return "write", latencies, rows, errors
+
+
+def reader(db_path: Path, seconds: float, page_size: int, _seed: int) -> WorkerResult:
+    """
+    Reads the newest page of entries and the entry count until seconds have passed
+    :param db_path: Shared sqlite file
+    :param seconds: How long to run
+    :param page_size: Entries per page read
+    """
+    db = Database(db_path)
+    latencies, rows, errors = list(), 0, 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            rows += len(db.get_entries_page(page_size))
+            db.count_entries()
+        except Exception:  # pylint: disable=broad-except
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    return "read", latencies, rows, errors
+
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    """
+    Nearest rank percentile, 0 for no samples
+    """
+    if not latencies:
+        return 0.0
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(writers: int, readers: int, seconds: float, batch: int, page_size: int) -> None:
+    """
+    Runs writers and readers against a fresh database at the same time
+    :param writers: Writer processes
+    :param readers: Reader processes
+    :param seconds: How long each process runs
+    :param batch: Entries per write transaction
+    :param page_size: Entries per read
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = Path(directory) / "benchmark.db"
+        # Create the schema once up front rather than racing it from every worker
+        Database(db_path)
+        jobs = [(writer, batch, seed) for seed in range(writers)]
+        jobs += [(reader, page_size, seed) for seed in range(readers)]
+        with Pool(len(jobs)) as pool:
+            results = pool.starmap(
+                _run_job, [(job, db_path, seconds, size, seed) for job, size, seed in jobs]
+            )
+
+    for role in ("write", "read"):
+        latencies = [
+            latency for name, samples, _, _ in results if name == role for latency in samples
+        ]
+        rows = sum(rows for name, _, rows, _ in results if name == role)
+        errors = sum(errors for name, _, _, errors in results if name == role)
+        print(
+            f"{role:<6} {len(latencies) / seconds:>9,.0f} tx/s {rows / seconds:>10,.0f} rows/s"
+            f"  p50 {percentile(latencies, 0.50) * 1000:>7.2f}ms"
+            f"  p99 {percentile(latencies, 0.99) * 1000:>7.2f}ms"
+            f"  max {max(latencies, default=0) * 1000:>7.2f}ms  errors {errors}"
+        )
+
+
+def _run_job(job, db_path: Path, seconds: float, size: int, seed: int) -> WorkerResult:
+    """
+    Pool.starmap target, module level so it pickles
+    """
+    return job(db_path, seconds, size, seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--batch", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=50)
+    arguments = parser.parse_args()
+    run(
+        arguments.writers,
+        arguments.readers,
+        arguments.seconds,
+        arguments.batch,
+        arguments.page_size,
+    )
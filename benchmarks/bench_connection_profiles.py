@@ -0,0 +1,46 @@
+""" Insert and range query throughput under each connection profile """
+import argparse
+import datetime
+from pathlib import Path
+
+from benchmarks.utils import generate_entries, temporary_database, timed
+from clockpuncher.connection_profiles import CONNECTION_PROFILES
+from clockpuncher.database import Database
+
+
+def run(rows: int, batch_size: int, queries: int) -> None:
+    """
+    Inserts rows with add_entry and add_entries, then runs one day range queries
+    :param rows: Entries to bulk insert per profile
+    :param batch_size: add_entries batch size
+    :param queries: Number of one day get_entries_between calls
+    """
+    for profile in CONNECTION_PROFILES:
+        print(f"--- {profile}")
+        with temporary_database() as seed_db:
+            db_path = Path(seed_db.db.engine.url.database)
+            if profile == "readonly-analytics":
+                seed_db.add_entries(generate_entries(rows), batch_size=batch_size)
+            else:
+                db = Database(db_path, profile=profile)
+                with timed("add_entry", 1000):
+                    for entry in generate_entries(1000, seed=1):
+                        db.add_entry(entry)
+                with timed(f"add_entries (batch_size={batch_size})", rows):
+                    db.add_entries(generate_entries(rows), batch_size=batch_size)
+
+            db = Database(db_path, profile=profile, read_engine="sqlite3")
+            day = datetime.datetime(2018, 2, 1)
+            with timed("get_entries_between (one day)", queries):
+                for _ in range(queries):
+                    db.get_entries_between(day, day + datetime.timedelta(days=1))
+                    day += datetime.timedelta(days=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.rows, args.batch_size, args.queries)
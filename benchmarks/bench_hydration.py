@@ -0,0 +1,42 @@
+""" Times building Entry objects from database style rows, validated and trusted """
+import argparse
+import datetime
+
+from benchmarks.utils import timed
+from clockpuncher.models import Entry
+
+
+def run(rows: int) -> None:
+    """
+    Hydrates rows dicts with datetime and text timestamps through both constructors
+    :param rows: Number of rows to hydrate
+    """
+    start = datetime.datetime(2021, 1, 1)
+    datetime_rows = [
+        dict(
+            id=idx,
+            project_name="project",
+            description="description",
+            start_time=start,
+            end_time=start + datetime.timedelta(minutes=idx),
+        )
+        for idx in range(rows)
+    ]
+    text_rows = [
+        {**row, "start_time": str(row["start_time"]), "end_time": str(row["end_time"])}
+        for row in datetime_rows
+    ]
+
+    for label, source_rows in (("datetime", datetime_rows), ("text", text_rows)):
+        with timed(f"Entry(**row), {label} timestamps", rows):
+            for row in source_rows:
+                Entry(**row)
+        with timed(f"Entry._from_row, {label} timestamps", rows):
+            for row in source_rows:
+                Entry._from_row(row)  # pylint: disable=protected-access
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    run(parser.parse_args().rows)
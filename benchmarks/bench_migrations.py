@@ -0,0 +1,74 @@
+""" Times opening a timer.db made before schema_version, which rebuilds its tables """
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import dataset
+
+from benchmarks.utils import generate_entries, timed
+from clockpuncher.database import Database
+from clockpuncher.migrations import BACKFILL_CHUNK_SIZE
+
+
+def seed_legacy_database(db_path: Path, rows: int) -> None:
+    """
+    Writes rows entries the way older versions did, into tables dataset inferred
+    :param db_path: File to create
+    :param rows: Number of entries to seed
+    """
+    entries = generate_entries(rows)
+    legacy = dataset.connect(f"sqlite:///{db_path}")
+    legacy["entries"].insert(next(entries).to_dict())
+    legacy.engine.dispose()
+    connection = sqlite3.connect(db_path)
+    connection.executemany(
+        "INSERT INTO entries (project_name, description, start_time, end_time) "
+        "VALUES (?, ?, ?, ?)",
+        (
+            (entry.project_name, entry.description, str(entry.start_time), str(entry.end_time))
+            for entry in entries
+        ),
+    )
+    connection.commit()
+    connection.close()
+
+
+def run(rows: int) -> None:
+    """
+    Upgrades a seeded legacy database and reports the longest write transaction, which is
+    how long other processes, e.g. a running GUI, wait on the write lock
+    :param rows: Number of entries to seed
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = Path(directory) / "benchmark.db"
+        seed_legacy_database(db_path, rows)
+        size_before = db_path.stat().st_size
+        chunk_times = list()
+        last = time.perf_counter()
+
+        def progress(_description: str, _done: int, _total: int) -> None:
+            nonlocal last
+            chunk_times.append(time.perf_counter() - last)
+            last = time.perf_counter()
+
+        with timed(f"migrate, {BACKFILL_CHUNK_SIZE:,} row chunks", rows):
+            db = Database(db_path, migration_progress=progress)
+        # The longest spans the table swap and the index builds, one transaction each
+        print(f"{'median time between chunks':<40} {statistics.median(chunk_times):>30.3f}s")
+        print(f"{'longest time between chunks':<40} {max(chunk_times):>30.3f}s")
+        print(
+            f"{'file size before/after':<40} "
+            f"{size_before / 2 ** 20:>14.1f} / {db_path.stat().st_size / 2 ** 20:.1f} MiB"
+        )
+        with timed("backfill_daily_rollup, one transaction", rows):
+            db.backfill_daily_rollup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    arguments = parser.parse_args()
+    run(arguments.rows)
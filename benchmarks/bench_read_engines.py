@@ -0,0 +1,41 @@
+""" Compares rows per second of the dataset and sqlite3 read engines on the hot queries """
+import argparse
+import datetime
+from pathlib import Path
+
+from benchmarks.utils import generate_entries, temporary_database, timed
+from clockpuncher.database import Database
+
+
+def run(rows: int) -> None:
+    """
+    Seeds a database with rows entries and times each hot read on both engines
+    :param rows: Number of entries to seed
+    """
+    with temporary_database() as db:
+        db.add_entries(generate_entries(rows), batch_size=10_000)
+        window_start = datetime.datetime(2018, 6, 1)
+        window_end = datetime.datetime(2019, 6, 1)
+
+        for read_engine in ("dataset", "sqlite3"):
+            engine_db = Database(Path(db.db.engine.url.database), read_engine=read_engine)
+            with timed(f"{read_engine}: get_all_entries", rows):
+                engine_db.get_all_entries(eager_loading=True)
+
+            matched = len(engine_db.get_multi_entries(True, project_name="Admin"))
+            with timed(f"{read_engine}: get_multi_entries", matched):
+                engine_db.get_multi_entries(True, project_name="Admin")
+
+            in_window = engine_db.get_entries_between(window_start, window_end)
+            with timed(f"{read_engine}: get_entries_between", len(in_window)):
+                engine_db.get_entries_between(window_start, window_end)
+
+            with timed(f"{read_engine}: get_project_names x1000", 1000):
+                for _ in range(1000):
+                    engine_db.get_project_names()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    run(parser.parse_args().rows)
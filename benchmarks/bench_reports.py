@@ -0,0 +1,31 @@
+""" Times ReportRunner in process against the process pool over monthly partitions """
+import argparse
+import os
+
+from benchmarks.utils import generate_entries, temporary_database, timed
+from clockpuncher.reports import ReportRunner
+
+
+def run(rows: int, workers: int) -> None:
+    """
+    Loads rows generated entries then runs the report both ways
+    :param rows: Number of entries to insert
+    :param workers: Worker processes for the parallel run
+    """
+    with temporary_database() as db:
+        db.add_entries(generate_entries(rows))
+        runner = ReportRunner(db, max_workers=workers)
+
+        with timed("report, in process", rows):
+            in_process = runner.run(parallel=False)
+        with timed(f"report, {workers} worker processes", rows):
+            parallel = runner.run(parallel=True)
+        assert parallel == in_process, "parallel report differs from in process"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    arguments = parser.parse_args()
+    run(arguments.rows, arguments.workers)
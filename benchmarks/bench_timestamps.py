@@ -0,0 +1,51 @@
+""" Times the text to epoch timestamp migration and the hot reads in both storage modes """
+import argparse
+import datetime
+from pathlib import Path
+
+from benchmarks.utils import generate_entries, temporary_database, timed
+from clockpuncher.database import Database
+
+
+def time_reads(db: Database, rows: int) -> None:
+    """
+    Times the range reads and aggregates that compare or subtract timestamps
+    :param db: Seeded database
+    :param rows: Number of entries seeded
+    """
+    mode = db.timestamps.mode
+    window_start = datetime.datetime(2018, 6, 1)
+    window_end = datetime.datetime(2019, 6, 1)
+    with timed(f"{mode}: get_all_entries", rows):
+        db.get_all_entries(eager_loading=True)
+    in_window = db.count_entries(window_start, window_end)
+    with timed(f"{mode}: get_entries_between", in_window):
+        db.get_entries_between(window_start, window_end)
+    with timed(f"{mode}: count_entries x100", in_window * 100):
+        for _ in range(100):
+            db.count_entries(window_start, window_end)
+    with timed(f"{mode}: project_duration_totals x10", rows * 10):
+        for _ in range(10):
+            db.project_duration_totals()
+
+
+def run(rows: int, chunk_size: int) -> None:
+    """
+    Seeds a text database, times reads, migrates it and times the same reads again
+    :param rows: Number of entries to seed
+    :param chunk_size: Rows copied per migration transaction
+    """
+    with temporary_database() as db:
+        db.add_entries(generate_entries(rows), batch_size=10_000)
+        time_reads(db, rows)
+        with timed(f"migrate_timestamps, {chunk_size:,} row chunks", rows):
+            db.migrate_timestamps(chunk_size=chunk_size)
+        time_reads(Database(Path(db.db.engine.url.database)), rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    arguments = parser.parse_args()
+    run(arguments.rows, arguments.chunk_size)
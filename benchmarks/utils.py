@@ -0,0 +1,61 @@
+""" Contains helpers shared between benchmark scripts """
+import datetime
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from clockpuncher.database import Database
+from clockpuncher.models import Entry
+
+PROJECT_NAMES = ["Side Gig", "That Big Money Gig", "Open Source", "Admin", ""]
+
+
+def generate_entries(
+    count: int, start: datetime.datetime = datetime.datetime(2018, 1, 1), seed: int = 0
+) -> Iterator[Entry]:
+    """
+    Lazily generates count back to back entries starting at start
+    :param count: Number of entries to generate
+    :param start: First entry start_time
+    :param seed: Random seed so runs are comparable
+    :return: Generator of Entry
+    """
+    rng = random.Random(seed)
+    current = start
+    for idx in range(count):
+        duration = datetime.timedelta(seconds=rng.randint(60, 3 * 60 * 60))
+        yield Entry(
+            id=None,
+            project_name=rng.choice(PROJECT_NAMES),
+            description=f"task {idx % 500}",
+            start_time=current,
+            end_time=current + duration,
+        )
+        current += duration + datetime.timedelta(seconds=rng.randint(0, 600))
+
+
+@contextmanager
+def temporary_database(**kwargs) -> Iterator[Database]:
+    """
+    Creates a Database in a temporary directory that is removed afterwards
+    :param kwargs: Extra Database keyword arguments
+    :return: Database instance
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        yield Database(Path(directory) / "benchmark.db", **kwargs)
+
+
+@contextmanager
+def timed(label: str, rows: int) -> Iterator[None]:
+    """
+    Prints wall time and rows per second for the wrapped block
+    :param label: Name printed in the report line
+    :param rows: Number of rows processed in the block
+    """
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {rows:>10,} rows {elapsed:>9.3f}s {rows / elapsed:>12,.0f} rows/s")
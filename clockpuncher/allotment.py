@@ -0,0 +1,196 @@
+""" Contains a rolling weekly hour allotment tracker """
+import datetime
+from collections import defaultdict
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from clockpuncher.models import Entry, Project
+
+WINDOWS = (4, 12, 52)
+_ONE_WEEK = datetime.timedelta(weeks=1)
+
+
+def week_of(day: datetime.date) -> datetime.date:
+    """
+    Monday of day's ISO week
+    """
+    return day - datetime.timedelta(days=day.weekday())
+
+
+class AllotmentStatus(NamedTuple):
+    """
+    Hours used against Project.weekly_hour_allotment for display
+    """
+
+    project_name: str
+    allotment_hours: int
+    week_hours: float
+    window_hours: Dict[int, float]
+
+    def utilisation(self, weeks: Optional[int] = None) -> Optional[float]:
+        """
+        Fraction of the allotment used
+        :param weeks: Trailing window length, None for the current week
+        :return: 1.0 means exactly on allotment, None if the project has no allotment
+        """
+        if not self.allotment_hours:
+            return None
+        if weeks is None:
+            return self.week_hours / self.allotment_hours
+        return self.window_hours[weeks] / (weeks * self.allotment_hours)
+
+
+class AllotmentTracker:
+    """
+    Per project weekly buckets of tracked seconds with running trailing window sums.
+
+    Entries count towards the week they started in, like the daily_rollup table. Each window
+    covers the current week plus the weeks before it. Adding an entry updates the bucket and
+    the window sums it falls in, and moving into a new week adds the new week's bucket and
+    evicts the one that dropped out of each window, so nothing is rescanned per render.
+    """
+
+    def __init__(
+        self,
+        projects: Iterable[Project] = (),
+        today: Optional[datetime.date] = None,
+        windows: Tuple[int, ...] = WINDOWS,
+    ):
+        """
+        :param projects: Projects to read weekly_hour_allotment from
+        :param today: Current day, defaults to today
+        :param windows: Trailing window lengths in weeks
+        """
+        self.windows = tuple(sorted(windows))
+        self.allotments: Dict[str, int] = dict()
+        for project in projects:
+            self.set_project(project)
+        self.current_week = week_of(today or datetime.date.today())
+        self.buckets: Dict[str, Dict[datetime.date, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self.window_sums: Dict[str, Dict[int, float]] = defaultdict(
+            lambda: dict.fromkeys(self.windows, 0.0)
+        )
+
+    @property
+    def oldest_week(self) -> datetime.date:
+        """
+        First week still inside the longest window, older buckets are dropped
+        """
+        return self.current_week - (self.windows[-1] - 1) * _ONE_WEEK
+
+    def set_project(self, project: Project) -> None:
+        """
+        Adds or updates a project's weekly allotment
+        :param project: Project to track
+        """
+        self.allotments[project.project_name] = project.weekly_hour_allotment
+
+    def add_seconds(self, project_name: str, day: datetime.date, seconds: float) -> None:
+        """
+        Credits seconds to the week containing day
+        :param project_name: Project the time belongs to
+        :param day: Day the time started on
+        :param seconds: Tracked seconds
+        """
+        week = week_of(day)
+        if week < self.oldest_week:
+            return
+        self.buckets[project_name][week] += seconds
+        if week > self.current_week:
+            return
+        weeks_back = (self.current_week - week).days // 7
+        sums = self.window_sums[project_name]
+        for window in self.windows:
+            if weeks_back < window:
+                sums[window] += seconds
+
+    def add(self, entry: Entry) -> None:
+        """
+        Credits a saved entry, call for every new entry
+        :param entry: Entry to add
+        """
+        self.add_seconds(
+            entry.project_name,
+            entry.start_time.date(),
+            (entry.end_time - entry.start_time).total_seconds(),
+        )
+
+    def remove(self, entry: Entry) -> None:
+        """
+        Takes back an entry credited with add, e.g. one edited or deleted elsewhere
+        :param entry: Entry as it was added
+        """
+        self.add_seconds(
+            entry.project_name,
+            entry.start_time.date(),
+            (entry.start_time - entry.end_time).total_seconds(),
+        )
+
+    def seed(self, daily_totals: Iterable[Tuple[datetime.date, str, float, int]]) -> None:
+        """
+        Loads history from Database.get_daily_totals rows
+        :param daily_totals: (day, project_name, total_seconds, entry_count) rows
+        """
+        for day, project_name, seconds, _count in daily_totals:
+            self.add_seconds(project_name, day, seconds)
+
+    def advance(self, today: Optional[datetime.date] = None) -> None:
+        """
+        Moves the windows forward one week at a time until they end on today's week
+        :param today: Current day, defaults to today
+        """
+        target_week = week_of(today or datetime.date.today())
+        if target_week <= self.current_week:
+            return
+        if (target_week - self.current_week).days // 7 >= self.windows[-1]:
+            # Every bucket falls out of every window
+            self.buckets.clear()
+            self.window_sums.clear()
+            self.current_week = target_week
+            return
+
+        while self.current_week < target_week:
+            self.current_week += _ONE_WEEK
+            for project_name, buckets in self.buckets.items():
+                sums = self.window_sums[project_name]
+                entering = buckets.get(self.current_week, 0.0)
+                for window in self.windows:
+                    leaving = buckets.get(self.current_week - window * _ONE_WEEK, 0.0)
+                    sums[window] += entering - leaving
+            oldest_week = self.oldest_week
+            for buckets in self.buckets.values():
+                for week in [week for week in buckets if week < oldest_week]:
+                    del buckets[week]
+
+    def status(
+        self,
+        project_name: str,
+        running_seconds: float = 0.0,
+        today: Optional[datetime.date] = None,
+    ) -> AllotmentStatus:
+        """
+        Hours used this week and in each trailing window
+        :param project_name: Project to report
+        :param running_seconds: Seconds on the running timer to include, not yet saved
+        :param today: Current day, defaults to today
+        :return: AllotmentStatus in hours
+        """
+        self.advance(today)
+        week_seconds = self.buckets.get(project_name, {}).get(self.current_week, 0.0)
+        sums = self.window_sums.get(project_name, dict.fromkeys(self.windows, 0.0))
+        return AllotmentStatus(
+            project_name=project_name,
+            allotment_hours=self.allotments.get(project_name, 0),
+            week_hours=(week_seconds + running_seconds) / 3600,
+            window_hours={
+                window: (seconds + running_seconds) / 3600
+                for window, seconds in sums.items()
+            },
+        )
+
+    def project_names(self):
+        """
+        Projects with an allotment or any tracked time inside the longest window
+        """
+        return sorted(set(self.allotments) | set(self.buckets))
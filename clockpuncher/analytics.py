@@ -0,0 +1,223 @@
+""" Contains vectorised time analytics over entries, requires the optional numpy extra """
+import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from clockpuncher.database import Database
+from clockpuncher.models import Entry, EntryBatch
+from clockpuncher.timestamps import utc_us_to_datetime
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+HOUR_US = 3600 * 1_000_000
+DAY_US = 24 * HOUR_US
+# 1970-01-01, day 0 of the epoch, was a Thursday
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_WEEKDAY = 3
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+# Session length histogram bin edges in minutes, the last bin is open ended
+SESSION_BINS = (0, 5, 15, 30, 60, 120, 240, 480)
+
+
+def _require_numpy() -> None:
+    """
+    Raises a helpful ImportError when numpy is not installed
+    """
+    if np is None:
+        raise ImportError(
+            "clockpuncher.analytics needs numpy, "
+            "install it with pip install clockpuncher[analytics]"
+        )
+
+
+def _utc_offset_us(hour: int) -> int:
+    """
+    Local UTC offset in microseconds during an hour
+    :param hour: Hours since 1970-01-01 UTC
+    """
+    wall_clock = utc_us_to_datetime(hour * HOUR_US) - _EPOCH
+    return wall_clock // datetime.timedelta(microseconds=1) - hour * HOUR_US
+
+
+def wall_clock_us(utc_us: "np.ndarray") -> "np.ndarray":
+    """
+    Epoch microseconds, as EntryBatch holds them, to local wall clock microseconds since
+    1970-01-01 for bucketing by hour, weekday and calendar day. The UTC offset is looked up
+    once per distinct hour, offsets only change on hour boundaries in practice.
+    :param utc_us: int64 microseconds since 1970-01-01 UTC
+    :return: int64 wall clock microseconds
+    """
+    _require_numpy()
+    hours, positions = np.unique(utc_us // HOUR_US, return_inverse=True)
+    offsets = np.array([_utc_offset_us(int(hour)) for hour in hours], dtype=np.int64)
+    return utc_us + offsets[positions]
+
+
+class EntryArrays(NamedTuple):
+    """
+    Entries as parallel numpy arrays. Times are int64 wall clock microseconds since
+    1970-01-01, use starts/ends for datetime64 views.
+    """
+
+    start_us: "np.ndarray"
+    end_us: "np.ndarray"
+    project_codes: "np.ndarray"
+    projects: List[str]
+
+    @classmethod
+    def from_batch(cls, batch: EntryBatch) -> "EntryArrays":
+        """
+        Copies EntryBatch columns into arrays, times converted to wall clock. A zero copy
+        view would pin the batch's array('q') buffers and make its next extend raise
+        BufferError.
+        :param batch: Columnar batch, e.g. from Database.get_entry_batch
+        """
+        _require_numpy()
+        if not len(batch):
+            empty = np.zeros(0, dtype=np.int64)
+            return cls(empty, empty, empty, list(batch.projects))
+        start_us = wall_clock_us(np.array(batch.start_us, dtype=np.int64))
+        # Entries with end before start count as zero length
+        end_us = np.maximum(wall_clock_us(np.array(batch.end_us, dtype=np.int64)), start_us)
+        return cls(
+            start_us,
+            end_us,
+            np.array(batch.project_codes, dtype=np.int64),
+            list(batch.projects),
+        )
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Entry]) -> "EntryArrays":
+        """
+        Builds arrays from an existing list of entries
+        :param entries: Entries, e.g. ClockPuncher.entries
+        """
+        return cls.from_batch(EntryBatch.from_entries(entries))
+
+    @classmethod
+    def from_database(
+        cls,
+        db: Database,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        project: Optional[str] = None,
+    ) -> "EntryArrays":
+        """
+        Loads entries with start <= start_time < end straight into arrays
+        :param db: Database to read
+        :param start: Inclusive lower bound, None for no lower bound
+        :param end: Exclusive upper bound, None for no upper bound
+        :param project: Only load this project
+        """
+        return cls.from_batch(db.get_entry_batch(start, end, project))
+
+    @property
+    def starts(self) -> "np.ndarray":
+        """
+        start times as datetime64[us]
+        """
+        return self.start_us.view("datetime64[us]")
+
+    @property
+    def ends(self) -> "np.ndarray":
+        """
+        end times as datetime64[us]
+        """
+        return self.end_us.view("datetime64[us]")
+
+    @property
+    def durations_s(self) -> "np.ndarray":
+        """
+        Entry durations in seconds as float64
+        """
+        return (self.end_us - self.start_us) / 1e6
+
+
+def split_intervals(
+    start_us: "np.ndarray", end_us: "np.ndarray", bucket_us: int
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Splits [start, end) intervals at every multiple of bucket_us without a python loop.
+    An entry from 9:40 to 11:10 split by hour becomes 20, 60 and 10 minute pieces.
+    :param start_us: int64 interval starts
+    :param end_us: int64 interval ends, at or after start_us
+    :param bucket_us: Bucket width, e.g. HOUR_US or DAY_US
+    :return: (entry_positions, bucket_numbers, seconds) arrays with one element per piece,
+        bucket_numbers count bucket_us widths since the epoch
+    """
+    _require_numpy()
+    first_bucket = start_us // bucket_us
+    # An interval ending exactly on a boundary doesn't spill into the next bucket
+    last_bucket = np.maximum((end_us - 1) // bucket_us, first_bucket)
+    piece_counts = last_bucket - first_bucket + 1
+
+    entry_positions = np.repeat(np.arange(len(start_us)), piece_counts)
+    piece_offsets = np.arange(len(entry_positions)) - np.repeat(
+        np.cumsum(piece_counts) - piece_counts, piece_counts
+    )
+    bucket_numbers = first_bucket[entry_positions] + piece_offsets
+    piece_starts = np.maximum(start_us[entry_positions], bucket_numbers * bucket_us)
+    piece_ends = np.minimum(end_us[entry_positions], (bucket_numbers + 1) * bucket_us)
+    return entry_positions, bucket_numbers, (piece_ends - piece_starts) / 1e6
+
+
+def weekday_hour_heatmap(arrays: EntryArrays) -> "np.ndarray":
+    """
+    Hours tracked in each hour of the day for each weekday, entries are split at hour
+    boundaries so a 9:40 to 11:10 entry adds to the 9, 10 and 11 o'clock cells
+    :param arrays: Entries to summarise
+    :return: 7 x 24 float array of hours, rows Monday to Sunday, columns hour of day
+    """
+    _, hour_numbers, seconds = split_intervals(arrays.start_us, arrays.end_us, HOUR_US)
+    weekdays = (hour_numbers // 24 + _EPOCH_WEEKDAY) % 7
+    cells = weekdays * 24 + hour_numbers % 24
+    return np.bincount(cells, weights=seconds, minlength=7 * 24).reshape(7, 24) / 3600
+
+
+def session_length_histogram(
+    arrays: EntryArrays, bins: Sequence[float] = SESSION_BINS
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Counts entries by duration
+    :param arrays: Entries to summarise
+    :param bins: Ascending bin edges in minutes
+    :return: (counts, edges), counts[i] is the number of entries lasting edges[i] to
+        edges[i + 1] minutes, the last count is open ended
+    """
+    _require_numpy()
+    edges = np.asarray(bins, dtype=np.float64)
+    minutes = arrays.durations_s / 60
+    positions = np.searchsorted(edges, minutes, side="right") - 1
+    counts = np.bincount(np.clip(positions, 0, len(edges) - 1), minlength=len(edges))
+    return counts, edges
+
+
+def daily_project_series(
+    arrays: EntryArrays,
+) -> Tuple["np.ndarray", Dict[str, "np.ndarray"]]:
+    """
+    Hours per project per calendar day, entries are split at midnight
+    :param arrays: Entries to summarise
+    :return: (days, series) where days is a datetime64[D] array covering first to last day
+        and series maps project name to an hours array aligned with days
+    """
+    positions, day_numbers, seconds = split_intervals(
+        arrays.start_us, arrays.end_us, DAY_US
+    )
+    if not len(day_numbers):
+        return np.zeros(0, dtype="datetime64[D]"), dict()
+    first_day = day_numbers.min()
+    day_count = int(day_numbers.max() - first_day + 1)
+    cells = arrays.project_codes[positions] * day_count + (day_numbers - first_day)
+    hours = np.bincount(
+        cells, weights=seconds, minlength=len(arrays.projects) * day_count
+    ).reshape(len(arrays.projects), day_count) / 3600
+    days = (first_day + np.arange(day_count)).astype("datetime64[D]")
+    present = np.bincount(arrays.project_codes, minlength=len(arrays.projects)) > 0
+    return days, {
+        project: hours[code]
+        for code, project in enumerate(arrays.projects)
+        if present[code]
+    }
@@ -0,0 +1,175 @@
+""" Contains billing calculations from the daily rollup and project rates """
+import csv
+import datetime
+from collections import defaultdict
+from typing import IO, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from clockpuncher.database import Database
+from clockpuncher.models import Project
+from clockpuncher.time_index import pay_period_bounds
+
+DEFAULT_MONTHLY_FREQUENCY = 2
+
+Period = Tuple[datetime.date, datetime.date]
+
+
+class BillingLine(NamedTuple):
+    """
+    Billed time for one project in one pay period
+    """
+
+    project_name: str
+    client: str
+    period_start: datetime.date
+    period_end: datetime.date
+    seconds: float
+    entry_count: int
+    rate: int
+    amount: float
+
+    @property
+    def hours(self) -> float:
+        """
+        Billed hours, seconds / 3600
+        """
+        return self.seconds / 3600
+
+
+def pay_period_of_day(day: datetime.date, monthly_frequency: int) -> Period:
+    """
+    Half-open pay period containing day, see time_index.pay_period_bounds
+    :param day: Day to bucket
+    :param monthly_frequency: Project.monthly_frequency, values below 1 use the default
+    :return: (period_start, period_end) dates
+    """
+    if monthly_frequency < 1:
+        monthly_frequency = DEFAULT_MONTHLY_FREQUENCY
+    start, end = pay_period_bounds(
+        datetime.datetime.combine(day, datetime.time.min), monthly_frequency
+    )
+    return start.date(), end.date()
+
+
+def price_period(
+    project_name: str,
+    period: Period,
+    seconds: float,
+    entry_count: int,
+    projects_by_name: Dict[str, Project],
+) -> BillingLine:
+    """
+    Prices one project's time in one pay period
+    :param project_name: Project the time belongs to
+    :param period: (period_start, period_end) dates
+    :param seconds: Tracked seconds in the period
+    :param entry_count: Entries in the period
+    :param projects_by_name: Projects to take rate and client from, unknown names bill at 0
+    :return: BillingLine
+    """
+    project = projects_by_name.get(project_name)
+    rate = project.rate if project else 0
+    return BillingLine(
+        project_name=project_name,
+        client=project.client if project else "",
+        period_start=period[0],
+        period_end=period[1],
+        seconds=seconds,
+        entry_count=entry_count,
+        rate=rate,
+        amount=round(seconds / 3600 * rate, 2),
+    )
+
+
+def compute_billing(
+    db: Database,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    projects: Optional[Iterable[Project]] = None,
+) -> List[BillingLine]:
+    """
+    Buckets billed time into pay periods per project.
+
+    Durations are summed per day by the daily_rollup table, so this loops over one row per
+    day and project rather than per entry and years of history take milliseconds. Entries
+    count towards the day, and so the pay period, they started in. Projects without a
+    Project row are billed at a rate of 0 with the default pay frequency.
+    :param db: Database to read the rollup and projects from
+    :param start: Inclusive first day, None for unbounded
+    :param end: Exclusive last day, None for unbounded
+    :param projects: Projects to take rates from, defaults to every project in db
+    :return: BillingLines ordered by period_start then project_name
+    """
+    if projects is None:
+        projects = db.get_all_projects(eager_loading=True)
+    projects_by_name: Dict[str, Project] = {
+        project.project_name: project for project in projects
+    }
+
+    period_cache: Dict[Tuple[datetime.date, int], Period] = dict()
+    totals: Dict[Tuple[str, datetime.date, datetime.date], List] = defaultdict(
+        lambda: [0.0, 0]
+    )
+    for day, project_name, seconds, entry_count in db.get_daily_totals(start, end):
+        project = projects_by_name.get(project_name)
+        frequency = (
+            project.monthly_frequency if project else DEFAULT_MONTHLY_FREQUENCY
+        )
+        period = period_cache.get((day, frequency))
+        if period is None:
+            period = period_cache[(day, frequency)] = pay_period_of_day(day, frequency)
+        project_totals = totals[(project_name, *period)]
+        project_totals[0] += seconds
+        project_totals[1] += entry_count
+
+    billing_lines = [
+        price_period(project_name, period, seconds, count, projects_by_name)
+        for (project_name, *period), (seconds, count) in totals.items()
+    ]
+    billing_lines.sort(key=lambda line: (line.period_start, line.project_name))
+    return billing_lines
+
+
+def total_billed(billing_lines: Iterable[BillingLine]) -> float:
+    """
+    Sum of billed amounts
+    """
+    return round(sum(line.amount for line in billing_lines), 2)
+
+
+def totals_by(
+    billing_lines: Iterable[BillingLine], field: str = "project_name"
+) -> Dict[str, float]:
+    """
+    Sums billed amounts grouped on a BillingLine field
+    :param billing_lines: Lines from compute_billing
+    :param field: Field to group on, e.g. project_name, client or period_start
+    :return: Dict of field value to billed amount
+    """
+    grouped = defaultdict(float)
+    for line in billing_lines:
+        grouped[getattr(line, field)] += line.amount
+    return {key: round(amount, 2) for key, amount in grouped.items()}
+
+
+def write_csv(billing_lines: Iterable[BillingLine], file: IO[str]) -> None:
+    """
+    Writes billing lines as CSV with a header row, for invoices or spreadsheets
+    :param billing_lines: Lines from compute_billing
+    :param file: Open text file, use newline="" when opening
+    """
+    writer = csv.writer(file)
+    writer.writerow([*BillingLine._fields[:5], "hours", *BillingLine._fields[5:]])
+    for line in billing_lines:
+        writer.writerow(
+            [
+                line.project_name,
+                line.client,
+                line.period_start.isoformat(),
+                line.period_end.isoformat(),
+                round(line.seconds, 3),
+                round(line.hours, 4),
+                line.entry_count,
+                line.rate,
+                line.amount,
+            ]
+        )
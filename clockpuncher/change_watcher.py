@@ -0,0 +1,156 @@
+""" Contains a watcher that notices other processes writing to the database """
+import datetime
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from clockpuncher.connection_profiles import CONNECTION_PROFILES
+from clockpuncher.models import Entry
+from clockpuncher.sqlite_reader import SQLiteReader
+from clockpuncher.timestamps import utc_us_to_datetime
+
+
+class ExternalChanges(NamedTuple):
+    """
+    What changed since the last poll
+    """
+
+    new_entries: List[Entry]
+    # Edits reached further back than entry_edit_log keeps, everything has to be reloaded
+    reload: bool
+    # Edited or deleted entry id -> its start_time before the first edit, None for ids
+    # an UPDATE moved a row to. Only ids up to the last seen id, the rest are new_entries.
+    edited: Dict[int, Optional[datetime.datetime]]
+    # Current rows of the edited ids, deleted ones are missing
+    edited_entries: List[Entry]
+
+
+def _stored_time(value) -> Optional[datetime.datetime]:
+    """
+    datetime from a start_time logged in either storage mode
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return utc_us_to_datetime(value)
+    return datetime.datetime.fromisoformat(value)
+
+
+class ChangeWatcher:
+    """
+    Polls PRAGMA data_version on a dedicated read-only connection.
+
+    data_version only moves when some other connection commits, so an unchanged value
+    costs one pragma call. On a change, rows with id above the last seen id are read as new
+    entries. Updates and deletes are logged by triggers in entry_edit_log, the edited rows
+    are read again by id. Commits from this app's own writer also move data_version,
+    callers drop entries they already hold by id.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param db_path: sqlite file path, the same file the Database uses
+        :param interval: Min seconds between checks
+        :param clock: Monotonic clock, swappable for testing
+        """
+        self.reader = SQLiteReader(
+            db_path, CONNECTION_PROFILES["readonly-analytics"], read_only=True
+        )
+        self.interval = interval
+        self.clock = clock
+        self.next_check = clock()
+        self.data_version = self._data_version()
+        self.last_seen_id = self._max_id()
+        self.last_edit = self._edit_bounds()[1]
+
+    def _data_version(self) -> int:
+        """
+        Counter sqlite bumps when another connection commits
+        """
+        return self.reader.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def _max_id(self) -> int:
+        """
+        Highest entry id, 0 for an empty table
+        """
+        return self.reader.connection.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM entries"
+        ).fetchone()[0]
+
+    def _edit_bounds(self) -> Tuple[int, int]:
+        """
+        Oldest and newest entry_edit_log seq still kept, (0, 0) while it is empty
+        """
+        return self.reader.connection.execute(
+            "SELECT COALESCE(MIN(seq), 0), COALESCE(MAX(seq), 0) FROM entry_edit_log"
+        ).fetchone()
+
+    def _edits(self, last_id: int) -> Dict[int, Optional[datetime.datetime]]:
+        """
+        Entries up to last_id edited since last_edit, see ExternalChanges.edited
+        """
+        edited = dict()
+        for entry_id, start_time in self.reader.connection.execute(
+            "SELECT entry_id, start_time FROM entry_edit_log "
+            "WHERE seq > :last_edit AND entry_id <= :last_id ORDER BY seq",
+            dict(last_edit=self.last_edit, last_id=last_id),
+        ):
+            edited.setdefault(entry_id, _stored_time(start_time))
+        return edited
+
+    def poll(self) -> Optional[ExternalChanges]:
+        """
+        Checks for commits from other connections, at most once per interval
+        :return: None if nothing changed, else new entries ordered by id and the entries
+            edited since the last poll, see ExternalChanges
+        """
+        now = self.clock()
+        if now < self.next_check:
+            return None
+        self.next_check = now + self.interval
+
+        data_version = self._data_version()
+        if data_version == self.data_version:
+            return None
+
+        connection = self.reader.connection
+        # One read transaction so every query below sees the same snapshot
+        connection.execute("BEGIN")
+        try:
+            # Read once the snapshot is held so it matches the rows read
+            self.data_version = self._data_version()
+            first_edit, last_edit = self._edit_bounds()
+            # Log rows were pruned before this watcher read them, or the log was emptied
+            reload = first_edit > self.last_edit + 1 or last_edit < self.last_edit
+            edited, edited_entries = dict(), list()
+            if last_edit != self.last_edit and not reload:
+                edited = self._edits(self.last_seen_id)
+                edited_entries = list(
+                    self.reader.iter_entries(
+                        "WHERE id IN (SELECT entry_id FROM entry_edit_log "
+                        "WHERE seq > :last_edit AND entry_id <= :last_id)",
+                        dict(last_edit=self.last_edit, last_id=self.last_seen_id),
+                        "id",
+                    )
+                )
+            self.last_edit = last_edit
+            new_entries = list(
+                self.reader.iter_entries(
+                    "WHERE id > :last_id", dict(last_id=self.last_seen_id), "id"
+                )
+            )
+            if new_entries:
+                self.last_seen_id = new_entries[-1].id
+        finally:
+            connection.execute("COMMIT")
+        return ExternalChanges(new_entries, reload, edited, edited_entries)
+
+    def close(self) -> None:
+        """
+        Closes the watcher connection
+        """
+        self.reader.close()
@@ -0,0 +1,60 @@
+""" Contains sqlite PRAGMA presets applied to every new database connection """
+import sqlite3
+from typing import Dict, Mapping, Union
+
+Pragmas = Mapping[str, Union[str, int]]
+
+# Applied in order, so journal_mode comes first. Negative cache_size is KiB, positive is pages.
+CONNECTION_PROFILES: Dict[str, Pragmas] = {
+    # sqlite defaults plus WAL, every commit is fsynced before returning
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+    # WAL with NORMAL sync can lose the last commits on power loss but never corrupts
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Large cache and mmap for report queries, any write raises
+    "readonly-analytics": {
+        "query_only": "ON",
+        "cache_size": -256_000,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+
+def resolve_profile(profile: Union[str, Pragmas]) -> Pragmas:
+    """
+    Looks up a named profile, dictionaries of pragmas are passed through for custom tuning
+    :param profile: Name in CONNECTION_PROFILES or a pragma name -> value mapping
+    :return: Pragma mapping
+    """
+    if isinstance(profile, str):
+        try:
+            return CONNECTION_PROFILES[profile]
+        except KeyError:
+            raise ValueError(
+                f"profile must be one of {', '.join(CONNECTION_PROFILES)}, not {profile}"
+            ) from None
+    return profile
+
+
+def apply_pragmas(connection: sqlite3.Connection, pragmas: Pragmas) -> None:
+    """
+    Runs PRAGMA name = value for every pragma on a raw sqlite3 connection
+    :param connection: DBAPI sqlite3 connection
+    :param pragmas: Pragma mapping from resolve_profile
+    """
+    cursor = connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
@@ -2,37 +2,118 @@
 import datetime
 import json
 import pickle
+import random
+import shutil
+import time
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 import dataset
-
-from clockpuncher.models import Entry, Project
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql.elements import BindParameter
+
+from clockpuncher.connection_profiles import Pragmas, apply_pragmas, resolve_profile
+from clockpuncher.migrations import (
+    BACKFILL_CHUNK_SIZE,
+    LATEST_VERSION,
+    MIGRATIONS,
+    TableRebuild,
+    apply_migrations,
+    current_version,
+    loose_table_rebuilds,
+    missing_start_rollup,
+    record_migrations,
+    run_backfill,
+    start_rebuild,
+    swap_rebuild,
+)
+from clockpuncher.models import Entry, EntryBatch, Project
 from clockpuncher.platform_local_storage import DEVELOPMENT_DB_PATH, PRODUCTION_DB_PATH
+from clockpuncher.schema import (
+    DAILY_ROLLUP_DDL,
+    SCHEMA_OBJECTS_QUERY,
+    daily_rollup_backfill,
+    daily_rollup_triggers,
+    entries_ddl,
+    schema_objects,
+)
+from clockpuncher.sqlite_reader import ENTRY_COLUMNS, SQLiteReader
+from clockpuncher.timestamps import (
+    DECLARED_TYPE_QUERY,
+    TIMESTAMP_CODECS,
+    TimestampCodec,
+    codec_for_declared_type,
+    resolve_codec,
+)
+
+READ_ENGINES = ("dataset", "sqlite3")
+# BEGIN IMMEDIATE attempts after the first, and the first backoff in seconds
+WRITE_RETRIES = 5
+RETRY_BACKOFF = 0.05
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    Splits any iterable, generators included, into lists of at most size items
+    :param iterable: Items to chunk
+    :param size: Max length of each chunk
+    :return: Generator of lists
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+# Same local time to UTC conversion as timestamps.datetime_to_utc_us, for the stored
+# 'YYYY-MM-DD HH:MM:SS.ffffff' text
+_TEXT_TO_EPOCH_US = (
+    "CAST(strftime('%s', {column}, 'utc') AS INTEGER) * 1000000 "
+    "+ CAST(substr({column}, 21, 6) AS INTEGER)"
+)
+# Text to epoch migration, see Database.migrate_timestamps
+EPOCH_MIGRATION = TableRebuild(
+    "entries",
+    "entries_epoch",
+    entries_ddl(TIMESTAMP_CODECS["epoch"], "entries_epoch"),
+    {
+        "id": "{row}.id",
+        "project_name": "COALESCE({row}.project_name, '')",
+        "description": "COALESCE({row}.description, '')",
+        "start_time": _TEXT_TO_EPOCH_US.format(column="{row}.start_time"),
+        "end_time": _TEXT_TO_EPOCH_US.format(column="{row}.end_time"),
+    },
+)
 
 
 def as_project(query):
     """
-    Decorator to load query results up as Project
+    Decorator to load query results up as Project. Rows come from the database so the
+    trusted, non validating constructor is used
     """
 
     def wrapper(*args, **kwargs):
         query_result = query(*args, **kwargs)
         for result in query_result:
-            yield Project(**result)
+            yield Project._from_row(result)  # pylint: disable=protected-access
 
     return wrapper
 
 
 def as_entry(query):
     """
-    Decorator to return entries loaded as Entry dataclasses
+    Decorator to return entries loaded as Entry dataclasses, skipping validation
     """
 
     def wrapper(*args, **kwargs):
         query_result = query(*args, **kwargs)
         for result in query_result:
-            yield Entry(**result)
+            yield Entry._from_row(result)  # pylint: disable=protected-access
 
     return wrapper
 
@@ -42,14 +123,50 @@ class Database:
     This class structures the database with initialization, access and insert methods
     """
 
-    def __init__(self, db_uri: Path = None, development: bool = False):
+    def __init__(
+        self,
+        db_uri: Path = None,
+        development: bool = False,
+        read_engine: str = "dataset",
+        profile: Union[str, Pragmas] = "durable",
+        busy_timeout: Optional[int] = None,
+        timestamps: Optional[str] = None,
+        migration_progress: Optional[Callable[[str, int, int], None]] = None,
+    ):
         """
         :param db_uri: path to sqlite db file. Either path or URI
         :type db_uri: Path to database sqlite
         :param development: Flag that wipes and re-inits the database
         :type development: bool
+        :param read_engine: "dataset" or "sqlite3". sqlite3 runs the hot entry and project
+            name reads on a raw sqlite3 connection instead of through dataset
+        :type read_engine: str
+        :param profile: Connection tuning preset from CONNECTION_PROFILES ("durable", "fast",
+            "readonly-analytics") or a custom pragma name -> value dict
+        :type profile: Union[str, Dict]
+        :param busy_timeout: Milliseconds to wait on another process's lock before raising
+            "database is locked", overrides the profile's busy_timeout
+        :type busy_timeout: int
+        :param timestamps: Storage mode for a new database, "text" (default) or "epoch"
+            integer microseconds. Existing files keep theirs, see migrate_timestamps
+        :type timestamps: str
+        :param migration_progress: Called with (migration description, rows done, rows
+            total) after every backfill chunk when opening a file from an older version
+        :type migration_progress: Callable
         """
+        if read_engine not in READ_ENGINES:
+            raise ValueError(
+                f"read_engine must be one of {', '.join(READ_ENGINES)}, not {read_engine}"
+            )
         self.development = development
+        self.read_engine = read_engine
+        self.pragmas = resolve_profile(profile)
+        if busy_timeout is not None:
+            if busy_timeout < 0:
+                raise ValueError(
+                    f"busy_timeout must be a non-negative int, not {busy_timeout}"
+                )
+            self.pragmas = {**self.pragmas, "busy_timeout": busy_timeout}
         if db_uri is not None:
             db_uri = db_uri.as_posix()
         elif development is True:
@@ -60,39 +177,106 @@ class Database:
         self._db_uri = f"sqlite:///{db_uri}" if db_uri.find("sqlite://") else db_uri
 
         self.db: dataset.database.Database = dataset.connect(self._db_uri)
+        event.listen(self.db.engine, "connect", self._on_connect)
+        event.listen(self.db.engine, "begin", self._on_begin)
+        self.timestamps = self._resolve_timestamps(timestamps)
+        self.migration_progress = migration_progress
         self.projects, self.entries = self.init_db()
 
+        self._reader: Optional[SQLiteReader] = None
+        if read_engine == "sqlite3":
+            self._reader = SQLiteReader(
+                self.db.engine.url.database, self.pragmas, timestamps=self.timestamps
+            )
+
+    def _resolve_timestamps(self, requested: Optional[str]) -> TimestampCodec:
+        """
+        The stored mode of an existing entries table, else requested, else text
+        :param requested: Database timestamps argument
+        :return: TimestampCodec the whole class reads and writes with
+        """
+        row = next(iter(self.db.query(DECLARED_TYPE_QUERY)), None)
+        stored = codec_for_declared_type(row and row["type"])
+        if requested is None:
+            return stored or TIMESTAMP_CODECS["text"]
+        codec = resolve_codec(requested)
+        if stored is not None and stored is not codec:
+            raise ValueError(
+                f"{self._db_uri} stores {stored.mode} timestamps, not {codec.mode}. "
+                "Text databases can be converted with migrate_timestamps"
+            )
+        return codec
+
+    def _on_connect(self, dbapi_connection, _connection_record) -> None:
+        """
+        SQLAlchemy connect event, applies the connection profile to every new connection
+        """
+        apply_pragmas(dbapi_connection, self.pragmas)
+        # Stop pysqlite emitting its own deferred BEGIN, _on_begin takes over
+        dbapi_connection.isolation_level = None
+
+    @staticmethod
+    def _on_begin(connection) -> None:
+        """
+        SQLAlchemy begin event, starts every transaction with BEGIN IMMEDIATE.
+        A deferred transaction that reads then writes can't wait out another writer,
+        sqlite fails the lock upgrade straight away, so the write lock is taken up front.
+        """
+        connection.execute("BEGIN IMMEDIATE")
+
+    @contextmanager
+    def write_transaction(
+        self, retries: int = WRITE_RETRIES, backoff: float = RETRY_BACKOFF
+    ) -> Iterator[dataset.database.Database]:
+        """
+        Short write transaction, commits on exit and rolls back on error. Nested calls join
+        the outer transaction. When BEGIN IMMEDIATE still finds the database locked after
+        busy_timeout it is retried with jittered exponential backoff, nothing has run yet so
+        retrying is safe. Keep the block to the writes, do reads and prep before it.
+        :param retries: BEGIN attempts after the first
+        :param backoff: Seconds before the first retry, doubled each retry
+        :return: The dataset database the transaction runs on
+        """
+        for attempt in range(retries + 1):
+            try:
+                self.db.begin()
+                break
+            except OperationalError as error:
+                if "database is locked" not in str(error) or attempt == retries:
+                    raise
+                time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+        try:
+            yield self.db
+        except BaseException:
+            self.db.rollback()
+            raise
+        try:
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
     def init_db(self) -> Tuple[dataset.table.Table, dataset.table.Table]:
         """
-        Initializes the database and creates the tables if they don't exist.
+        Creates new databases from schema.py and runs the migrations an older file hasn't
+        had, then recreates any object still missing. Reads of sqlite_master and
+        schema_version decide, so opening an up to date database writes nothing.
         :return: returns the projects and entry tables
         """
-        projects_table = self.db.create_table("projects")
-        entries_table = self.db.create_table("entries")
-        if projects_table.count() == 0:
-            projects_table.insert(
-                Project(
-                    id=None,
-                    project_name="1",
-                    client="client",
-                    rate=1,
-                    monthly_frequency=1,
-                    weekly_hour_allotment=1,
-                ).to_dict()
-            )
-            projects_table.delete()
-        if entries_table.count() == 0:
-            entries_table.insert(
-                Entry(
-                    id=None,
-                    project_name="1",
-                    description="entry",
-                    start_time=datetime.datetime.now(),
-                    end_time=datetime.datetime.now(),
-                ).to_dict()
-            )
+        names = self._schema_object_names()
+        version = current_version(self, names) if "entries" in names else None
+        if version is None:
+            with self.write_transaction():
+                self._create_missing_schema()
+                record_migrations(self, MIGRATIONS)
+        elif version < LATEST_VERSION:
+            apply_migrations(self, MIGRATIONS, version, progress=self.migration_progress)
+        elif not schema_objects(self.timestamps).keys() <= names:
+            with self.write_transaction():
+                self._create_missing_schema()
+        projects_table = self.db.load_table("projects")
+        entries_table = self.db.load_table("entries")
 
-            entries_table.delete()
         if self.development is False:
             return projects_table, entries_table
 
@@ -100,6 +284,161 @@ class Database:
 
         return projects_table, entries_table
 
+    def _schema_object_names(self) -> Set[str]:
+        """
+        Names of every table, index, trigger and view in the database
+        """
+        return {row["name"] for row in self.db.query(SCHEMA_OBJECTS_QUERY)}
+
+    def _create_missing_schema(self) -> List[str]:
+        """
+        Runs the schema.py statements of objects missing from sqlite_master. Checks again
+        so another process that created them first isn't repeated, call it inside
+        write_transaction.
+        :return: Names of the objects created
+        """
+        existing = self._schema_object_names()
+        created = list()
+        for name, statements in schema_objects(self.timestamps).items():
+            if name in existing:
+                continue
+            for statement in statements:
+                self.db.query(statement)
+            created.append(name)
+        return created
+
+    def _create_daily_rollup(self) -> None:
+        """
+        Creates the daily_rollup table and the entries triggers that keep it current
+        """
+        self.db.query(DAILY_ROLLUP_DDL)
+        for trigger in daily_rollup_triggers(self.timestamps).values():
+            self.db.query(trigger)
+
+    def backfill_daily_rollup(self) -> int:
+        """
+        Rebuilds daily_rollup from the entries table in one transaction. The triggers keep
+        it current, files from before them are filled in chunks by migration 1.
+        :return: Number of (day, project_name) rollup rows written
+        """
+        with self.write_transaction():
+            self._create_daily_rollup()
+            self.db.query("DELETE FROM daily_rollup")
+            self.db.query(daily_rollup_backfill(self.timestamps))
+        return self.db["daily_rollup"].count()
+
+    def _scalar(self, query_str: str, **kwargs):
+        """
+        First column of the first row of a query
+        """
+        return next(iter(next(iter(self.db.query(query_str, **kwargs))).values()))
+
+    def migrate_timestamps(
+        self,
+        chunk_size: int = BACKFILL_CHUNK_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Converts a text timestamp database to epoch microseconds while other processes keep
+        using it. Entries are copied in id order into a typed entries_epoch table, one short
+        write transaction per chunk_size rows, while triggers mirror edits to rows already
+        copied, so an interrupted run resumes where it stopped. One last transaction copies
+        rows added since, swaps the tables and rebuilds the indexes, triggers and the
+        entries_readable view, then VACUUM gives the old table's pages back to the disk.
+        Raises OSError up front when the disk can't hold a second copy of the file.
+        Processes still running in text mode get CHECK errors on insert until restarted.
+        :param chunk_size: Rows copied per transaction
+        :param progress: Called with (rows copied, rows in entries) after every chunk
+        :return: Number of entries in the migrated table
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive int, not {chunk_size}")
+        if self.timestamps.mode == "epoch":
+            return self.count_entries()
+
+        self._check_free_space()
+        with self.write_transaction():
+            start_rebuild(self, EPOCH_MIGRATION)
+        run_backfill(self, EPOCH_MIGRATION.backfill, chunk_size, progress)
+
+        text_timestamps = self.timestamps
+        try:
+            with self.write_transaction():
+                swap_rebuild(self, EPOCH_MIGRATION)
+                self.timestamps = TIMESTAMP_CODECS["epoch"]
+                # Indexes, triggers and the entries_readable view, the rollup data stays
+                self._create_missing_schema()
+        except BaseException:
+            self.timestamps = text_timestamps
+            raise
+        self.vacuum()
+        self.entries._reflect_table()  # pylint: disable=protected-access
+        if self._reader is not None:
+            self._reader.timestamps = self.timestamps
+        return self.count_entries()
+
+    def rebuild_tables(
+        self,
+        chunk_size: int = BACKFILL_CHUNK_SIZE,
+        progress: Optional[Callable[[str, int, int], None]] = None,
+    ) -> List[str]:
+        """
+        Rebuilds the tables older versions let dataset infer, with nullable or missing
+        columns, into the typed schema.py tables while other processes keep using them.
+        Opening a file never does this, migration 1 leaves them in place. Each table is
+        copied and swapped in like migrate_timestamps, then VACUUM gives the old tables'
+        pages back to the disk. Raises OSError up front when the disk can't hold a second
+        copy of the file.
+        :param chunk_size: Rows copied per transaction
+        :param progress: Called with (table, rows copied, rows in table) after every chunk
+        :return: Names of the tables rebuilt
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive int, not {chunk_size}")
+        rebuilds = loose_table_rebuilds(self)
+        if not rebuilds:
+            return []
+
+        self._check_free_space()
+        for rebuild in rebuilds:
+            with self.write_transaction():
+                start_rebuild(self, rebuild)
+            table_progress = progress and partial(progress, rebuild.table)
+            run_backfill(self, rebuild.backfill, chunk_size, table_progress)
+            with self.write_transaction():
+                if rebuild.table == "entries":
+                    self.db.query(missing_start_rollup(self.timestamps))
+                swap_rebuild(self, rebuild)
+                # Indexes and triggers went with the old table
+                self._create_missing_schema()
+        self.vacuum()
+        # pylint: disable=protected-access
+        self.projects._reflect_table()
+        self.entries._reflect_table()
+        return [rebuild.table for rebuild in rebuilds]
+
+    def _check_free_space(self) -> None:
+        """
+        Raises OSError when the disk has less room than the file takes. A table rebuild
+        holds a second copy of the table until VACUUM, which writes a copy of the file.
+        """
+        path = self.db.engine.url.database
+        if not path or path == ":memory:":
+            return
+        needed = self._scalar(
+            "SELECT page_count * page_size FROM pragma_page_count(), pragma_page_size()"
+        )
+        free = shutil.disk_usage(Path(path).resolve().parent).free
+        if free < needed:
+            raise OSError(f"Rebuilding {path} needs {needed:,} free bytes, {free:,} are free")
+
+    def vacuum(self) -> None:
+        """
+        Rewrites the file without its free pages, e.g. the ones a dropped table left.
+        Needs free disk for a copy of the file and waits for other processes' writes.
+        """
+        self.db.query("VACUUM")
+
     def _pre_seed_db(
         self,
         project_starter_data_path: Path = Path("./clockpuncher/data/project_data.json"),
@@ -125,7 +464,7 @@ class Database:
             with entries_pickle_path.open("rb") as file:
                 entries = pickle.load(file)
             for entry in entries:
-                self.db["entries"].insert(entry.to_dict())
+                self.db["entries"].insert(self.timestamps.prepare_row(entry.to_dict()))
 
     def add_entry(self, entry: Entry, return_value: bool = False) -> Union[int, Entry]:
         """
@@ -137,14 +476,58 @@ class Database:
         :return: created ID or entry if return_value is True
         """
         if isinstance(entry, Entry):
-            entry: Dict = entry.to_dict()
+            entry: Dict = self.timestamps.prepare_row(entry.to_dict())
         else:
             raise ValueError(f"Entry must be an Entry dataclass, not {type(entry)}")
-        inserted_id = self.entries.insert(entry)
+        with self.write_transaction():
+            inserted_id = self.entries.insert(entry)
         if not return_value:
             return inserted_id
         entry_in_db = self.entries.find_one(id=inserted_id)
-        return Entry(**entry_in_db)
+        return Entry._from_row(entry_in_db)  # pylint: disable=protected-access
+
+    def add_entries(
+        self,
+        entries: Iterable[Entry],
+        batch_size: int = 1000,
+        return_ids: bool = False,
+    ) -> Union[int, List[int]]:
+        """
+        Bulk inserts entries, one transaction per batch_size chunk
+        :param entries: Iterable or generator of Entry dataclasses
+        :type entries: Iterable[Entry]
+        :param batch_size: Rows written per transaction
+        :type batch_size: int
+        :param return_ids: If True insert row by row inside each transaction to collect ids
+        :type return_ids: bool
+        :return: count of inserted entries or list of created IDs if return_ids is True
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive int, not {batch_size}")
+
+        inserted_ids = list()
+        inserted_count = 0
+        for chunk in _chunked(entries, batch_size):
+            rows = list()
+            for entry in chunk:
+                if not isinstance(entry, Entry):
+                    raise ValueError(
+                        f"Entry must be an Entry dataclass, not {type(entry)}"
+                    )
+                rows.append(self.timestamps.prepare_row(entry.to_dict()))
+
+            with self.write_transaction():
+                if return_ids:
+                    inserted_ids.extend(
+                        self.entries.insert(row, ensure=False) for row in rows
+                    )
+                else:
+                    self.entries.insert_many(rows, chunk_size=batch_size, ensure=False)
+            inserted_count += len(rows)
+
+        if return_ids:
+            return inserted_ids
+        return inserted_count
 
     def add_project(
         self, project: Project, return_value: bool = False
@@ -164,13 +547,14 @@ class Database:
                 f"Project must be a Project dataclass, not {type(project)}"
             )
 
-        inserted_id = self.projects.insert(project)
+        with self.write_transaction():
+            inserted_id = self.projects.insert(project)
 
         if not return_value:
             return inserted_id
 
         project_in_db = self.projects.find_one(id=inserted_id)
-        return Project(**project_in_db)
+        return Project._from_row(project_in_db)  # pylint: disable=protected-access
 
     @staticmethod
     def _eager_loader(query: callable, eager_loading: bool, **kwargs):
@@ -223,6 +607,10 @@ class Database:
         :param eager_loading: if True load everything into a list in memory
         :return: Generator or List of entries
         """
+        if self._reader is not None:
+            return self._eager_loader(
+                self._reader.iter_entries, eager_loading=eager_loading
+            )
         return self._eager_loader(self._get_multi_entries, eager_loading=eager_loading)
 
     def get_multi_entries(self, eager_loading: bool = False, **kwargs):
@@ -232,8 +620,32 @@ class Database:
         :param kwargs: id, project, description are likely candidates for searching
         :return: Generator or List of Entries
         """
+        if self._reader is not None and self._is_simple_entry_filter(kwargs):
+            where_clause = " AND ".join(f"{column} = :{column}" for column in kwargs)
+            return self._eager_loader(
+                self._reader.iter_entries,
+                eager_loading=eager_loading,
+                where_clause=f"WHERE {where_clause}" if kwargs else "",
+                parameters=kwargs,
+            )
         return self._eager_loader(
-            self._get_multi_entries, eager_loading=eager_loading, **kwargs
+            self._get_multi_entries,
+            eager_loading=eager_loading,
+            **self.timestamps.prepare_row(kwargs),
+        )
+
+    @staticmethod
+    def _is_simple_entry_filter(kwargs: Dict) -> bool:
+        """
+        Checks kwargs only hold column = scalar matches the sqlite3 reader can answer.
+        dataset's operator dicts, lists and ordering keywords stay on the dataset path.
+        :param kwargs: get_multi_entries keyword filters
+        :return: True if every key is an entries column with a scalar value
+        """
+        return all(
+            column in ENTRY_COLUMNS
+            and isinstance(value, (str, int, float, datetime.datetime))
+            for column, value in kwargs.items()
         )
 
     @as_entry
@@ -246,34 +658,284 @@ class Database:
         """
         return self.db.query(query=query_str, **kwargs)
 
+    def _entry_range_filter(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        project: Optional[str] = None,
+    ) -> Tuple[str, List[BindParameter], Dict]:
+        """
+        Builds the WHERE clause shared by the time range queries.
+        Datetimes are bound with the storage mode's type so they compare in the stored form.
+        :param start: Inclusive lower bound on start_time, None for unbounded
+        :param end: Exclusive upper bound on start_time, None for unbounded
+        :param project: Optional project_name to match
+        :return: where clause string, typed bind parameters and their values
+        """
+        conditions, bind_params, values = list(), list(), dict()
+        if project is not None:
+            conditions.append("project_name = :project")
+            values["project"] = project
+        if start is not None:
+            conditions.append("start_time >= :start")
+            bind_params.append(bindparam("start", type_=self.timestamps.sql_type()))
+            values["start"] = start
+        if end is not None:
+            conditions.append("start_time < :end")
+            bind_params.append(bindparam("end", type_=self.timestamps.sql_type()))
+            values["end"] = end
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where_clause, bind_params, values
+
+    def get_entries_between(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        project: Optional[str] = None,
+        eager_loading: bool = True,
+    ):
+        """
+        Returns entries whose start_time falls in [start, end), ordered by start_time.
+        Both bounds are bound parameters and the lookup is an index range seek.
+        :param start: Inclusive lower bound, None for no lower bound
+        :param end: Exclusive upper bound, None for no upper bound
+        :param project: Only return entries for this project name
+        :param eager_loading: Default True, auto-loads into list of Entries
+        :return: list of entries or generator
+        """
+        where_clause, bind_params, values = self._entry_range_filter(
+            start, end, project
+        )
+        if self._reader is not None:
+            return self._eager_loader(
+                self._reader.iter_entries,
+                eager_loading=eager_loading,
+                where_clause=where_clause,
+                parameters=values,
+                order_by="start_time, id",
+            )
+        query = text(
+            f"SELECT * FROM entries {where_clause} ORDER BY start_time, id"
+        ).bindparams(*bind_params)
+        return self._eager_loader(
+            self._query_entries, eager_loading=eager_loading, query_str=query, **values
+        )
+
+    def iter_entries(
+        self,
+        chunk_size: int = 1000,
+        after_id: Optional[int] = None,
+        order_by: str = "start_time",
+    ) -> Iterator[List[Entry]]:
+        """
+        Walks the entries table in keyset paginated chunks so memory stays at one chunk.
+        Each page is a fresh query seeking past the last row of the previous one, so no
+        cursor is held open between chunks and iteration can resume from any entry id.
+        :param chunk_size: Max entries per yielded list
+        :param after_id: Resume after this entry id, None starts from the beginning
+        :param order_by: "start_time" (ties broken by id) or "id"
+        :return: Generator of lists of Entries
+        """
+        if order_by not in {"start_time", "id"}:
+            raise ValueError(f"order_by must be 'start_time' or 'id', not {order_by}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive int, not {chunk_size}")
+
+        last_start_time = None
+        if after_id is not None and order_by == "start_time":
+            resume_entry = self.entries.find_one(id=after_id)
+            if resume_entry is None:
+                raise ValueError(f"Cannot resume, no entry with id {after_id}")
+            last_start_time = resume_entry["start_time"]
+
+        start_time_page = text(
+            "SELECT * FROM entries WHERE (start_time, id) > (:start_time, :id) "
+            "ORDER BY start_time, id LIMIT :limit"
+        ).bindparams(bindparam("start_time", type_=self.timestamps.sql_type()))
+        id_page = "SELECT * FROM entries WHERE id > :id ORDER BY id LIMIT :limit"
+        first_page = f"SELECT * FROM entries ORDER BY {order_by}, id LIMIT :limit"
+
+        while True:
+            if after_id is None:
+                query, values = first_page, dict()
+            elif order_by == "id":
+                query, values = id_page, dict(id=after_id)
+            else:
+                query = start_time_page
+                values = dict(start_time=last_start_time, id=after_id)
+
+            page = list(self._query_entries(query_str=query, limit=chunk_size, **values))
+            if not page:
+                return
+            yield page
+            if len(page) < chunk_size:
+                return
+            after_id, last_start_time = page[-1].id, page[-1].start_time
+
+    def get_entries_page(
+        self,
+        limit: int,
+        before: Optional[Tuple[datetime.datetime, int]] = None,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        project: Optional[str] = None,
+    ) -> List[Entry]:
+        """
+        One newest first page of entries for paged views. Pages are keyset based, pass the
+        (start_time, id) of the last entry on a page as before to get the next older page.
+        :param limit: Max entries on the page
+        :param before: Key of the last row of the previous page, None for the newest page
+        :param start: Inclusive lower bound on start_time, None for unbounded
+        :param end: Exclusive upper bound on start_time, None for unbounded
+        :param project: Only return entries for this project name
+        :return: List of at most limit Entries ordered by start_time descending
+        """
+        where_clause, bind_params, values = self._entry_range_filter(
+            start, end, project
+        )
+        if before is not None:
+            keyset = "(start_time, id) < (:before_start_time, :before_id)"
+            where_clause = (
+                f"{where_clause} AND {keyset}" if where_clause else f"WHERE {keyset}"
+            )
+            bind_params.append(bindparam("before_start_time", type_=self.timestamps.sql_type()))
+            values["before_start_time"], values["before_id"] = before
+
+        query = text(
+            f"SELECT * FROM entries {where_clause} "
+            "ORDER BY start_time DESC, id DESC LIMIT :limit"
+        ).bindparams(*bind_params)
+        return list(self._query_entries(query_str=query, limit=limit, **values))
+
+    def count_entries(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        project: Optional[str] = None,
+    ) -> int:
+        """
+        Counts entries whose start_time falls in [start, end) using the covering indexes
+        :param start: Inclusive lower bound on start_time, None for unbounded
+        :param end: Exclusive upper bound on start_time, None for unbounded
+        :param project: Only count entries for this project name
+        :return: Number of entries
+        """
+        where_clause, bind_params, values = self._entry_range_filter(
+            start, end, project
+        )
+        query = text(
+            f"SELECT COUNT(*) AS entry_count FROM entries {where_clause}"
+        ).bindparams(*bind_params)
+        return next(iter(self.db.query(query, **values)))["entry_count"]
+
+    def get_entry_batch(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        project: Optional[str] = None,
+    ) -> EntryBatch:
+        """
+        Loads entries whose start_time falls in [start, end) into a columnar EntryBatch,
+        rows go straight into the arrays without creating Entry objects
+        :param start: Inclusive lower bound, None for no lower bound
+        :param end: Exclusive upper bound, None for no upper bound
+        :param project: Only load entries for this project name
+        :return: EntryBatch ordered by start_time
+        """
+        where_clause, bind_params, values = self._entry_range_filter(
+            start, end, project
+        )
+        if self._reader is not None:
+            return EntryBatch.from_rows(
+                self._reader.iter_rows(where_clause, values, "start_time, id")
+            )
+        query = text(
+            f"SELECT {', '.join(ENTRY_COLUMNS)} FROM entries {where_clause} "
+            "ORDER BY start_time, id"
+        ).bindparams(*bind_params)
+        return EntryBatch.from_rows(
+            tuple(row.values()) for row in self.db.query(query, **values)
+        )
+
     def get_entries_today(self, eager_loading=True) -> List[Entry]:
         """
         Returns entries from today only
         :param eager_loading: Default True, auto-loads into list of Entries
         :return: list of entries or generator
         """
-        ##################################################################################
-        # It's normally a terrible idea to use f-strings for building queries because
-        # this opens up risks for SQL Injection. While that risk is partially mitigated
-        # by the fact this is a desktop app that is not connected to the internet and
-        # this isn't taking user input, it'd be pretty trivial to somehow adjust date_obj
-        # either in memory, directly editing the python script, or manipulating/monkeypatching
-        # .isoformat() to return some valid ending to the sql query + a drop tables command.
-        #
-        # So why are we using raw sql? Because raw sql is fun and it's decent practice.
-        ##################################################################################
-        date_obj = datetime.date.today().isoformat()
-
-        query_str = f"SELECT * FROM entries WHERE start_time > DATE('{date_obj}');"
-        return self._eager_loader(
-            self._query_entries, eager_loading=eager_loading, query_str=query_str
+        midnight = datetime.datetime.combine(datetime.date.today(), datetime.time.min)
+        return self.get_entries_between(start=midnight, eager_loading=eager_loading)
+
+    def project_duration_totals(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Sums entry durations per project inside SQLite rather than hydrating every Entry.
+        Reads only the covering start_time index.
+        :param start: Inclusive lower bound on start_time, None for unbounded
+        :param end: Exclusive upper bound on start_time, None for unbounded
+        :return: List of (project_name, total_seconds) tuples ordered by project_name
+        """
+        where_clause, bind_params, values = self._entry_range_filter(start, end)
+        query = text(
+            "SELECT project_name, "
+            f"{self.timestamps.total_seconds_sql('start_time', 'end_time')} AS total_seconds "
+            f"FROM entries {where_clause} GROUP BY project_name ORDER BY project_name"
+        ).bindparams(*bind_params)
+        return [
+            (row["project_name"], row["total_seconds"])
+            for row in self.db.query(query, **values)
+        ]
+
+    def get_daily_totals(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+        project: Optional[str] = None,
+    ) -> List[Tuple[datetime.date, str, float, int]]:
+        """
+        Reads per day, per project totals from the trigger maintained daily_rollup table
+        :param start: Inclusive first day, None for unbounded
+        :param end: Exclusive last day, None for unbounded
+        :param project: Only return rows for this project name
+        :return: List of (day, project_name, total_seconds, entry_count) ordered by day
+        """
+        conditions, values = list(), dict()
+        if start is not None:
+            conditions.append("day >= :start")
+            values["start"] = start.isoformat()
+        if end is not None:
+            conditions.append("day < :end")
+            values["end"] = end.isoformat()
+        if project is not None:
+            conditions.append("project_name = :project")
+            values["project"] = project
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        query_str = (
+            "SELECT day, project_name, total_seconds, entry_count FROM daily_rollup "
+            f"{where_clause} ORDER BY day, project_name"
         )
+        return [
+            (
+                datetime.date.fromisoformat(row["day"]),
+                row["project_name"],
+                row["total_seconds"],
+                row["entry_count"],
+            )
+            for row in self.db.query(query_str, **values)
+        ]
 
     def get_project_names(self) -> List[str]:
         """
         Returns all project names in DB
         :return: List of project names
         """
+        if self._reader is not None:
+            return self._reader.get_project_names()
         project_names = list()
         for project in self.projects.distinct("project_name"):
             project_names.append(project["project_name"])
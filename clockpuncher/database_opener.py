@@ -0,0 +1,94 @@
+""" Contains a background opener so migrating an older timer.db never freezes the GUI """
+import threading
+from typing import NamedTuple, Optional
+
+from clockpuncher.database import Database
+
+
+class MigrationProgress(NamedTuple):
+    """
+    Latest migration_progress report for display
+    """
+
+    description: str
+    done: int
+    total: int
+
+    @property
+    def fraction(self) -> float:
+        """
+        Share of the current backfill done, 0.0 to 1.0
+        """
+        return self.done / self.total if self.total else 1.0
+
+    def __str__(self) -> str:
+        return f"Upgrading timer.db, {self.description}: {self.done:,} of {self.total:,} rows"
+
+
+class DatabaseOpener:
+    """
+    Opens a Database on a background thread. Opening a file from an older version runs its
+    migrations, which can take minutes on a large file, so the GUI polls progress and ready
+    every frame instead of waiting in Database.__init__. Migrations resume where they
+    stopped, so closing the window meanwhile loses nothing.
+    """
+
+    def __init__(self, **database_kwargs):
+        """
+        :param database_kwargs: Database arguments, migration_progress is filled in here
+        """
+        self.database_kwargs = database_kwargs
+        self.database: Optional[Database] = None
+        self.error: Optional[BaseException] = None
+        self._progress: Optional[MigrationProgress] = None
+        self._lock = threading.Lock()
+        self._opened = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="clockpuncher-opener", daemon=True
+        )
+
+    def start(self) -> "DatabaseOpener":
+        """
+        Starts opening the database
+        :return: self for chaining
+        """
+        self._thread.start()
+        return self
+
+    @property
+    def progress(self) -> Optional[MigrationProgress]:
+        """
+        Latest backfill chunk of the migration running, None before the first one
+        """
+        with self._lock:
+            return self._progress
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for the database to open or fail
+        :param timeout: Max seconds to wait, 0 to check without waiting
+        :return: True once result won't block
+        """
+        return self._opened.wait(timeout)
+
+    def result(self) -> Database:
+        """
+        The opened database, raises whatever opening it raised. Call once wait is True.
+        """
+        if not self._opened.is_set():
+            raise RuntimeError("The database is still opening")
+        if self.error is not None:
+            raise self.error
+        return self.database
+
+    def _report(self, description: str, done: int, total: int) -> None:
+        with self._lock:
+            self._progress = MigrationProgress(description, done, total)
+
+    def _run(self) -> None:
+        try:
+            self.database = Database(**self.database_kwargs, migration_progress=self._report)
+        except BaseException as error:  # pylint: disable=broad-except
+            self.error = error
+        finally:
+            self._opened.set()
@@ -1,4 +1,10 @@
 """ Contains individual GUI components """
-from .entry_visualization import entry_table, task_chart
+from .entry_visualization import (
+    analytics_plots,
+    entry_table,
+    paged_entry_table,
+    task_chart,
+)
 from .menu_settings import settings_menu
+from .migration_window import migration_window
 from .timer import number, timer_display
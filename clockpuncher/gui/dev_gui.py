@@ -1,20 +1,29 @@
 """ Contains development GUI helpers """
+from pathlib import Path
+
 from dearpygui.core import (
+    add_button,
     add_checkbox,
     add_debug_window,
     add_doc_window,
     add_input_text,
+    add_row,
+    add_table,
     add_text,
+    clear_table,
     end,
     get_item_configuration,
     get_value,
     get_windows,
     log_debug,
     log_info,
+    set_value,
     show_logger,
 )
 from dearpygui.simple import window
 
+from clockpuncher.instrumentation import Instrumentation
+
 
 def start_development_windows(logger: str):
     """
@@ -86,3 +95,42 @@ Window name will look for all windows that name contains the string, caps insens
             callback_data=logger,
         )
         add_checkbox("Print invisible", default_value=False)
+
+
+def start_instrumentation_window(instrumentation: Instrumentation, export_path: Path):
+    """
+    Frame timing window with rolling p50/p95/max per instrumented component
+    :param instrumentation: Timers to display
+    :param export_path: Where the Export JSON button writes the current summaries
+    """
+
+    def export_timings(*_args):
+        written = instrumentation.export_json(export_path)
+        set_value("Export##instrumentation_status", f"Saved {written}")
+
+    with window("Timings", x_pos=0, y_pos=550, width=300, height=250):
+        add_button("Export JSON##instrumentation", callback=export_timings)
+        add_text("Export##instrumentation_status", default_value="")
+        add_table(
+            "Timings##instrumentation",
+            headers=["Name", "Count", "p50 ms", "p95 ms", "Max ms"],
+        )
+
+
+def update_instrumentation_window(instrumentation: Instrumentation):
+    """
+    Refreshes the timings table, call at most once a second as it sorts every window
+    :param instrumentation: Timers to display
+    """
+    clear_table("Timings##instrumentation")
+    for name, summary in instrumentation.summaries().items():
+        add_row(
+            "Timings##instrumentation",
+            [
+                name,
+                str(summary.count),
+                f"{summary.p50:.3f}",
+                f"{summary.p95:.3f}",
+                f"{summary.max:.3f}",
+            ],
+        )
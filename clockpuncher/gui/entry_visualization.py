@@ -1,10 +1,14 @@
 """ Module for pie chart and table GUI elements """
 import datetime
 from collections import defaultdict
-from typing import List
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 import dearpygui.core as c
-from clockpuncher.models import Entry
+from clockpuncher import analytics
+from clockpuncher.models import Entry, EntryBatch, EntryCollection
+
+PageCursor = Tuple[datetime.datetime, int]
+PageSource = Callable[[int, Optional[PageCursor]], List[Entry]]
 
 
 class Chart:
@@ -19,32 +23,63 @@ class Chart:
         self.chart = lambda: c.add_pie_series(
             self.plot_label, "TaskPieChart", self.data, self.labels, 0.5, 0.4, 0.4
         )
-        self.prior_id = None
+        self.prior_version = None
+        self.project_seconds: Dict[str, float] = dict()
 
-    def render(self, entries: List[Entry]) -> None:
+    def render(
+        self,
+        entries: EntryCollection,
+        totals_query: Optional[Callable[[], List[Tuple[str, float]]]] = None,
+    ) -> None:
         """
-        Render method that checks for ID change before rerunning calculations
-        :param entries: List of entries to display
+        Render method that checks the entries version before rerunning calculations.
+        Appended entries adjust the running per project totals, anything else recomputes them.
+        :param entries: Collection of entries to display
+        :param totals_query: Callable returning (project_name, total_seconds) tuples,
+            typically Database.project_duration_totals. If None, entries are summed in python
         :return: None but calls update chart on change
         """
-
-        if id(entries) == self.prior_id:
+        new_entries = entries.changes_since(self.prior_version)
+        if new_entries is not None and not new_entries:
             return
+        self.prior_version = entries.version
 
-        self.prior_id = id(entries)
-        project_dict = defaultdict(datetime.timedelta)
-        total_duration = datetime.timedelta()
-        for entry in entries:
-            total_duration += entry.duration
-            project_dict[entry.project_name] += entry.duration
+        if new_entries is None:
+            if totals_query is None:
+                project_totals = self.sum_entry_durations(entries)
+            else:
+                project_totals = totals_query()
+            self.project_seconds = dict(project_totals)
+        else:
+            for entry in new_entries:
+                self.project_seconds[entry.project_name] = (
+                    self.project_seconds.get(entry.project_name, 0.0)
+                    + entry.duration.total_seconds()
+                )
 
+        total_seconds = sum(self.project_seconds.values())
         labels, data = list(), list()
-        for project, time in project_dict.items():
+        for project, seconds in self.project_seconds.items():
             labels.append(project)
-            data.append((time / total_duration))
+            data.append(seconds / total_seconds if total_seconds else 0.0)
 
         self.update_chart(data, labels)
 
+    @staticmethod
+    def sum_entry_durations(entries: Iterable[Entry]) -> List[Tuple[str, float]]:
+        """
+        Python fallback for summing durations per project
+        :param entries: Entries to sum
+        :return: List of (project_name, total_seconds) tuples
+        """
+        project_dict = defaultdict(datetime.timedelta)
+        for entry in entries:
+            project_dict[entry.project_name] += entry.duration
+        return [
+            (project, duration.total_seconds())
+            for project, duration in project_dict.items()
+        ]
+
     def update_chart(self, data: List[float], labels: List[str]) -> None:
         """
         Updates data and labels and updates Pie chart
@@ -85,37 +120,148 @@ class Chart:
         c.set_plot_ylimits(self.plot_label, 0, 1)
 
 
+class AnalyticsPlots:
+    """
+    Weekday x hour heatmap, session length histogram and daily hours per project plots.
+    Only created when the optional numpy extra is installed.
+    """
+
+    def __init__(self):
+        self.prior_version = None
+        self.batch = EntryBatch()
+        self.heatmap_label = "Hours by weekday and hour##AnalyticsHeatmap"
+        self.histogram_label = "Session lengths (minutes)##AnalyticsHistogram"
+        self.daily_label = "Daily hours##AnalyticsDaily"
+
+    @property
+    def available(self) -> bool:
+        """
+        True if numpy is installed
+        """
+        return analytics.np is not None
+
+    def create_plots(self) -> None:
+        """
+        Adds the heatmap next to the pie chart with the histogram and daily plot below
+        """
+        if not self.available:
+            return
+        c.add_plot(
+            self.heatmap_label,
+            no_mouse_pos=True,
+            yaxis_no_tick_labels=True,
+            width=300,
+            height=300,
+        )
+        c.add_plot(self.histogram_label, no_mouse_pos=True, height=200)
+        c.add_plot(self.daily_label, xaxis_time=True, height=250)
+
+    def render(self, entries: EntryCollection) -> None:
+        """
+        Appended entries extend the cached column batch, anything else rebuilds it.
+        Every plot is then recomputed from the arrays, which is vectorised and cheap.
+        :param entries: Entries to plot
+        """
+        if not self.available:
+            return
+        new_entries = entries.changes_since(self.prior_version)
+        if new_entries is not None and not new_entries:
+            return
+        self.prior_version = entries.version
+        if new_entries is None:
+            self.batch = EntryBatch.from_entries(entries)
+        else:
+            self.batch.extend(new_entries)
+
+        arrays = analytics.EntryArrays.from_batch(self.batch)
+        self.update_heatmap(analytics.weekday_hour_heatmap(arrays))
+        self.update_histogram(*analytics.session_length_histogram(arrays))
+        self.update_daily(*analytics.daily_project_series(arrays))
+
+    def update_heatmap(self, heatmap) -> None:
+        """
+        Redraws the 7 x 24 weekday by hour heatmap
+        :param heatmap: Hours array from analytics.weekday_hour_heatmap
+        """
+        c.clear_plot(self.heatmap_label)
+        c.add_heat_series(
+            self.heatmap_label,
+            "Hours",
+            values=heatmap.ravel().tolist(),
+            rows=7,
+            columns=24,
+            scale_min=0.0,
+            scale_max=float(heatmap.max()) or 1.0,
+            format="",
+        )
+
+    def update_histogram(self, counts, edges) -> None:
+        """
+        Redraws the session length bars, one bar per bin
+        :param counts: Entry count per bin
+        :param edges: Bin edges in minutes
+        """
+        c.clear_plot(self.histogram_label)
+        c.add_bar_series(
+            self.histogram_label,
+            "Entries",
+            x=list(range(len(counts))),
+            y=counts.astype(float).tolist(),
+            weight=0.8,
+        )
+        c.set_xticks(
+            self.histogram_label,
+            [[f"{edge:g}+", position] for position, edge in enumerate(edges)],
+        )
+
+    def update_daily(self, days, series: Dict) -> None:
+        """
+        Redraws one line per project of hours per day
+        :param days: datetime64[D] array
+        :param series: Project name to hours per day array
+        """
+        c.clear_plot(self.daily_label)
+        timestamps = days.astype("datetime64[s]").astype("int64").astype(float).tolist()
+        for project, hours in series.items():
+            c.add_line_series(
+                self.daily_label, project or "No project", timestamps, hours.tolist()
+            )
+
+
 class EntryTable:
     """
     Table for Listing most recent time entries
     """
 
     def __init__(self):
-        self.prior_id = None
+        self.prior_version = None
         self.table_name = "Entries##table"
 
-    def render(self, entries: List[Entry]) -> None:
+    def render(self, entries: EntryCollection) -> None:
         """
-        Checks if entries in parent have updated
-        If so it'll clear and re-render the table
+        Checks if entries in parent have updated.
+        Appended entries are added as rows, anything else clears and re-renders the table
         :param entries: Entries passed in parent class
         :return: Updated table with new data
         """
-
-        if id(entries) == self.prior_id:
+        new_entries = entries.changes_since(self.prior_version)
+        if new_entries is not None and not new_entries:
             return
-        self.prior_id = id(entries)
-        c.clear_table(self.table_name)
-        for entry in entries:
+        self.prior_version = entries.version
+
+        if new_entries is None:
+            c.clear_table(self.table_name)
+            new_entries = entries
+        for entry in new_entries:
             self.add_row_to_entry_table(entry)
 
-    def create_table(self, input_data: List[Entry]) -> None:
+    def create_table(self, input_data: EntryCollection) -> None:
         """
         Creates table widget with name Entries##table
         :param input_data: Initial data to create table with
         :return: Table loaded with entries
         """
-        self.prior_id = id(input_data)
+        self.prior_version = input_data.version
         c.add_table(
             self.table_name,
             headers=["Project", "Description", "Duration", "Start", "End"],
@@ -123,21 +269,165 @@ class EntryTable:
         for single_entry in input_data:
             self.add_row_to_entry_table(single_entry)
 
-    def add_row_to_entry_table(self, entry: Entry) -> None:
+    @staticmethod
+    def entry_row(entry: Entry) -> List[str]:
         """
-        Helper to add entry to the table
-        :param entry: A single entry to convert to entries table
-        :return: New row attached to the Entries##table
+        Formats an entry as table cell strings
+        :param entry: Entry to format
+        :return: Project, Description, Duration, Start, End strings
         """
-        row_data = [
+        return [
             entry.project_name,
             entry.description,
             str(entry.duration)[:10],
             entry.start_time.time().strftime("%I:%M"),
             entry.end_time.time().strftime("%I:%M"),
         ]
-        c.add_row(self.table_name, row_data)
+
+    def add_row_to_entry_table(self, entry: Entry) -> None:
+        """
+        Helper to add entry to the table
+        :param entry: A single entry to convert to entries table
+        :return: New row attached to the Entries##table
+        """
+        c.add_row(self.table_name, self.entry_row(entry))
+
+
+class PagedEntryTable(EntryTable):
+    """
+    Virtualised entries table that only holds one page of rows, newest first.
+
+    Pages are fetched lazily from page_source with keyset cursors, so widget work is bounded
+    by page_size no matter how long the history is. Newer/Older pager buttons move between
+    pages. New entries are inserted at the top while the newest page is showing.
+    """
+
+    def __init__(self, page_size: int = 50):
+        """
+        :param page_size: Rows materialised in the table at once
+        """
+        super().__init__()
+        self.page_size = page_size
+        self.page_source: Optional[PageSource] = None
+        self.count_source: Optional[Callable[[], int]] = None
+        self.cursor_source: Callable[[Entry], PageCursor] = self.entry_cursor
+        self.page_keys: List[Optional[PageCursor]] = [None]
+        self.visible: List[Entry] = list()
+        self.total = 0
+
+    def create_table(
+        self,
+        input_data: EntryCollection,
+        page_source: Optional[PageSource] = None,
+        count_source: Optional[Callable[[], int]] = None,
+        cursor_source: Optional[Callable[[Entry], PageCursor]] = None,
+    ) -> None:
+        """
+        Creates pager controls and table widget, then loads the newest page
+        :param input_data: Collection the parent appends to, only its version is used
+        :param page_source: Callable(limit, before) returning a newest first page of entries,
+            typically wrapping Database.get_entries_page
+        :param count_source: Callable returning the total number of entries to page through
+        :param cursor_source: Callable returning the cursor page_source takes to continue
+            after an entry, entry_cursor by default
+        :return: Table loaded with the first page
+        """
+        self.page_source = page_source
+        self.count_source = count_source
+        if cursor_source is not None:
+            self.cursor_source = cursor_source
+        self.prior_version = input_data.version
+        c.add_button("Newer##EntriesPager", callback=self.newer_page)
+        c.add_same_line()
+        c.add_button("Older##EntriesPager", callback=self.older_page)
+        c.add_same_line()
+        c.add_text("PageLabel##EntriesPager", default_value="")
+        c.add_table(
+            self.table_name,
+            headers=["Project", "Description", "Duration", "Start", "End"],
+        )
+        self.reset()
+
+    def render(self, entries: EntryCollection) -> None:
+        """
+        Inserts appended entries at the top of the newest page, reloads on any other change
+        :param entries: Entries passed in parent class
+        :return: Updated table
+        """
+        new_entries = entries.changes_since(self.prior_version)
+        if new_entries is not None and not new_entries:
+            return
+        self.prior_version = entries.version
+
+        if new_entries is None:
+            self.reset()
+            return
+
+        self.total += len(new_entries)
+        if len(self.page_keys) == 1:
+            for entry in new_entries:
+                self.visible.insert(0, entry)
+                c.insert_row(self.table_name, 0, self.entry_row(entry))
+            while len(self.visible) > self.page_size:
+                self.visible.pop()
+                c.delete_row(self.table_name, len(self.visible))
+        self.update_page_label()
+
+    def reset(self) -> None:
+        """
+        Goes back to the newest page and refreshes the total count
+        """
+        self.page_keys = [None]
+        self.total = self.count_source() if self.count_source is not None else 0
+        self.load_page()
+
+    def load_page(self) -> None:
+        """
+        Fetches the current page from page_source and swaps the table rows
+        """
+        self.visible = list(self.page_source(self.page_size, self.page_keys[-1]))
+        c.clear_table(self.table_name)
+        for entry in self.visible:
+            self.add_row_to_entry_table(entry)
+        self.update_page_label()
+
+    def older_page(self, *_args) -> None:
+        """
+        Pager callback, moves to the next older page if the current one is full
+        """
+        if len(self.visible) < self.page_size:
+            return
+        self.page_keys.append(self.cursor_source(self.visible[-1]))
+        self.load_page()
+
+    @staticmethod
+    def entry_cursor(entry: Entry) -> PageCursor:
+        """
+        Database.get_entries_page cursor, only for saved entries since it needs the id
+        """
+        return entry.start_time, entry.id
+
+    def newer_page(self, *_args) -> None:
+        """
+        Pager callback, moves back one page towards the newest entries
+        """
+        if len(self.page_keys) == 1:
+            return
+        self.page_keys.pop()
+        self.load_page()
+
+    def update_page_label(self) -> None:
+        """
+        Shows the current page number and total entry count
+        """
+        page_count = max(1, -(-self.total // self.page_size))
+        c.set_value(
+            "PageLabel##EntriesPager",
+            f"Page {len(self.page_keys)} of {page_count} ({self.total} entries)",
+        )
 
 
 task_chart = Chart()
+analytics_plots = AnalyticsPlots()
 entry_table = EntryTable()
+paged_entry_table = PagedEntryTable()
@@ -0,0 +1,76 @@
+""" Contains the window shown while an older timer.db is migrated """
+from typing import Optional
+
+import dearpygui.core as c
+import dearpygui.simple as s
+
+from clockpuncher.database_opener import MigrationProgress
+
+
+class MigrationWindow:
+    """
+    Progress bar fed by DatabaseOpener.progress, shown in place of the main window until
+    the database is open
+    """
+
+    def __init__(self, suffix: str = "migration"):
+        """
+        :param suffix: Hidden ## suffix of the window and its items' names
+        """
+        self.window_name = f"Upgrading##{suffix}"
+        self.status_name = f"Status##{suffix}"
+        self.bar_name = f"Progress##{suffix}"
+        self.prior_progress: Optional[MigrationProgress] = None
+        self.error_shown = False
+
+    def create_window(self, width: int = 700, height: int = 800):
+        """
+        Creates the window with an empty progress bar
+        :param width: pixel width of the window
+        :param height: pixel height of the window
+        """
+        with s.window(
+            self.window_name,
+            x_pos=0,
+            y_pos=0,
+            width=width,
+            height=height,
+            no_close=True,
+            no_title_bar=True,
+            no_resize=True,
+            no_move=True,
+        ):
+            c.add_text(self.status_name, default_value="Upgrading timer.db...")
+            c.add_progress_bar(self.bar_name, value=0.0, width=-1)
+
+    def render(self, progress: Optional[MigrationProgress]):
+        """
+        Updates the status text and progress bar when a backfill chunk finished
+        :param progress: Latest report, None while nothing reported yet
+        """
+        if progress is None or progress == self.prior_progress:
+            return
+        self.prior_progress = progress
+        c.set_value(self.status_name, str(progress))
+        c.set_value(self.bar_name, progress.fraction)
+        c.configure_item(self.bar_name, overlay=f"{progress.fraction:.0%}")
+
+    def show_error(self, error: BaseException):
+        """
+        Replaces the progress with why the database could not be opened
+        :param error: Error Database raised
+        """
+        if self.error_shown:
+            return
+        self.error_shown = True
+        c.set_value(self.status_name, f"Could not open timer.db: {error}")
+        c.configure_item(self.bar_name, show=False)
+
+    def delete(self):
+        """
+        Removes the window once the database is open
+        """
+        c.delete_item(self.window_name)
+
+
+migration_window = MigrationWindow()
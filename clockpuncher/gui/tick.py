@@ -0,0 +1,61 @@
+""" Contains the once per second tick scheduler for the render callback """
+import time
+from typing import Callable, Optional, Tuple
+
+
+class TickScheduler:
+    """
+    Decides when per-second work is due and throttles idle frames.
+
+    DearPyGUI calls the render callback every frame, but the timer face only changes once a
+    second. tick reports True only when the whole second counted from origin rolls over, so
+    digit formatting and status polling run once per second instead of once per frame.
+    throttle sleeps inside the render callback while idle to cap the frame rate.
+    """
+
+    def __init__(
+        self,
+        idle_frame_time: float = 1 / 15,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        :param idle_frame_time: Min seconds per frame in idle mode, 1/15 keeps menus usable
+        :param clock: Wall clock in seconds, swappable for testing
+        :param sleep: Sleep function, swappable for testing
+        """
+        self.idle_frame_time = idle_frame_time
+        self.clock = clock
+        self.sleep = sleep
+        self.prior_tick: Optional[Tuple[float, int]] = None
+        self.prior_frame = clock()
+
+    def tick(self, origin: float = 0.0) -> bool:
+        """
+        Checks whether a new whole second has started since origin
+        :param origin: Timestamp seconds are counted from, the start time while tracking
+            or 0 for the wall clock
+        :return: True on the first frame of each new second or when origin changes
+        """
+        current = (origin, int(self.clock() - origin))
+        if current == self.prior_tick:
+            return False
+        self.prior_tick = current
+        return True
+
+    def invalidate(self) -> None:
+        """
+        Forces the next tick to report True, use after a state change such as starting the timer
+        """
+        self.prior_tick = None
+
+    def throttle(self, idle: bool) -> None:
+        """
+        Sleeps out the rest of the idle frame budget, call once at the end of each frame
+        :param idle: True when nothing is animating, e.g. the timer is not tracking
+        """
+        if idle:
+            remaining = self.idle_frame_time - (self.clock() - self.prior_frame)
+            if remaining > 0:
+                self.sleep(remaining)
+        self.prior_frame = self.clock()
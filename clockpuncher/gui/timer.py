@@ -1,7 +1,7 @@
 """ Contains module for timer face """
 import datetime
 from enum import Enum
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 import dearpygui.core as c
 import dearpygui.simple as s
@@ -38,138 +38,140 @@ class Digit(set, Enum):
     num_0 = num_8.difference({"center"})
 
 
+DIGITS: Dict[str, Digit] = {str(number): Digit[f"num_{number}"] for number in range(10)}
+
+
+SHAPES: Dict[Direction, List[Tuple[float, float]]] = {
+    Direction.left: [(0.0, 0.0), (20.0, 20.0), (20.0, 60.0), (0.0, 80.0)],
+    Direction.up: [(0.0, 0.0), (20.0, 20.0), (60.0, 20.0), (80.0, 0.0)],
+    Direction.down: [(80.0, 20.0), (60.0, 0.0), (20.0, 0.0), (0.0, 20.0)],
+    Direction.right: [(20.0, 0.0), (0.0, 20.0), (0.0, 60.0), (20.0, 80.0)],
+    Direction.center: [
+        (0.0, 10.0),
+        (10.0, 0.0),
+        (50.0, 0.0),
+        (60.0, 10.0),
+        (50.0, 20.0),
+        (10.0, 20.0),
+        (0.0, 10.0),
+    ],
+}
+
+# Segment tag: (x_offset, y_offset, direction) inside a number box
+SEGMENT_LAYOUT: Dict[str, Tuple[float, float, Direction]] = {
+    "top": (3, 0, Direction.up),
+    "top_left": (0, 3, Direction.left),
+    "top_right": (66, 3, Direction.right),
+    "center": (13, 64.5, Direction.center),
+    "bottom_left": (0, 66.6, Direction.left),
+    "bottom_right": (66, 66.6, Direction.right),
+    "bottom": (3, 129.6, Direction.down),
+}
+
+
+def segment_points(
+    x_offset: float = 0, y_offset: float = 0, direction: Direction = Direction.left
+) -> List[List[float]]:
+    """
+    Translates a segment shape into position inside the number box
+    :param x_offset: x translation magnitude, as x gets larger, the line shifts right
+    :param y_offset: y translation magnitude, as y increases the line shifts down
+    :param direction: Which type of line to render
+    :return: Polygon points ready for c.draw_polygon
+    """
+    return [[x + x_offset, y + y_offset] for x, y in SHAPES[direction]]
+
+
+SEGMENT_POINTS: Dict[str, List[List[float]]] = {
+    tag: segment_points(*layout) for tag, layout in SEGMENT_LAYOUT.items()
+}
+
+
 class Number:
     """
-    Class for creating a single 'digital' number display
+    Class for creating a single 'digital' number display.
+
+    All seven segments are drawn once when the box is built. Rendering a new digit only
+    recolours the segments that differ from the previous digit.
     """
 
-    def __init__(self, canvas="Drawing", color=None):
+    def __init__(self, canvas="Drawing", color=None, off_color=None):
+        """
+        :param canvas: Drawing name, must be unique per cell
+        :param color: Fill of lit segments
+        :param off_color: Fill of unlit segments, transparent by default
+        """
         self.canvas = canvas
         self.prior_num = None
+        self.lit_segments = frozenset()
         self.nums = Digit
         if not color:
             self.color = [120, 255, 120]
         else:
             self.color = color
-
-        self.line_trigger = self._line_trigger()
-
-        for key, value in self.line_trigger.items():
-            setattr(self, key, value)
-
-    def _line_trigger(
-        self,
-    ) -> Dict[str, callable]:
-        """
-        This holds the specific values to render all lines for the numbers
-        :return: callable dict
-        """
-        return {
-            "top": lambda: self.regular_line(
-                x_offset=3, direction=Direction.up, tag="top"
-            ),
-            "top_left": lambda: self.regular_line(y_offset=3, tag="top_left"),
-            "top_right": lambda: self.regular_line(
-                x_offset=66, y_offset=3, direction=Direction.right, tag="top_right"
-            ),
-            "center": lambda: self.regular_line(
-                x_offset=13, y_offset=64.5, direction=Direction.center, tag="center"
-            ),
-            "bottom_left": lambda: self.regular_line(y_offset=66.6, tag="bottom_left"),
-            "bottom_right": lambda: self.regular_line(
-                x_offset=66,
-                y_offset=66.6,
-                direction=Direction.right,
-                tag="bottom_right",
-            ),
-            "bottom": lambda: self.regular_line(
-                x_offset=3, y_offset=129.6, direction=Direction.down, tag="bottom"
-            ),
-        }
-
-    def get(self, attribute: str):
-        """
-        Fetches attribute by string name
-        :param attribute: attribute name
-        :return: the attribute value
-        """
-        return getattr(self, attribute)
+        if not off_color:
+            self.off_color = [255, 255, 255, 0]
+        else:
+            self.off_color = off_color
 
     def render(self, new_lines, num):
         """
-        Takes in draw commands and a number value, if the number is new, render new lines
-        :param new_lines: New lines to render
+        Takes in draw commands and a number value, if the number is new, toggles changed lines
+        :param new_lines: Lines that should be lit
         :param num: Prior number rendered - this is the rendered number but it could be an ID
-        :return: updated canvas to render the new_lines
+        :return: updated canvas with only the differing segments modified
         """
-
         if num == self.prior_num:
             return
-        self.clear()
-        for line in new_lines:
-            draw_line = self.get(line)
-            draw_line()
+        for line in self.lit_segments.symmetric_difference(new_lines):
+            self.set_segment(line, line in new_lines)
+        self.lit_segments = frozenset(new_lines)
         self.prior_num = num
 
     def clear(self):
         """
-        Clears the canvas drawing
+        Unlights every segment
         """
-        c.clear_drawing(self.canvas)
-
-    def regular_line(
-        self,
-        x_offset=0,
-        y_offset=0,
-        direction: Direction = Direction.left,
-        tag: str = None,
-    ):
+        for line in self.lit_segments:
+            self.set_segment(line, False)
+        self.lit_segments = frozenset()
+        self.prior_num = None
+
+    def set_segment(self, tag: str, lit: bool):
         """
-        Creates a line in the number box in the digital clock format
-        :param x_offset: x translation magnitude, as x gets larger, the line shifts right
-        :param y_offset: y translation magnitude, as y increases the line shifts down
-        :param direction: Which type of line to render
-        :param tag: string to tag the line with
-        :return: drawn polygon on self.canvas
+        Recolours one already drawn segment
+        :param tag: Segment tag from SEGMENT_LAYOUT
+        :param lit: Fill with color if True, off_color otherwise
         """
-        if tag is None:
-            tag = str(direction.value)
-        translate = lambda coords: [coords[0] + x_offset, coords[1] + y_offset]
-
-        if direction == Direction.left:
-            position = [(0.0, 0.0), (20.0, 20.0), (20.0, 60.0), (0.0, 80.0)]
-        elif direction == Direction.up:
-            position = [(0.0, 0.0), (20.0, 20.0), (60.0, 20.0), (80.0, 0.0)]
-        elif direction == Direction.down:
-            position = [(80.0, 20.0), (60.0, 0.0), (20.0, 0.0), (0.0, 20.0)]
-        elif direction == Direction.right:
-            position = [(20.0, 0.0), (0.0, 20.0), (0.0, 60.0), (20.0, 80.0)]
-        else:
-            position = [
-                (0.0, 10.0),
-                (10.0, 0.0),
-                (50.0, 0.0),
-                (60.0, 10.0),
-                (50.0, 20.0),
-                (10.0, 20.0),
-                (0.0, 10.0),
-            ]
+        c.modify_draw_command(
+            self.canvas, tag, fill=self.color if lit else self.off_color
+        )
 
+    def draw_segment(self, tag: str):
+        """
+        Draws one unlit segment polygon from the cached geometry
+        :param tag: Segment tag from SEGMENT_LAYOUT, also used as the draw command tag
+        :return: drawn polygon on self.canvas
+        """
         c.draw_polygon(
             self.canvas,
-            points=list(map(translate, position)),
+            points=SEGMENT_POINTS[tag],
             color=[255, 255, 255, 0],
-            fill=self.color,
+            fill=self.off_color,
             tag=tag,
         )
 
     def build_number_box(self, group="timergroup"):
         """
-        Creates a single number drawing
+        Creates a single number drawing with all segments drawn unlit
         :param group: Group to put drawing in
         :return: Drawing number box ready to render
         """
         c.add_drawing(self.canvas, width=90, height=150, parent=group)
+        for tag in SEGMENT_POINTS:
+            self.draw_segment(tag)
+        self.lit_segments = frozenset()
+        self.prior_num = None
 
     def run(self):
         """
@@ -217,45 +219,38 @@ class Timer:
             (self.min_0, self.min_1),
             (self.sec_0, self.sec_1),
         ]
+        self.cells = [cell for section in self.display for cell in section]
+        self.prior_digits = None
 
     @staticmethod
-    def process_timedelta(timedelta: datetime.timedelta) -> List[str]:
+    def time_digits(time_to_render: Union[datetime.datetime, datetime.timedelta]) -> str:
         """
-        Returns a length 8 str ready for processing
-        :param timedelta: Timedelta to render
-        :return: 8 len string to render
+        Formats a time as 6 HHMMSS digits with integer math, no strftime or str(timedelta)
+        :param time_to_render: Datetime or positive timedelta, timedeltas wrap at 24 hours
+        :return: 6 character digit string
         """
-        time_str = str(timedelta)
-        if len(time_str) > 8:
-            # Handles > 24 hour timedelta
-            time_str = time_str.split(" ")[-1]
-
-        if 14 <= len(time_str) <= 15:
-            # handles sub-second resolution
-            time_str = time_str.split(".")[0]
-        result_list = time_str.split(":")
-
-        if len(time_str) == 7:
-            # Handles sub 10 hour timers
-            result_list[0] = "0" + result_list[0]
-
-        return result_list
+        if isinstance(time_to_render, datetime.timedelta):
+            minutes, seconds = divmod(time_to_render.seconds, 60)
+            hours, minutes = divmod(minutes, 60)
+        else:
+            hours = time_to_render.hour
+            minutes = time_to_render.minute
+            seconds = time_to_render.second
+        return f"{hours:02d}{minutes:02d}{seconds:02d}"
 
     def render(
         self, *_args, time_to_render: Union[datetime.datetime, datetime.timedelta]
     ):
         """
-        Renders timedelta or datetime onto the display
+        Renders timedelta or datetime onto the display, only touching cells whose digit changed
         :return: Updated timer display
         """
-        select_num = lambda number: f"num_{number}"
-        if isinstance(time_to_render, datetime.timedelta):
-            time_string = self.process_timedelta(time_to_render)
-        else:
-            time_string = time_to_render.strftime("%H_%M_%S").split("_")
-        for digits_in_time, display_numbers in zip(time_string, self.display):
-            for single_digit, single_cell in zip(digits_in_time, display_numbers):
-                single_cell.render(Digit[select_num(single_digit)], single_digit)
+        digits = self.time_digits(time_to_render)
+        if digits == self.prior_digits:
+            return
+        self.prior_digits = digits
+        for single_digit, single_cell in zip(digits, self.cells):
+            single_cell.render(DIGITS[single_digit], single_digit)
 
     def create_timer(self, **kwargs):
         """
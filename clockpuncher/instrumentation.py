@@ -0,0 +1,177 @@
+""" Contains low overhead timers for profiling render components and database calls """
+import functools
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, Iterator, NamedTuple, Optional
+
+
+class TimingSummary(NamedTuple):
+    """
+    Rolling statistics for one instrumented name, in milliseconds
+    """
+
+    count: int
+    p50: float
+    p95: float
+    max: float
+
+
+def _percentile(sorted_values, fraction: float):
+    """
+    Nearest rank percentile of an already sorted sequence
+    :param sorted_values: Ascending values, must not be empty
+    :param fraction: 0 to 1, e.g. 0.95
+    :return: Value at that rank
+    """
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class RollingTimer:
+    """
+    Keeps the last window durations in nanoseconds. Recording is a deque append so it is cheap
+    enough to run every frame, percentiles are only computed when summary is asked for.
+    """
+
+    def __init__(self, window: int = 600):
+        """
+        :param window: Number of most recent samples kept, 600 is ~10 seconds at 60 fps
+        """
+        self.samples: Deque[int] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, duration_ns: int) -> None:
+        """
+        Adds one sample
+        :param duration_ns: Duration from time.perf_counter_ns
+        """
+        self.samples.append(duration_ns)
+        self.count += 1
+
+    def summary(self) -> TimingSummary:
+        """
+        p50, p95 and max over the rolling window plus the all time sample count
+        """
+        samples = sorted(self.samples)
+        if not samples:
+            return TimingSummary(self.count, 0.0, 0.0, 0.0)
+        return TimingSummary(
+            count=self.count,
+            p50=_percentile(samples, 0.50) / 1e6,
+            p95=_percentile(samples, 0.95) / 1e6,
+            max=samples[-1] / 1e6,
+        )
+
+
+class Instrumentation:
+    """
+    Named rolling timers plus helpers to wrap functions and object methods with them
+    """
+
+    def __init__(self, window: int = 600):
+        """
+        :param window: Samples kept per timer
+        """
+        self.window = window
+        self.timers: Dict[str, RollingTimer] = dict()
+
+    def timer(self, name: str) -> RollingTimer:
+        """
+        Fetches or creates the timer for name
+        :param name: Timer name, e.g. "db.get_all_entries"
+        """
+        rolling_timer = self.timers.get(name)
+        if rolling_timer is None:
+            rolling_timer = self.timers.setdefault(name, RollingTimer(self.window))
+        return rolling_timer
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        """
+        Times the body of a with block under name
+        :param name: Timer name
+        """
+        rolling_timer = self.timer(name)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            rolling_timer.record(time.perf_counter_ns() - start)
+
+    def wrap(self, func: Callable, name: Optional[str] = None) -> Callable:
+        """
+        Wraps func so every call is recorded
+        :param func: Function or bound method to time
+        :param name: Timer name, defaults to func.__qualname__
+        :return: Wrapped function
+        """
+        rolling_timer = self.timer(name or func.__qualname__)
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                rolling_timer.record(time.perf_counter_ns() - start)
+
+        return timed
+
+    def instrument(
+        self, obj, prefix: str, method_names: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Replaces methods on an instance with timed versions, the class is left untouched
+        :param obj: Instance to instrument
+        :param prefix: Timer name prefix, timers are named "prefix.method"
+        :param method_names: Methods to wrap, defaults to every public method
+        """
+        if method_names is None:
+            method_names = [
+                name
+                for name in dir(type(obj))
+                if not name.startswith("_") and callable(getattr(type(obj), name))
+            ]
+        for method_name in method_names:
+            method = getattr(obj, method_name)
+            setattr(obj, method_name, self.wrap(method, f"{prefix}.{method_name}"))
+
+    def summaries(self) -> Dict[str, TimingSummary]:
+        """
+        Summaries of every timer that has recorded at least once, sorted by name
+        """
+        return {
+            name: rolling_timer.summary()
+            for name, rolling_timer in sorted(self.timers.items())
+            if rolling_timer.count
+        }
+
+    def to_json(self) -> str:
+        """
+        Serializes summaries for regression comparison between runs
+        :return: JSON object of name to {count, p50, p95, max} in milliseconds
+        """
+        return json.dumps(
+            {name: summary._asdict() for name, summary in self.summaries().items()},
+            indent=2,
+        )
+
+    def export_json(self, path: Path) -> Path:
+        """
+        Writes to_json output to path
+        :param path: File to write
+        :return: path written
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_json())
+        return path
+
+    def reset(self) -> None:
+        """
+        Drops every timer
+        """
+        self.timers.clear()
@@ -1,19 +1,52 @@
 """ Entrypoint and GUI definition for the Clockpuncher app """
 import datetime
-from typing import Optional
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 import dearpygui.core as c
 import dearpygui.simple as s
 
+from clockpuncher.allotment import WINDOWS, AllotmentTracker
+from clockpuncher.billing import compute_billing, total_billed, totals_by
+from clockpuncher.change_watcher import ChangeWatcher
 from clockpuncher.database import Database
-from clockpuncher.gui import entry_table, settings_menu, task_chart, timer_display
+from clockpuncher.database_opener import DatabaseOpener
+from clockpuncher.gui import (
+    analytics_plots,
+    migration_window,
+    paged_entry_table,
+    settings_menu,
+    task_chart,
+    timer_display,
+)
 from clockpuncher.gui.base_gui import BaseGUI
-from clockpuncher.models import Entry, Project
+from clockpuncher.gui.dev_gui import (
+    start_instrumentation_window,
+    update_instrumentation_window,
+)
+from clockpuncher.gui.tick import TickScheduler
+from clockpuncher.instrumentation import Instrumentation
+from clockpuncher.models import Entry, EntryCollection, Project
 from clockpuncher.platform_local_storage import (
+    INSTRUMENTATION_EXPORT_PATH,
     destroy_development_files,
     initialize_development_files,
     initialize_production_files,
 )
+from clockpuncher.time_index import (
+    TimeIndex,
+    day_start,
+    month_start,
+    pay_period_bounds,
+    week_start,
+)
+from clockpuncher.write_behind import WriteBehindQueue
+
+RANGE_FILTERS = ("Today", "This Week", "This Month", "Pay Period", "All Time")
+# Seconds the writer gets to save queued entries once the window is closed
+SHUTDOWN_TIMEOUT = 10.0
+# Seconds run waits for the database to open before showing migration progress instead
+OPEN_WAIT = 0.5
 
 
 class ClockPuncher(BaseGUI):
@@ -36,12 +69,48 @@ class ClockPuncher(BaseGUI):
         """
         super().__init__(**kwargs)
 
-        self.db = Database(development=self.development)
-
-        self.entries = self.db.get_all_entries(True)
+        # Opening an older timer.db migrates it, run shows the progress meanwhile
+        self.opener = DatabaseOpener(development=self.development).start()
+        self.db: Optional[Database] = None
+        self.instrumentation: Optional[Instrumentation] = None
+        self.writer: Optional[WriteBehindQueue] = None
+        self.watcher: Optional[ChangeWatcher] = None
+        self.prior_save_status = None
+
+        self.entry_range = (None, None)
+        self.entries = EntryCollection()
+        self.known_ids: Set[int] = set()
+        self.unacknowledged: List[Entry] = list()
         self.selected_project = None
+        self.ticks = TickScheduler()
+        self.rendered_version = None
+        self.billed_version = None
         self.initialize_tracking_data()
 
+    def start_session(self) -> None:
+        """
+        Starts the writer and change watcher and loads entries, once the database is open.
+        Raises whatever opening the database raised.
+        """
+        self.db = self.opener.result()
+        if self.development:
+            self.instrument()
+        self.writer = WriteBehindQueue(self.db).start()
+        # Started before loading so nothing committed in between is missed
+        self.watcher = ChangeWatcher(self.db.db.engine.url.database)
+        self.reload_entries()
+
+    def instrument(self) -> None:
+        """
+        Times every Database method and each render component, development mode only
+        """
+        self.instrumentation = Instrumentation()
+        self.instrumentation.instrument(self.db, "db")
+        self.instrumentation.instrument(task_chart, "task_chart", ["render"])
+        self.instrumentation.instrument(paged_entry_table, "entry_table", ["render"])
+        self.instrumentation.instrument(timer_display, "timer_display", ["render"])
+        self.instrumentation.instrument(analytics_plots, "analytics_plots", ["render"])
+
     @staticmethod
     def initialize_tracking_data():
         """
@@ -114,6 +183,7 @@ class ClockPuncher(BaseGUI):
         """
         self.save_new_entry()
         self.set_start_time()
+        self.ticks.invalidate()
         c.set_value("Description", "")
 
     def flip_timer_state(self, *_args):
@@ -133,10 +203,12 @@ class ClockPuncher(BaseGUI):
         s.set_item_label("Start Timer", label=label)
         self.set_tracking()
         self.set_start_time()
+        self.ticks.invalidate()
 
     def save_new_entry(self) -> None:
         """
-        Inserts timer entry to entries table
+        Queues timer entry for the background writer and shows it straight away.
+        The entry's id is filled in by the writer once it is committed.
         """
         entry_to_insert = Entry(
             id=None,
@@ -145,8 +217,80 @@ class ClockPuncher(BaseGUI):
             start_time=self.start_time,
             end_time=datetime.datetime.now(),
         )
-        entry = self.db.add_entry(entry_to_insert, return_value=True)
-        self.entries = [*self.entries, entry]
+        self.writer.submit(entry_to_insert)
+        self.unacknowledged.append(entry_to_insert)
+        self.show_entry(entry_to_insert)
+
+    def show_entry(self, entry: Entry) -> None:
+        """
+        Adds a new entry to the time index and allotments, and to the displayed entries if
+        it is inside the filtered range
+        :param entry: Entry saved here or found by the change watcher
+        """
+        self.time_index.add(entry)
+        self.allotments.add(entry)
+        range_start, range_end = self.entry_range
+        if (range_start is None or range_start <= entry.start_time) and (
+            range_end is None or entry.start_time < range_end
+        ):
+            self.entries.append(entry)
+
+    def reload_entries(self) -> None:
+        """
+        Reloads every entry and the allotment history from the database
+        """
+        loaded_entries = self.db.get_all_entries(True)
+        self.known_ids = {entry.id for entry in loaded_entries}
+        self.unacknowledged.clear()
+        self.time_index = TimeIndex(loaded_entries)
+        self.allotments = AllotmentTracker(self.db.get_all_projects(True))
+        self.allotments.seed(self.db.get_daily_totals(start=self.allotments.oldest_week))
+        self.entries.replace(self.time_index.between(*self.entry_range))
+
+    def sync_external_changes(self) -> None:
+        """
+        Picks up entries written by other processes, e.g. scripts or manual edits of
+        timer.db. Appends are shown incrementally, edited and deleted entries are swapped
+        for their current rows. Everything is reloaded only if the watcher fell behind.
+        Waits until the writer has flushed so this app's own rows can be recognised by id.
+        """
+        if self.writer.status.pending:
+            return
+        changes = self.watcher.poll()
+        if changes is None:
+            return
+        if changes.reload:
+            self.reload_entries()
+            return
+        self.known_ids.update(entry.id for entry in self.unacknowledged)
+        self.unacknowledged.clear()
+        for entry in changes.new_entries:
+            if entry.id not in self.known_ids:
+                self.known_ids.add(entry.id)
+                self.show_entry(entry)
+        if changes.edited:
+            self.apply_external_edits(changes.edited, changes.edited_entries)
+
+    def apply_external_edits(
+        self, edited: Dict[int, Optional[datetime.datetime]], edited_entries: List[Entry]
+    ) -> None:
+        """
+        Replaces entries another process edited or deleted with their current rows
+        :param edited: Entry id -> start_time it had here, see ExternalChanges.edited
+        :param edited_entries: Current rows of the edited ids that still exist
+        """
+        for entry_id, start_time in edited.items():
+            self.known_ids.discard(entry_id)
+            if start_time is None:
+                continue
+            removed = self.time_index.remove(entry_id, start_time)
+            if removed is not None:
+                self.allotments.remove(removed)
+        for entry in edited_entries:
+            self.known_ids.add(entry.id)
+            self.time_index.add(entry)
+            self.allotments.add(entry)
+        self.entries.replace(self.time_index.between(*self.entry_range))
 
     def save_new_project(self, *_args):
         """
@@ -157,7 +301,9 @@ class ClockPuncher(BaseGUI):
         # pylint: disable=no-member
         for val in Project.__annotations__:
             project_data[val] = c.get_value(f"{val}##new_project")
-        self.db.add_project(Project(**project_data, id=None))
+        project = Project(**project_data, id=None)
+        self.db.add_project(project)
+        self.allotments.set_project(project)
         c.delete_item("Projects##ProjectMenu", children_only=True)
         for name in self.db.get_project_names():
             c.add_menu_item(
@@ -221,12 +367,47 @@ class ClockPuncher(BaseGUI):
     def run(self, width: int = 700, height: int = 800, **kwargs):
         # pylint: disable=arguments-differ
         """
-        GUI definition and runs dearpygui
+        GUI definition and runs dearpygui. If the database isn't open within OPEN_WAIT
+        seconds, e.g. an older timer.db is being migrated, a progress window is shown until
+        it is.
         :param width: pixel width of main window
         :param height: pixel height of main window
         :param kwargs: any simple.window kwargs
         :return:GUI although more probably 'void'
         """
+        if self.opener.wait(OPEN_WAIT):
+            self.start_session()
+            self.create_main_window(width, height, **kwargs)
+        else:
+            migration_window.create_window(width, height)
+            create_main_window = partial(self.create_main_window, width, height, **kwargs)
+            c.set_render_callback(partial(self.render_opening, create_main_window))
+        c.start_dearpygui()
+
+    def render_opening(self, create_main_window: Callable[[], None], *_args):
+        """
+        Render callback while the database opens, shows migration progress then swaps in
+        the main window
+        :param create_main_window: create_main_window with run's arguments
+        """
+        if not self.opener.wait(0):
+            migration_window.render(self.opener.progress)
+        elif self.opener.error is not None:
+            migration_window.show_error(self.opener.error)
+        else:
+            migration_window.delete()
+            self.start_session()
+            create_main_window()
+            return
+        self.ticks.throttle(idle=True)
+
+    def create_main_window(self, width: int, height: int, **kwargs):
+        """
+        Builds the main window and hands the render callback to render
+        :param width: pixel width of main window
+        :param height: pixel height of main window
+        :param kwargs: any simple.window kwargs
+        """
         if self.development:
             x_pos = 300
         else:
@@ -253,12 +434,12 @@ class ClockPuncher(BaseGUI):
                         )
                     c.add_menu_item("Add project", callback=self.create_new_project)
                 with s.menu("Range##FilterMenu"):
-                    c.add_menu_item(
-                        name="Today", callback=self.filter_entries, check=False
-                    )
-                    c.add_menu_item(
-                        name="All Time", callback=self.filter_entries, check=True
-                    )
+                    for name in RANGE_FILTERS:
+                        c.add_menu_item(
+                            name=name,
+                            callback=self.filter_entries,
+                            check=name == "All Time",
+                        )
                 settings_menu.create_menu()
 
             c.add_spacing(count=40)
@@ -268,44 +449,207 @@ class ClockPuncher(BaseGUI):
             c.add_button(name="Start Timer", callback=self.flip_timer_state)
             c.add_same_line()
             c.add_button(name="Switch Task", callback=self.switch_task, show=False)
+            c.add_same_line()
+            c.add_text("SaveStatus##writer", default_value="")
 
             c.add_spacing()
-            entry_table.create_table(input_data=self.entries)
+            paged_entry_table.create_table(
+                input_data=self.entries,
+                page_source=self.fetch_entry_page,
+                count_source=self.count_entries,
+                cursor_source=self.time_index_cursor,
+            )
             c.add_spacing()
             task_chart.create_chart(
                 data=[0.2, 0.5, 0.3], labels=self.db.get_project_names()
             )
+            analytics_plots.create_plots()
+            c.add_text("TotalBilled##billing", default_value="")
+            c.add_table(
+                "Allotment##table",
+                headers=["Project", "This Week", "Allotment"]
+                + [f"{weeks} Weeks" for weeks in WINDOWS],
+            )
         timer_display.create_timer(x_pos=(x_pos + 60), y_pos=20)
+        if self.instrumentation is not None:
+            start_instrumentation_window(
+                self.instrumentation, INSTRUMENTATION_EXPORT_PATH
+            )
+            self.render_frame = self.instrumentation.wrap(self.render_frame, "frame")
         c.set_render_callback(self.render)
-        c.start_dearpygui()
 
     def render(self, *_args):
         """
-        Updates timer text continuously and updates task_chart on entries update
+        Render callback, draws the frame then throttles frames while not tracking
+        """
+        tracking = self.render_frame()
+        self.ticks.throttle(idle=not tracking)
+
+    def render_frame(self) -> bool:
+        """
+        Chart and table only re-render when entries change, the timer and save status once
+        per second
+        :return: Whether the timer is tracking
+        """
+        entries_changed = self.entries.version != self.rendered_version
+        if entries_changed:
+            self.rendered_version = self.entries.version
+            task_chart.render(self.entries, self.range_totals_query())
+            paged_entry_table.render(self.entries)
+            analytics_plots.render(self.entries)
+
+        tracking = self.tracking
+        origin = self.start_time.timestamp() if tracking else 0.0
+        if self.ticks.tick(origin):
+            self.sync_external_changes()
+            self.render_save_status()
+            self.render_total_billed()
+            self.render_allotments(tracking)
+            if self.instrumentation is not None:
+                update_instrumentation_window(self.instrumentation)
+            if tracking:
+                timer_display.render(time_to_render=self.time_delta)
+            else:
+                timer_display.render(time_to_render=datetime.datetime.now())
+        elif entries_changed:
+            self.render_save_status()
+        return tracking
+
+    def range_totals_query(self) -> Optional[Callable[[], List[Tuple[str, float]]]]:
+        """
+        Task chart totals for the filtered range, summed in SQLite. None while the writer
+        holds queued or failed entries SQLite doesn't have, the chart then sums the
+        in-memory range instead. Never flushes, so rendering doesn't wait on disk.
+        """
+        status = self.writer.status
+        if status.pending or status.failed:
+            return None
+        return partial(self.db.project_duration_totals, *self.entry_range)
+
+    def render_save_status(self) -> None:
+        """
+        Shows the background writer's flush status next to the timer buttons on change
+        """
+        save_status = str(self.writer.status)
+        if save_status != self.prior_save_status:
+            self.prior_save_status = save_status
+            c.set_value("SaveStatus##writer", save_status)
+
+    def render_total_billed(self) -> None:
+        """
+        Recomputes Total Billed for the filtered range once entries changed and are all saved
+        """
+        if self.billed_version == self.entries.version or self.writer.status.pending:
+            return
+        self.billed_version = self.entries.version
+        range_start, range_end = self.entry_range
+        billing_lines = compute_billing(
+            self.db,
+            range_start.date() if range_start else None,
+            range_end.date() if range_end else None,
+        )
+        per_client = ", ".join(
+            f"{client or 'No client'} {amount:,.2f}"
+            for client, amount in totals_by(billing_lines, "client").items()
+        )
+        c.set_value(
+            "TotalBilled##billing",
+            f"Total Billed: {total_billed(billing_lines):,.2f} ({per_client})",
+        )
+
+    def render_allotments(self, tracking: bool) -> None:
         """
-        task_chart.render(self.entries)
-        entry_table.render(self.entries)
-        if self.tracking:
-            timer_display.render(time_to_render=self.time_delta)
-        else:
-            timer_display.render(time_to_render=datetime.datetime.now())
+        Refreshes hours used against weekly allotments, the running timer counts towards
+        the selected project
+        :param tracking: Whether the timer is running
+        """
+        running_project = self.selected_project or ""
+        running_seconds = self.time_delta.total_seconds() if tracking else 0.0
+        c.clear_table("Allotment##table")
+        for project_name in self.allotments.project_names():
+            status = self.allotments.status(
+                project_name,
+                running_seconds if project_name == running_project else 0.0,
+            )
+            row = [
+                project_name or "No project",
+                f"{status.week_hours:.1f}h",
+                f"{status.allotment_hours}h",
+            ]
+            for weeks in WINDOWS:
+                utilisation = status.utilisation(weeks)
+                row.append("-" if utilisation is None else f"{utilisation:.0%}")
+            c.add_row("Allotment##table", row)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Flushes queued entries to the database, call after the GUI exits
+        :param timeout: Max seconds to wait
+        :return: True if everything was saved, also when the database never finished opening
+        """
+        if self.writer is None:
+            return True
+        self.watcher.close()
+        return self.writer.close(timeout)
+
+    def fetch_entry_page(self, limit: int, before=None):
+        """
+        Newest first page of entries in the currently filtered range for the entries table
+        :param limit: Page size
+        :param before: time_index_cursor of the last row on the previous page
+        :return: List of entries
+        """
+        return self.time_index.page(limit, before, *self.entry_range)
+
+    def time_index_cursor(self, entry: Entry) -> Tuple[datetime.datetime, int]:
+        """
+        Page cursor of a row in the entries table, works for entries still being saved
+        """
+        return self.time_index.cursor(entry)
+
+    def count_entries(self) -> int:
+        """
+        Number of entries in the currently filtered range, saved or still queued
+        """
+        return self.time_index.count(*self.entry_range)
+
+    def range_bounds(
+        self, name: str, now: Optional[datetime.datetime] = None
+    ) -> Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]:
+        """
+        Half-open start_time bounds for one of the RANGE_FILTERS menu items
+        :param name: Menu item name
+        :param now: Reference time, defaults to now
+        :return: (start, end) with None for an open side
+        """
+        now = now or datetime.datetime.now()
+        if name == "Today":
+            return day_start(now), None
+        if name == "This Week":
+            return week_start(now), None
+        if name == "This Month":
+            return month_start(now), None
+        if name == "Pay Period":
+            monthly_frequency = 2
+            if self.selected_project:
+                projects = self.db.get_multi_projects(
+                    True, project_name=self.selected_project
+                )
+                if projects:
+                    monthly_frequency = projects[0].monthly_frequency
+            return pay_period_bounds(now, monthly_frequency)
+        return None, None
 
     def filter_entries(self, sender, _data):
         """
-        Filters entries into this week or just today for display
-        :param sender: Sender to call this
-        :return: self.entries is updated to reflect entries from today
+        Filters entries to one of the RANGE_FILTERS from the in-memory time index
+        :param sender: Menu item that called this
+        :return: self.entries is replaced with entries in the selected range
         """
-        if sender == "All Time":
-            self.entries = self.db.get_all_entries(True)
-            c.configure_item("All Time", check=True)
-            c.configure_item("Today", check=False)
-
-        elif sender == "Today":
-            new_entries = self.db.get_entries_today(True)
-            self.entries = new_entries
-            c.configure_item("All Time", check=False)
-            c.configure_item("Today", check=True)
+        self.entry_range = self.range_bounds(sender)
+        self.entries.replace(self.time_index.between(*self.entry_range))
+        for name in RANGE_FILTERS:
+            c.configure_item(name, check=name == sender)
 
 
 def main(development=False):
@@ -322,6 +666,12 @@ def main(development=False):
     # Create GUI
     gui = ClockPuncher(development=development)
     gui.run()
+    if not gui.close(timeout=SHUTDOWN_TIMEOUT):
+        status = gui.writer.status
+        reason = f": {status.last_error}" if status.last_error else ", timed out"
+        print(f"{status.pending + status.failed} entries were not saved{reason}")
+        for entry in gui.writer.failed_entries:
+            print(entry)
 
     # Teardown Development Files
     if development:
@@ -341,6 +691,45 @@ if __name__ == "__main__":
         action="store_true",
         help="Launch in development mode with a fresh database that is wiped on next launch.",
     )
+    parser.add_argument(
+        "--backfill-rollup",
+        default=False,
+        action="store_true",
+        help="Rebuild the daily_rollup table from all entries and exit.",
+    )
+    parser.add_argument(
+        "--migrate-timestamps",
+        default=False,
+        action="store_true",
+        help="Convert stored text timestamps to integer epoch microseconds and exit. "
+        "Safe to interrupt and rerun, close other ClockPuncher windows before it finishes.",
+    )
+    parser.add_argument(
+        "--rebuild-tables",
+        default=False,
+        action="store_true",
+        help="Rebuild tables made by older versions with NOT NULL columns and exit. "
+        "Needs free disk for a copy of timer.db, safe to interrupt and rerun.",
+    )
     args = parser.parse_args()
 
-    main(development=args.development)
+    if args.backfill_rollup or args.migrate_timestamps or args.rebuild_tables:
+        if args.development:
+            initialize_development_files()
+        else:
+            initialize_production_files()
+    if args.backfill_rollup:
+        rollup_rows = Database(development=args.development).backfill_daily_rollup()
+        print(f"Backfilled {rollup_rows} daily_rollup rows")
+    elif args.migrate_timestamps:
+        migrated = Database(development=args.development).migrate_timestamps(
+            progress=lambda copied, total: print(f"Copied {copied:,} of {total:,} entries")
+        )
+        print(f"Migrated {migrated:,} entries to epoch timestamps")
+    elif args.rebuild_tables:
+        rebuilt = Database(development=args.development).rebuild_tables(
+            progress=lambda table, copied, total: print(f"Copied {copied:,} of {total:,} {table}")
+        )
+        print(f"Rebuilt {', '.join(rebuilt) or 'no tables'}")
+    else:
+        main(development=args.development)
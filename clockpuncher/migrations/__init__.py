@@ -0,0 +1,30 @@
+""" Contains the versioned schema migrations Database applies when it opens a file """
+from typing import List
+
+from clockpuncher.migrations import m0001_typed_schema, m0002_entry_edit_log
+from clockpuncher.migrations.runner import (
+    BACKFILL_CHUNK_SIZE,
+    Backfill,
+    Migration,
+    MigrationContext,
+    TableRebuild,
+    apply_migrations,
+    backfill_bounds,
+    covered_sql,
+    current_version,
+    finish_backfill,
+    record_migrations,
+    run_backfill,
+    start_backfill,
+    start_rebuild,
+    swap_rebuild,
+)
+from clockpuncher.migrations.typed_tables import loose_table_rebuilds, missing_start_rollup
+
+# In version order, new migrations go at the end as mNNNN_<name>.py modules.
+# New databases are created from schema.py and marked as having applied all of them.
+MIGRATIONS: List[Migration] = [
+    m0001_typed_schema.MIGRATION,
+    m0002_entry_edit_log.MIGRATION,
+]
+LATEST_VERSION = MIGRATIONS[-1].version
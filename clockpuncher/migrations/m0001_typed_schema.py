@@ -0,0 +1,62 @@
+""" 1: the schema.py objects, for databases made before schema_version existed """
+from functools import partial
+
+from clockpuncher.migrations.runner import (
+    Backfill,
+    Migration,
+    MigrationContext,
+    backfill_bounds,
+    covered_sql,
+    finish_backfill,
+    start_backfill,
+)
+from clockpuncher.schema import (
+    DAILY_ROLLUP_DDL,
+    daily_rollup_backfill,
+    daily_rollup_triggers,
+    schema_objects,
+)
+
+
+def upgrade(context: MigrationContext) -> None:
+    """
+    Creates whatever object is missing next to the tables dataset inferred, which are
+    left as they are so the file doesn't need room for a second copy of them, see
+    Database.rebuild_tables. A missing daily_rollup is filled by a chunked backfill, so
+    nothing holds the write lock for long, with triggers counting the entries its
+    backfill has passed or that are added meanwhile.
+    """
+    db, timestamps = context.db, context.db.timestamps
+    rollup = Backfill(
+        "daily_rollup",
+        # Entries of dataset inferred tables may lack a start_time, no day to credit
+        daily_rollup_backfill(
+            timestamps, where="id > :after_id AND id <= :upto_id AND start_time IS NOT NULL"
+        ),
+    )
+    rollup_objects = {"daily_rollup", *daily_rollup_triggers(timestamps)}
+    names = context.object_names()
+    fill_rollup = "daily_rollup" not in names or backfill_bounds(db, rollup) is not None
+
+    # One transaction per object, so the write lock is held for one index build at a time
+    for name, statements in schema_objects(timestamps).items():
+        if name not in names and not (fill_rollup and name in rollup_objects):
+            with db.write_transaction():
+                context.execute(statements)
+    if not fill_rollup:
+        return
+
+    with db.write_transaction():
+        context.execute([DAILY_ROLLUP_DDL])
+        start_backfill(db, rollup)
+        context.execute(daily_rollup_triggers(timestamps, partial(covered_sql, rollup)).values())
+
+    context.backfill(rollup)
+    with db.write_transaction():
+        triggers = rollup_objects - {"daily_rollup"}
+        context.execute(f"DROP TRIGGER IF EXISTS {name}" for name in triggers)
+        context.execute(daily_rollup_triggers(timestamps).values())
+        finish_backfill(db, rollup)
+
+
+MIGRATION = Migration(1, "explicit schema objects", upgrade)
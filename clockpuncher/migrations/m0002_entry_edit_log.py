@@ -0,0 +1,20 @@
+""" 2: entry_edit_log, so watchers re-read only the entries another process edited """
+from clockpuncher.migrations.runner import Migration, MigrationContext
+from clockpuncher.schema import ENTRY_EDIT_LOG_DDL, ENTRY_EDIT_LOG_TRIGGERS
+
+# The single row counter entry_edit_log replaces, and the triggers that bumped it
+OLD_TRIGGERS = ("entries_edits_update", "entries_edits_delete")
+
+
+def upgrade(context: MigrationContext) -> None:
+    """
+    Swaps the entry_edits counter for entry_edit_log in one transaction, edits made by
+    other processes from then on are logged
+    """
+    with context.db.write_transaction():
+        context.execute(f"DROP TRIGGER IF EXISTS {name}" for name in OLD_TRIGGERS)
+        context.execute(["DROP TABLE IF EXISTS entry_edits", ENTRY_EDIT_LOG_DDL])
+        context.execute(ENTRY_EDIT_LOG_TRIGGERS.values())
+
+
+MIGRATION = Migration(2, "entry edit log", upgrade)
@@ -0,0 +1,340 @@
+""" Contains the migration runner and the resumable chunked backfills migrations run """
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from clockpuncher.schema import SCHEMA_VERSION_DDL
+
+if TYPE_CHECKING:
+    from clockpuncher.database import Database
+
+# Rows rewritten per backfill transaction, small enough that other processes get the
+# write lock back within their busy_timeout
+BACKFILL_CHUNK_SIZE = 10_000
+
+# One row per backfill in flight. end_id is the highest id when it started, rows above it
+# are left to triggers. last_id is the highest id rewritten and committed so far.
+BACKFILL_PROGRESS_DDL = """
+CREATE TABLE IF NOT EXISTS backfill_progress (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL,
+    end_id INTEGER NOT NULL
+)
+"""
+# Rows of the next chunk, at most :limit ids after :after_id up to :end_id
+BACKFILL_CHUNK_QUERY = """
+SELECT COUNT(*) AS row_count, MAX(id) AS upto_id FROM (
+    SELECT id FROM {table} WHERE id > :after_id AND id <= :end_id ORDER BY id LIMIT :limit
+)
+"""
+
+
+class Backfill(NamedTuple):
+    """
+    A rewrite of every row a table held when it started, applied in id order one short
+    write transaction per chunk. chunk_sql runs once per chunk with :after_id and :upto_id
+    bound and must only touch rows with after_id < id <= upto_id.
+    """
+
+    name: str
+    chunk_sql: str
+    table: str = "entries"
+
+
+def covered_sql(backfill: Backfill, row: str) -> str:
+    """
+    SQL condition for triggers running next to a backfill, true when the row is one the
+    backfill already rewrote or one added after it started. Rows in between are picked up
+    in their current state when the backfill reaches them, so triggers must skip them.
+    :param backfill: Backfill in flight
+    :param row: NEW or OLD
+    """
+    progress = f"FROM backfill_progress WHERE name = '{backfill.name}'"
+    return (
+        f"({row}.id <= (SELECT last_id {progress}) OR {row}.id > (SELECT end_id {progress}))"
+    )
+
+
+def start_backfill(db: "Database", backfill: Backfill) -> None:
+    """
+    Records where a backfill starts and ends, unless it is already in flight.
+    Call inside the write_transaction creating the triggers that run next to it.
+    """
+    db.db.query(BACKFILL_PROGRESS_DDL)
+    db.db.query(
+        "INSERT OR IGNORE INTO backfill_progress (name, last_id, end_id) "
+        f"SELECT :name, 0, COALESCE(MAX(id), 0) FROM {backfill.table}",
+        name=backfill.name,
+    )
+
+
+def backfill_bounds(db: "Database", backfill: Backfill) -> Optional[Tuple[int, int]]:
+    """
+    (last_id, end_id) of a backfill in flight, None if it isn't
+    """
+    # pylint: disable=protected-access
+    if "backfill_progress" not in db._schema_object_names():
+        return None
+    row = next(
+        iter(
+            db.db.query(
+                "SELECT last_id, end_id FROM backfill_progress WHERE name = :name",
+                name=backfill.name,
+            )
+        ),
+        None,
+    )
+    return row and (row["last_id"], row["end_id"])
+
+
+def run_backfill(
+    db: "Database",
+    backfill: Backfill,
+    chunk_size: int = BACKFILL_CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """
+    Runs a started backfill to its end_id. Every chunk commits together with its progress
+    row, so an interrupted run picks up after the last committed chunk.
+    :param db: Database to run on
+    :param backfill: Backfill passed to start_backfill
+    :param chunk_size: Rows per transaction
+    :param progress: Called with (rows done, rows in the backfill) after every chunk
+    :return: Rows in the backfill
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive int, not {chunk_size}")
+    last_id, end_id = backfill_bounds(db, backfill)
+    count_query = f"SELECT COUNT(*) FROM {backfill.table} WHERE id <= :upto_id"
+    total = db._scalar(count_query, upto_id=end_id)  # pylint: disable=protected-access
+    done = db._scalar(count_query, upto_id=last_id)  # pylint: disable=protected-access
+    chunk_query = BACKFILL_CHUNK_QUERY.format(table=backfill.table)
+    while last_id < end_id:
+        with db.write_transaction():
+            chunk = next(
+                iter(
+                    db.db.query(chunk_query, after_id=last_id, end_id=end_id, limit=chunk_size)
+                )
+            )
+            # Rows past the last one left were deleted meanwhile, nothing more to do
+            upto_id = chunk["upto_id"] if chunk["row_count"] == chunk_size else end_id
+            db.db.query(backfill.chunk_sql, after_id=last_id, upto_id=upto_id)
+            db.db.query(
+                "UPDATE backfill_progress SET last_id = :upto_id WHERE name = :name",
+                upto_id=upto_id,
+                name=backfill.name,
+            )
+        last_id = upto_id
+        done += chunk["row_count"]
+        if progress is not None:
+            progress(done, total)
+    return total
+
+
+def finish_backfill(db: "Database", backfill: Backfill) -> None:
+    """
+    Forgets a completed backfill. Call inside the write_transaction that replaces the
+    triggers guarded with covered_sql, they stop firing once its row is gone.
+    """
+    db.db.query("DELETE FROM backfill_progress WHERE name = :name", name=backfill.name)
+
+
+class TableRebuild(NamedTuple):
+    """
+    Copies a table into a new definition in id order, then swaps the copy in. Used for
+    changes SQLite can't ALTER, e.g. column types or NOT NULL. Other processes keep using
+    the old table meanwhile, triggers mirror their writes to rows already copied. Needs
+    free disk for a second copy of the table until the swap.
+    """
+
+    table: str
+    copy_table: str
+    # CREATE TABLE IF NOT EXISTS for copy_table
+    ddl: str
+    # Column of copy_table -> SQL expression over {row}, a row of table
+    columns: Dict[str, str]
+    # Rows of table to copy, over {row}
+    where: str = "1"
+
+    @property
+    def backfill(self) -> Backfill:
+        """
+        Backfill copying one chunk of ids, its name is copy_table
+        """
+        return Backfill(
+            self.copy_table,
+            f"{self._insert()} SELECT {self._values(self.table)} FROM {self.table} "
+            f"WHERE {self.where.format(row=self.table)} "
+            "AND id > :after_id AND id <= :upto_id",
+            self.table,
+        )
+
+    def _insert(self) -> str:
+        return f"INSERT OR REPLACE INTO {self.copy_table} ({', '.join(self.columns)})"
+
+    def _values(self, row: str) -> str:
+        return ", ".join(expression.format(row=row) for expression in self.columns.values())
+
+    def mirror_triggers(self) -> List[str]:
+        """
+        Triggers copying writes to rows the backfill has passed. Inserts normally land past
+        its end_id, except for ids reused after a delete.
+        """
+        copied = f"(SELECT last_id FROM backfill_progress WHERE name = '{self.copy_table}')"
+        where = self.where.format(row="NEW")
+        copy = f"{self._insert()} SELECT {self._values('NEW')} WHERE {where};"
+        remove = f"DELETE FROM {self.copy_table} WHERE id = OLD.id;"
+        prefix = f"CREATE TRIGGER IF NOT EXISTS {self.copy_table}_mirror"
+        return [
+            f"{prefix}_insert AFTER INSERT ON {self.table} "
+            f"WHEN NEW.id <= {copied} BEGIN {copy} END",
+            f"{prefix}_update AFTER UPDATE ON {self.table} "
+            f"WHEN OLD.id <= {copied} BEGIN {remove} {copy} END",
+            f"{prefix}_delete AFTER DELETE ON {self.table} BEGIN {remove} END",
+        ]
+
+
+def start_rebuild(db: "Database", rebuild: TableRebuild) -> None:
+    """
+    Creates the copy, its backfill and mirror triggers unless already in flight.
+    Call inside write_transaction, then run_backfill(db, rebuild.backfill).
+    """
+    db.db.query(rebuild.ddl)
+    start_backfill(db, rebuild.backfill)
+    for trigger in rebuild.mirror_triggers():
+        db.db.query(trigger)
+
+
+def swap_rebuild(db: "Database", rebuild: TableRebuild) -> None:
+    """
+    Copies rows added since the backfill started and replaces the table with the copy.
+    The old table's indexes and triggers, mirror triggers included, are dropped with it,
+    so recreate them in the same write_transaction.
+    """
+    _, end_id = backfill_bounds(db, rebuild.backfill)
+    db.db.query(rebuild.backfill.chunk_sql, after_id=end_id, upto_id=2 ** 63 - 1)
+    finish_backfill(db, rebuild.backfill)
+    db.db.query(f"DROP TABLE {rebuild.table}")
+    db.db.query(f"ALTER TABLE {rebuild.copy_table} RENAME TO {rebuild.table}")
+
+
+class MigrationContext:
+    """
+    What a migration's upgrade function gets to work with
+    """
+
+    def __init__(
+        self,
+        db: "Database",
+        description: str,
+        chunk_size: int = BACKFILL_CHUNK_SIZE,
+        progress: Optional[Callable[[str, int, int], None]] = None,
+    ):
+        """
+        :param db: Database being migrated, db.timestamps is its storage mode
+        :param description: Description of the migration, passed on to progress
+        :param chunk_size: Rows per backfill transaction
+        :param progress: Called with (description, rows done, rows total) after every chunk
+        """
+        self.db = db
+        self.description = description
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+    def object_names(self) -> Set[str]:
+        """
+        Names of every table, index, trigger and view in the database
+        """
+        return self.db._schema_object_names()  # pylint: disable=protected-access
+
+    def execute(self, statements: Iterable[str]) -> None:
+        """
+        Runs DDL or DML statements, call inside self.db.write_transaction
+        """
+        for statement in statements:
+            self.db.db.query(statement)
+
+    def backfill(self, backfill: Backfill) -> int:
+        """
+        Runs a backfill started with start_backfill, reporting progress per chunk
+        :return: Rows in the backfill
+        """
+        progress = self.progress and partial(self.progress, self.description)
+        return run_backfill(self.db, backfill, self.chunk_size, progress)
+
+
+class Migration(NamedTuple):
+    """
+    One step of the schema. upgrade may be rerun after an interruption, so it has to
+    pick up whatever an earlier run left behind: IF NOT EXISTS DDL, and backfills that
+    resume from backfill_progress.
+    """
+
+    version: int
+    description: str
+    upgrade: Callable[[MigrationContext], None]
+
+
+def current_version(db: "Database", object_names: Set[str]) -> int:
+    """
+    Highest migration version applied, 0 for databases made before schema_version
+    :param db: Database to check
+    :param object_names: Names from sqlite_master, saves reading it again
+    """
+    if "schema_version" not in object_names:
+        return 0
+    # pylint: disable=protected-access
+    return db._scalar("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+
+
+def record_migrations(db: "Database", migrations: Iterable[Migration]) -> None:
+    """
+    Marks migrations as applied, call inside write_transaction
+    """
+    db.db.query(SCHEMA_VERSION_DDL)
+    for migration in migrations:
+        db.db.query(
+            "INSERT OR IGNORE INTO schema_version (version, description) "
+            "VALUES (:version, :description)",
+            version=migration.version,
+            description=migration.description,
+        )
+
+
+def apply_migrations(
+    db: "Database",
+    migrations: List[Migration],
+    version: int,
+    chunk_size: int = BACKFILL_CHUNK_SIZE,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+) -> List[int]:
+    """
+    Upgrades a database through every migration newer than version, in order. Each is
+    recorded in schema_version once its upgrade returns.
+    :param db: Database to migrate
+    :param migrations: Every migration, in version order
+    :param version: Version the database is at, see current_version
+    :param chunk_size: Rows per backfill transaction
+    :param progress: Called with (description, rows done, rows total) after every chunk
+    :return: Versions applied
+    """
+    applied = list()
+    for migration in migrations:
+        if migration.version <= version:
+            continue
+        migration.upgrade(
+            MigrationContext(db, migration.description, chunk_size, progress)
+        )
+        with db.write_transaction():
+            record_migrations(db, [migration])
+        applied.append(migration.version)
+    return applied
@@ -0,0 +1,97 @@
+""" Contains the opt-in rebuilds of dataset inferred tables, see Database.rebuild_tables """
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+from clockpuncher.migrations.runner import TableRebuild
+from clockpuncher.schema import entries_ddl, projects_ddl
+from clockpuncher.timestamps import TimestampCodec
+
+if TYPE_CHECKING:
+    from clockpuncher.database import Database
+
+# Column -> value for NULLs or columns dataset never created, None to fall back on the
+# other timestamp column of the same row
+COLUMN_DEFAULTS = {
+    "projects": {
+        "project_name": "''",
+        "client": "''",
+        "rate": "0",
+        "monthly_frequency": "0",
+        "weekly_hour_allotment": "0",
+    },
+    "entries": {
+        "project_name": "''",
+        "description": "''",
+        "start_time": None,
+        "end_time": None,
+    },
+}
+
+
+def _table_info(db: "Database", table: str) -> Dict[str, bool]:
+    """
+    Column name -> whether it is declared NOT NULL
+    """
+    return {
+        row["name"]: bool(row["notnull"])
+        for row in db.db.query(f"SELECT * FROM pragma_table_info('{table}')")
+    }
+
+
+def _typed_rebuild(table: str, timestamps: TimestampCodec, columns: Iterable[str]) -> TableRebuild:
+    """
+    Copy of a dataset inferred table into the typed schema.py table, NULLs replaced
+    :param table: projects or entries
+    :param timestamps: Codec of the entries table
+    :param columns: Columns the existing table has
+    """
+    copy_table = f"{table}_typed"
+    if table == "projects":
+        ddl = projects_ddl(copy_table)
+    else:
+        ddl = entries_ddl(timestamps, copy_table)
+    expressions = {"id": "{row}.id"}
+    for column, default in COLUMN_DEFAULTS[table].items():
+        if default is None:
+            other = "end_time" if column == "start_time" else "start_time"
+            expressions[column] = f"COALESCE({{row}}.{column}, {{row}}.{other})"
+        elif column in columns:
+            expressions[column] = f"COALESCE({{row}}.{column}, {default})"
+        else:
+            expressions[column] = default
+    where = "1"
+    if table == "entries":
+        # Entries without either time can't be kept
+        where = "COALESCE({row}.start_time, {row}.end_time) IS NOT NULL"
+    return TableRebuild(table, copy_table, ddl, expressions, where)
+
+
+def loose_table_rebuilds(db: "Database") -> List[TableRebuild]:
+    """
+    Rebuilds for the tables dataset inferred, they have nullable or missing columns.
+    The old table stays in place until its rebuild swaps, so one in flight is found too.
+    """
+    names = db._schema_object_names()  # pylint: disable=protected-access
+    rebuilds = list()
+    for table in COLUMN_DEFAULTS:
+        if table not in names:
+            continue
+        columns = _table_info(db, table)
+        if not all(columns.get(column) for column in COLUMN_DEFAULTS[table]):
+            rebuilds.append(_typed_rebuild(table, db.timestamps, columns))
+    return rebuilds
+
+
+def missing_start_rollup(timestamps: TimestampCodec) -> str:
+    """
+    INSERT crediting the entries without a start_time, which migration 1 left out of
+    daily_rollup, to the day they ended. Their rebuilt rows start when they end, so they
+    add no seconds. Run it in the entries swap transaction, before the swap.
+    :param timestamps: Codec of the entries table
+    """
+    return f"""
+    INSERT INTO daily_rollup (day, project_name, total_seconds, entry_count)
+    SELECT {timestamps.day_sql("end_time")}, COALESCE(project_name, ''), 0, COUNT(*)
+    FROM entries WHERE start_time IS NULL AND end_time IS NOT NULL GROUP BY 1, 2
+    ON CONFLICT (day, project_name) DO UPDATE SET
+        entry_count = entry_count + excluded.entry_count
+    """
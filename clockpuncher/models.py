@@ -1,9 +1,30 @@
 """ database models used in database.py """
 import datetime
-import inspect
+import operator
 import struct
-from dataclasses import asdict, dataclass
-from typing import Generator, Optional, Any
+from array import array
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from itertools import compress
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from clockpuncher.timestamps import datetime_to_utc_us, utc_us_to_datetime
 
 
 @dataclass
@@ -41,6 +62,20 @@ class BaseModelClass:
         """
         return setattr(self, attribute, value)
 
+    @classmethod
+    def _field_annotations(cls) -> Dict[str, Any]:
+        """
+        Type annotations of every field except id, computed once per class
+        :return: Dict of attribute name to type annotation in field order
+        """
+        annotations = _ANNOTATION_CACHE.get(cls)
+        if annotations is None:
+            annotations = {
+                field.name: field.type for field in fields(cls) if field.name != "id"
+            }
+            _ANNOTATION_CACHE[cls] = annotations
+        return annotations
+
     def _check_if_annotation_matches(self) -> Generator:
         """
         Basic generator to iterate through attributes and check for match.
@@ -48,69 +83,215 @@ class BaseModelClass:
         This is so if overriding __post_init__ with class specific validation it'll be more modular
         :return: generator of attribute_name, type_annotation, and if the attribute value matches
         """
-        for attribute_name, type_annotation in inspect.getfullargspec(
-            self.__class__
-        ).annotations.items():
-            if attribute_name in {"return", "id"}:
-                continue
+        for attribute_name, type_annotation in self._field_annotations().items():
             yield attribute_name, type_annotation, isinstance(
                 self.get(attribute_name), type_annotation
             )
 
+    @classmethod
+    def _from_row(cls, row: Mapping):
+        """
+        Trusted constructor for rows read back from the database, skips validation.
+        datetime fields stored as text are parsed, everything else is taken as is.
+        :param row: Mapping with a key per field, e.g. a dataset row
+        :return: Instance of cls
+        """
+        return _compiled_for(cls).from_row(cls, row)
+
+    @classmethod
+    def _from_tuple(cls, row: Sequence):
+        """
+        Trusted constructor for raw row tuples selected in dataclass field order
+        :param row: Sequence of values ordered like dataclasses.fields(cls)
+        :return: Instance of cls
+        """
+        return _compiled_for(cls).from_tuple(cls, row)
+
     def __post_init__(self):
         """
-        Validates that all attributes except ID match their type annotation
+        Validates that all attributes except ID match their type annotation.
+        The validator is generated from the annotations once per class, see _compile_validator
         :return: None or raises error with count, list, and info about attribute problems
         """
+        _compiled_for(self.__class__).validate(self)
 
-        create_type_error_str = lambda attr, type_anno: (
-            f"\tAttribute {attr} must match type {type_anno}"
-            f"\n\t\tReceived: {self.get(attr)} of type {type(self.get(attr))} type!"
-        )
-        create_int8_error_str = lambda attr, int8error: (
-            f"\t Attribute {attr} cannot be converted to int8 (value: {self.get(attr)})"
-            f"\n\t\t struct.error - {int8error.args[0]}"
+
+class _CompiledModel(NamedTuple):
+    """
+    Per class functions generated from the dataclass annotations
+    """
+
+    validate: Callable
+    from_row: Callable
+    from_tuple: Callable
+
+
+_ANNOTATION_CACHE: Dict[type, Dict[str, Any]] = dict()
+_COMPILED_MODELS: Dict[type, _CompiledModel] = dict()
+_INT8_MIN, _INT8_MAX = -(2 ** 63), 2 ** 63 - 1
+
+
+def _type_error_str(instance: BaseModelClass, attr: str, type_anno: type) -> str:
+    """
+    Error line for an attribute that doesn't match its annotation
+    """
+    return (
+        f"\tAttribute {attr} must match type {type_anno}"
+        f"\n\t\tReceived: {instance.get(attr)} of type {type(instance.get(attr))} type!"
+    )
+
+
+def _int8_error_str(instance: BaseModelClass, attr: str) -> str:
+    """
+    Error line for an int attribute that doesn't fit in int8, message taken from struct
+    """
+    try:
+        struct.pack("q", instance.get(attr))
+        message = "argument out of range"
+    except struct.error as int8error:
+        message = int8error.args[0]
+    return (
+        f"\t Attribute {attr} cannot be converted to int8 (value: {instance.get(attr)})"
+        f"\n\t\t struct.error - {message}"
+    )
+
+
+def _raise_attribute_errors(attribute_fail_list: List[str]) -> None:
+    """
+    Raises AttributeError with count, list, and info about attribute problems
+    """
+    final_error_str = "\n\n".join(
+        (
+            f"{len(attribute_fail_list)} invalid attributes:",
+            *attribute_fail_list,
         )
+    )
+    raise AttributeError(final_error_str)
+
+
+def _coerce_datetime(value: Any) -> Optional[datetime.datetime]:
+    """
+    Tries to parse an ISO format string into a datetime
+    :param value: Value that failed the datetime isinstance check
+    :return: datetime or None if value can't be coerced
+    """
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return None
 
-        attribute_fail_list = list()
-        for (
-            attribute_name,
-            type_annotation,
-            type_match_check,
-        ) in self._check_if_annotation_matches():
-            if type_match_check is False:
-                if (type_annotation is datetime.datetime) and (
-                    isinstance(self.get(attribute_name), str)
-                ):
-                    try:
-                        coerced_datetime_check = datetime.datetime.fromisoformat(
-                            self.get(attribute_name)
-                        )
-                        if isinstance(coerced_datetime_check, datetime.datetime):
-                            self.set(attribute_name, coerced_datetime_check)
-                            continue
-                    except ValueError:
-                        pass
-
-                attribute_fail_list.append(
-                    create_type_error_str(attribute_name, type_annotation)
-                )
-            elif type_annotation is int:
-                try:
-                    struct.pack("q", self.get(attribute_name))
-                except struct.error as int8error:
-                    attribute_fail_list.append(
-                        create_int8_error_str(attribute_name, int8error)
-                    )
-
-        if attribute_fail_list:
-            final_error_str = "\n\n".join(
-                (
-                    f"{len(attribute_fail_list)} invalid attributes:",
-                    *attribute_fail_list,
-                )
+
+def _compile_validator(annotations: Dict[str, Any]) -> Callable:
+    """
+    Generates a validate(self) function with one straight line check per field, so the
+    per instance cost is a handful of isinstance calls instead of reflection.
+    Behaviour matches the original loop: datetime fields accept ISO strings and are coerced,
+    int fields must fit in a signed 8 byte int.
+    :param annotations: attribute name to type annotation
+    :return: validate function
+    """
+    namespace = dict(
+        _datetime=datetime.datetime,
+        _coerce_datetime=_coerce_datetime,
+        _type_error_str=_type_error_str,
+        _int8_error_str=_int8_error_str,
+        _raise_attribute_errors=_raise_attribute_errors,
+        _INT8_MIN=_INT8_MIN,
+        _INT8_MAX=_INT8_MAX,
+    )
+    lines = ["def validate(self):", "    failures = []"]
+    for idx, (name, annotation) in enumerate(annotations.items()):
+        type_ref = f"_type_{idx}"
+        namespace[type_ref] = annotation
+        lines.append(f"    value = self.{name}")
+        lines.append(f"    if not isinstance(value, {type_ref}):")
+        if annotation is datetime.datetime:
+            lines.append("        coerced = _coerce_datetime(value)")
+            lines.append("        if coerced is None:")
+            lines.append(
+                f"            failures.append(_type_error_str(self, {name!r}, {type_ref}))"
+            )
+            lines.append("        else:")
+            lines.append(f"            self.{name} = coerced")
+        else:
+            lines.append(
+                f"        failures.append(_type_error_str(self, {name!r}, {type_ref}))"
             )
-            raise AttributeError(final_error_str)
+        if annotation is int:
+            lines.append("    elif not _INT8_MIN <= value <= _INT8_MAX:")
+            lines.append(f"        failures.append(_int8_error_str(self, {name!r}))")
+    lines.append("    if failures:")
+    lines.append("        _raise_attribute_errors(failures)")
+
+    exec("\n".join(lines), namespace)  # pylint: disable=exec-used
+    return namespace["validate"]
+
+
+def _compile_row_builders(
+    field_names: List[str], datetime_fields: Set[str]
+) -> Tuple[Callable, Callable]:
+    """
+    Generates from_row(cls, row) and from_tuple(cls, row) that set __dict__ directly
+    :param field_names: All dataclass field names in order
+    :param datetime_fields: Fields that need text or epoch microseconds turned into datetime
+    :return: from_row and from_tuple functions
+    """
+    namespace = dict(
+        _new=object.__new__,
+        _datetime=datetime.datetime,
+        _str=str,
+        _fromisoformat=datetime.datetime.fromisoformat,
+        _from_utc_us=utc_us_to_datetime,
+    )
+
+    def builder_source(function_name: str, lookups: List[str]) -> List[str]:
+        lines = [f"def {function_name}(cls, row):", "    instance = _new(cls)"]
+        values = list()
+        for name, lookup in zip(field_names, lookups):
+            if name in datetime_fields:
+                lines.append(f"    {name} = {lookup}")
+                lines.append(f"    if {name}.__class__ is _str:")
+                lines.append(f"        {name} = _fromisoformat({name})")
+                lines.append(f"    elif {name}.__class__ is not _datetime:")
+                lines.append(f"        {name} = _from_utc_us({name})")
+                values.append(f"{name!r}: {name}")
+            else:
+                values.append(f"{name!r}: {lookup}")
+        lines.append(f"    instance.__dict__ = {{{', '.join(values)}}}")
+        lines.append("    return instance")
+        return lines
+
+    source = "\n".join(
+        (
+            *builder_source("from_row", [f"row[{name!r}]" for name in field_names]),
+            *builder_source("from_tuple", [f"row[{idx}]" for idx in range(len(field_names))]),
+        )
+    )
+    exec(source, namespace)  # pylint: disable=exec-used
+    return namespace["from_row"], namespace["from_tuple"]
+
+
+def _compiled_for(cls: type) -> _CompiledModel:
+    """
+    Returns the generated functions for cls, building them on first use
+    :param cls: BaseModelClass dataclass subclass
+    :return: _CompiledModel
+    """
+    compiled = _COMPILED_MODELS.get(cls)
+    if compiled is None:
+        annotations = cls._field_annotations()  # pylint: disable=protected-access
+        field_names = [field.name for field in fields(cls)]
+        datetime_fields = {
+            name
+            for name, annotation in annotations.items()
+            if annotation is datetime.datetime
+        }
+        from_row, from_tuple = _compile_row_builders(field_names, datetime_fields)
+        compiled = _CompiledModel(_compile_validator(annotations), from_row, from_tuple)
+        _COMPILED_MODELS[cls] = compiled
+    return compiled
 
 
 @dataclass
@@ -151,3 +332,301 @@ class Project(BaseModelClass):
     rate: int
     client: str
     project_name: str
+
+
+_MISSING_ID = -1
+
+
+def _stored_to_utc_us(value: Union[datetime.datetime, str, int]) -> int:
+    """
+    Epoch microseconds of a timestamp as a database row holds it, ints pass through
+    :param value: datetime, ISO text or epoch microseconds
+    """
+    if value.__class__ is int:
+        return value
+    if value.__class__ is str:
+        value = datetime.datetime.fromisoformat(value)
+    return datetime_to_utc_us(value)
+
+
+class EntryBatch:
+    """
+    Column oriented container of entries.
+
+    Times are int64 arrays of microseconds since 1970-01-01 UTC, the same values epoch
+    storage keeps, see timestamps.py. Project names and descriptions are dictionary
+    encoded into int64 code arrays pointing at shared lookup tables. An entry costs ~40 bytes
+    instead of a full Entry with two datetimes, and column maths runs over the arrays.
+    Individual Entry objects are only built when indexed or iterated.
+    """
+
+    def __init__(
+        self,
+        projects: Optional[List[str]] = None,
+        descriptions: Optional[List[str]] = None,
+    ):
+        """
+        :param projects: Shared project name lookup table, new batches start with their own
+        :param descriptions: Shared description lookup table
+        """
+        self.ids = array("q")
+        self.start_us = array("q")
+        self.end_us = array("q")
+        self.project_codes = array("q")
+        self.description_codes = array("q")
+        self.projects: List[str] = list() if projects is None else projects
+        self.descriptions: List[str] = list() if descriptions is None else descriptions
+        self._project_lookup = {name: code for code, name in enumerate(self.projects)}
+        self._description_lookup = {
+            text: code for code, text in enumerate(self.descriptions)
+        }
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Entry]) -> "EntryBatch":
+        """
+        Builds a batch from Entry objects
+        :param entries: Iterable of Entry
+        :return: EntryBatch
+        """
+        batch = cls()
+        batch.extend(entries)
+        return batch
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "EntryBatch":
+        """
+        Builds a batch straight from database rows without creating Entry objects
+        :param rows: (id, project_name, description, start_time, end_time) sequences,
+            times either datetime, ISO text or epoch microseconds
+        :return: EntryBatch
+        """
+        batch = cls()
+        for entry_id, project_name, description, start_time, end_time in rows:
+            batch._append_values(
+                entry_id,
+                project_name,
+                description,
+                _stored_to_utc_us(start_time),
+                _stored_to_utc_us(end_time),
+            )
+        return batch
+
+    def _encode(self, value: str, table: List[str], lookup: Dict[str, int]) -> int:
+        """
+        Returns the dictionary code for value, adding it to the table if new
+        """
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(table)
+            table.append(value)
+        return code
+
+    def _append_values(
+        self,
+        entry_id: Optional[int],
+        project_name: str,
+        description: str,
+        start_us: int,
+        end_us: int,
+    ) -> None:
+        """
+        Appends one row worth of values to every column
+        """
+        self.ids.append(_MISSING_ID if entry_id is None else entry_id)
+        self.start_us.append(start_us)
+        self.end_us.append(end_us)
+        self.project_codes.append(
+            self._encode(project_name, self.projects, self._project_lookup)
+        )
+        self.description_codes.append(
+            self._encode(description, self.descriptions, self._description_lookup)
+        )
+
+    def append(self, entry: Entry) -> None:
+        """
+        Appends a single Entry
+        :param entry: Entry to add
+        """
+        self._append_values(
+            entry.id,
+            entry.project_name,
+            entry.description,
+            datetime_to_utc_us(entry.start_time),
+            datetime_to_utc_us(entry.end_time),
+        )
+
+    def extend(self, entries: Iterable[Entry]) -> None:
+        """
+        Appends every Entry in entries
+        :param entries: Iterable of Entry
+        """
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[Entry, "EntryBatch"]:
+        """
+        Integer index materialises one Entry, a slice returns a new batch sharing lookup tables
+        """
+        if isinstance(item, slice):
+            return self._take(lambda column: column[item])
+        entry_id = self.ids[item]
+        return Entry._from_tuple(  # pylint: disable=protected-access
+            (
+                None if entry_id == _MISSING_ID else entry_id,
+                self.projects[self.project_codes[item]],
+                self.descriptions[self.description_codes[item]],
+                utc_us_to_datetime(self.start_us[item]),
+                utc_us_to_datetime(self.end_us[item]),
+            )
+        )
+
+    def __iter__(self) -> Iterator[Entry]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def _take(self, select: Callable[[array], Iterable[int]]) -> "EntryBatch":
+        """
+        Builds a batch sharing lookup tables from a selection applied to every column
+        :param select: Function mapping a column array to the selected values
+        :return: EntryBatch
+        """
+        batch = EntryBatch(self.projects, self.descriptions)
+        batch._project_lookup = self._project_lookup
+        batch._description_lookup = self._description_lookup
+        for column in (
+            "ids",
+            "start_us",
+            "end_us",
+            "project_codes",
+            "description_codes",
+        ):
+            setattr(batch, column, array("q", select(getattr(self, column))))
+        return batch
+
+    def filter(self, mask: Iterable[bool]) -> "EntryBatch":
+        """
+        Keeps rows where mask is truthy
+        :param mask: One bool per row
+        :return: EntryBatch
+        """
+        mask = list(mask)
+        return self._take(lambda column: compress(column, mask))
+
+    def between(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+    ) -> "EntryBatch":
+        """
+        Keeps rows whose start_time falls in [start, end)
+        :param start: Inclusive lower bound, None for unbounded
+        :param end: Exclusive upper bound, None for unbounded
+        :return: EntryBatch
+        """
+        lower = _INT8_MIN if start is None else datetime_to_utc_us(start)
+        upper = _INT8_MAX if end is None else datetime_to_utc_us(end)
+        return self.filter(lower <= start_us < upper for start_us in self.start_us)
+
+    def select_project(self, project_name: str) -> "EntryBatch":
+        """
+        Keeps rows belonging to project_name
+        :param project_name: Project name to match
+        :return: EntryBatch
+        """
+        code = self._project_lookup.get(project_name, _MISSING_ID)
+        return self.filter(map(code.__eq__, self.project_codes))
+
+    @property
+    def duration_us(self) -> array:
+        """
+        Per row duration in microseconds
+        :return: int64 array
+        """
+        return array("q", map(operator.sub, self.end_us, self.start_us))
+
+    @property
+    def duration(self) -> datetime.timedelta:
+        """
+        Summed duration of every row
+        :return: timedelta
+        """
+        return datetime.timedelta(microseconds=sum(self.end_us) - sum(self.start_us))
+
+    def project_durations(self) -> Dict[str, datetime.timedelta]:
+        """
+        Summed duration per project name
+        :return: Dict of project name to timedelta
+        """
+        totals: Dict[int, int] = dict()
+        for code, duration_us in zip(self.project_codes, self.duration_us):
+            totals[code] = totals.get(code, 0) + duration_us
+        return {
+            self.projects[code]: datetime.timedelta(microseconds=total)
+            for code, total in totals.items()
+        }
+
+
+class EntryCollection:
+    """
+    List-like holder of the entries shown in the GUI with a version counter and a log of
+    recent appends, so views can apply only what changed since the version they last saw.
+    """
+
+    def __init__(self, entries: Optional[Iterable[Entry]] = None, max_log: int = 1024):
+        """
+        :param entries: Initial entries
+        :param max_log: Appends remembered for delta consumers, older views fully rebuild
+        """
+        self._entries: List[Entry] = list(entries) if entries is not None else list()
+        self.version = 0
+        self._log: Deque[Tuple[int, Entry]] = deque(maxlen=max_log)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Entry]:
+        return iter(self._entries)
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[Entry, List[Entry]]:
+        return self._entries[item]
+
+    def append(self, entry: Entry) -> None:
+        """
+        Appends entry and records it in the delta log
+        :param entry: Entry to add
+        """
+        self._entries.append(entry)
+        self.version += 1
+        self._log.append((self.version, entry))
+
+    def extend(self, entries: Iterable[Entry]) -> None:
+        """
+        Appends every entry, each one is its own version
+        :param entries: Entries to add
+        """
+        for entry in entries:
+            self.append(entry)
+
+    def replace(self, entries: Iterable[Entry]) -> None:
+        """
+        Swaps in a whole new set of entries, e.g. on a filter change. Views fully rebuild.
+        :param entries: New entries
+        """
+        self._entries = list(entries)
+        self.version += 1
+        self._log.clear()
+
+    def changes_since(self, version: Optional[int]) -> Optional[List[Entry]]:
+        """
+        Entries appended after version
+        :param version: Version the caller last rendered, None if it never rendered
+        :return: List of appended entries, empty if unchanged, None if a full rebuild is needed
+        """
+        if version == self.version:
+            return list()
+        if version is None or not self._log or self._log[0][0] > version + 1:
+            return None
+        return [entry for entry_version, entry in self._log if entry_version > version]
@@ -11,6 +11,8 @@ DEVELOPMENT_DB_PATH = DATA_DIR_PATH / "development.db"
 
 PRODUCTION_DB_PATH = DATA_DIR_PATH / "timer.db"
 
+INSTRUMENTATION_EXPORT_PATH = DATA_DIR_PATH / "frame_timings.json"
+
 
 def _check_if_file_exists_or_create(file_to_init: Path) -> None:
     """
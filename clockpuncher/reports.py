@@ -0,0 +1,286 @@
+""" Contains a report runner that aggregates monthly partitions in worker processes """
+import datetime
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from clockpuncher.allotment import week_of
+from clockpuncher.billing import (
+    DEFAULT_MONTHLY_FREQUENCY,
+    BillingLine,
+    pay_period_of_day,
+    price_period,
+)
+from clockpuncher.connection_profiles import CONNECTION_PROFILES
+from clockpuncher.database import Database
+from clockpuncher.models import Project
+from clockpuncher.sqlite_reader import SQLiteReader
+from clockpuncher.time_index import month_start, next_month_start
+
+Partition = Tuple[datetime.datetime, datetime.datetime]
+# (project_name, week_start) and (project_name, period_start, period_end) -> [seconds, count]
+Partial = Tuple[Dict[Tuple, List], Dict[Tuple, List]]
+
+
+class ReportTotals(NamedTuple):
+    """
+    Summed time for one report bucket
+    """
+
+    seconds: float
+    entry_count: int
+
+    @property
+    def hours(self) -> float:
+        """
+        seconds / 3600
+        """
+        return self.seconds / 3600
+
+
+class Report(NamedTuple):
+    """
+    Merged aggregates, keys are sorted so equal inputs always give equal reports
+    """
+
+    weekly: Dict[Tuple[str, datetime.date], ReportTotals]
+    pay_periods: Dict[Tuple[str, datetime.date, datetime.date], ReportTotals]
+
+
+class UtilisationLine(NamedTuple):
+    """
+    Hours used against Project.weekly_hour_allotment in one week
+    """
+
+    project_name: str
+    week_start: datetime.date
+    hours: float
+    allotment_hours: int
+    utilisation: Optional[float]
+
+
+def month_partitions(start: datetime.datetime, end: datetime.datetime) -> List[Partition]:
+    """
+    Splits [start, end) into calendar month sized ranges, the first and last may be partial
+    :param start: Inclusive start
+    :param end: Exclusive end
+    :return: Half-open (start, end) ranges in order
+    """
+    partitions = list()
+    current = start
+    while current < end:
+        partition_end = min(next_month_start(current), end)
+        partitions.append((current, partition_end))
+        current = partition_end
+    return partitions
+
+
+def aggregate_partition(
+    db_path: str, partition: Partition, monthly_frequencies: Mapping[str, int]
+) -> Partial:
+    """
+    Hydrates and aggregates the entries of one partition on its own read-only connection.
+    Module level so ProcessPoolExecutor can pickle it.
+    :param db_path: sqlite file path
+    :param partition: Half-open start_time range
+    :param monthly_frequencies: Project name to pay periods per month
+    :return: (weekly, pay_periods) dicts of [seconds, entry_count]
+    """
+    reader = SQLiteReader(
+        db_path, CONNECTION_PROFILES["readonly-analytics"], read_only=True
+    )
+    weekly: Dict[Tuple, List] = defaultdict(lambda: [0.0, 0])
+    pay_periods: Dict[Tuple, List] = defaultdict(lambda: [0.0, 0])
+    period_cache = dict()
+    try:
+        entries = reader.iter_entries(
+            "WHERE start_time >= :start AND start_time < :end",
+            dict(start=partition[0], end=partition[1]),
+            "start_time, id",
+        )
+        for entry in entries:
+            seconds = (entry.end_time - entry.start_time).total_seconds()
+            day = entry.start_time.date()
+            frequency = monthly_frequencies.get(
+                entry.project_name, DEFAULT_MONTHLY_FREQUENCY
+            )
+            period = period_cache.get((day, frequency))
+            if period is None:
+                period = period_cache[(day, frequency)] = pay_period_of_day(
+                    day, frequency
+                )
+
+            week_totals = weekly[(entry.project_name, week_of(day))]
+            week_totals[0] += seconds
+            week_totals[1] += 1
+            period_totals = pay_periods[(entry.project_name, *period)]
+            period_totals[0] += seconds
+            period_totals[1] += 1
+    finally:
+        reader.close()
+    return dict(weekly), dict(pay_periods)
+
+
+def merge_partials(partials: Iterable[Partial]) -> Report:
+    """
+    Sums partials in the order given, pass them in partition order for repeatable floats
+    :param partials: Outputs of aggregate_partition
+    :return: Report with sorted keys
+    """
+    merged = (defaultdict(lambda: [0.0, 0]), defaultdict(lambda: [0.0, 0]))
+    for partial in partials:
+        for merged_totals, partial_totals in zip(merged, partial):
+            for key, (seconds, count) in partial_totals.items():
+                totals = merged_totals[key]
+                totals[0] += seconds
+                totals[1] += count
+    weekly, pay_periods = (
+        {key: ReportTotals(*merged_totals[key]) for key in sorted(merged_totals)}
+        for merged_totals in merged
+    )
+    return Report(weekly, pay_periods)
+
+
+class ReportRunner:
+    """
+    Splits the entries table into month partitions and aggregates them in parallel.
+
+    Each worker process opens its own read-only sqlite connection, so nothing but the
+    partition bounds and the small partial dicts cross process boundaries. Ranges under
+    parallel_threshold entries, or in-memory databases, run in this process instead since
+    starting workers costs more than it saves.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 50_000,
+    ):
+        """
+        :param db: Database to report on, must be file backed to use workers
+        :param max_workers: Worker processes, defaults to the cpu count
+        :param parallel_threshold: Min entries in range before workers are used
+        """
+        self.db = db
+        self.max_workers = max_workers
+        self.parallel_threshold = parallel_threshold
+
+    @property
+    def db_path(self) -> Optional[str]:
+        """
+        sqlite file path, None for in-memory databases
+        """
+        database = self.db.db.engine.url.database
+        if not database or database == ":memory:":
+            return None
+        return database
+
+    def _bounds(
+        self, start: Optional[datetime.datetime], end: Optional[datetime.datetime]
+    ) -> Optional[Partition]:
+        """
+        Fills open bounds from the first and last entry, None if there are no entries
+        """
+        if start is not None and end is not None:
+            return start, end
+        row = next(
+            iter(
+                self.db.db.query(
+                    "SELECT MIN(start_time) AS first, MAX(start_time) AS last FROM entries"
+                )
+            )
+        )
+        if row["first"] is None:
+            return None
+        first = self.db.timestamps.from_sql(row["first"])
+        last = self.db.timestamps.from_sql(row["last"])
+        return (
+            start or month_start(first),
+            end or last + datetime.timedelta(microseconds=1),
+        )
+
+    def run(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        parallel: Optional[bool] = None,
+    ) -> Report:
+        """
+        Aggregates entries with start <= start_time < end
+        :param start: Inclusive lower bound, None for the first entry
+        :param end: Exclusive upper bound, None for after the last entry
+        :param parallel: Force workers on or off, None decides from parallel_threshold
+        :return: Merged Report
+        """
+        bounds = self._bounds(start, end)
+        if bounds is None:
+            return Report(dict(), dict())
+        partitions = month_partitions(*bounds)
+        monthly_frequencies = {
+            project.project_name: project.monthly_frequency
+            for project in self.db.get_all_projects(eager_loading=True)
+        }
+        if self.db_path is None:
+            parallel = False
+        elif parallel is None:
+            parallel = (
+                len(partitions) > 1
+                and self.db.count_entries(*bounds) >= self.parallel_threshold
+            )
+
+        db_paths = [self.db_path] * len(partitions)
+        frequencies = [monthly_frequencies] * len(partitions)
+        if parallel:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                # map yields in submission order, keeping the merge deterministic
+                partials = list(
+                    executor.map(aggregate_partition, db_paths, partitions, frequencies)
+                )
+        else:
+            partials = map(aggregate_partition, db_paths, partitions, frequencies)
+        return merge_partials(partials)
+
+
+def invoice_lines(report: Report, projects: Iterable[Project]) -> List[BillingLine]:
+    """
+    Prices report pay periods with project rates, same shape as billing.compute_billing
+    :param report: Report from ReportRunner.run
+    :param projects: Projects with rates and clients
+    :return: BillingLines ordered by period_start then project_name
+    """
+    projects_by_name = {project.project_name: project for project in projects}
+    billing_lines = [
+        price_period(project_name, period, *totals, projects_by_name)
+        for (project_name, *period), totals in report.pay_periods.items()
+    ]
+    billing_lines.sort(key=lambda line: (line.period_start, line.project_name))
+    return billing_lines
+
+
+def utilisation_summary(
+    report: Report, projects: Iterable[Project]
+) -> List[UtilisationLine]:
+    """
+    Weekly hours against each project's weekly_hour_allotment
+    :param report: Report from ReportRunner.run
+    :param projects: Projects with allotments
+    :return: UtilisationLines ordered by project_name then week_start
+    """
+    allotments = {
+        project.project_name: project.weekly_hour_allotment for project in projects
+    }
+    return [
+        UtilisationLine(
+            project_name=project_name,
+            week_start=week_start,
+            hours=totals.hours,
+            allotment_hours=allotments.get(project_name, 0),
+            utilisation=(
+                totals.hours / allotments[project_name]
+                if allotments.get(project_name)
+                else None
+            ),
+        )
+        for (project_name, week_start), totals in report.weekly.items()
+    ]
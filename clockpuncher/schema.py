@@ -0,0 +1,217 @@
+""" Contains the explicit DDL for every table, index, trigger and view in timer.db """
+from typing import Callable, Dict, List, Optional
+
+from clockpuncher.timestamps import TimestampCodec
+
+# Changing an object below needs a migration in clockpuncher.migrations for existing files
+# Every object name in one read, Database.init_db compares it against schema_objects
+SCHEMA_OBJECTS_QUERY = "SELECT name FROM sqlite_master"
+
+SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+# Index name -> columns. start_time leads for range filters and project_name leads for
+# per-project filters, end_time is tacked on so duration sums never touch the table.
+ENTRY_INDEXES = {
+    "ix_entries_start_time": ["start_time", "project_name", "end_time"],
+    "ix_entries_project_name": ["project_name", "start_time", "end_time"],
+}
+
+DAILY_ROLLUP_DDL = """
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    day TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    total_seconds REAL NOT NULL DEFAULT 0,
+    entry_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, project_name)
+)
+"""
+
+# One row per entry an UPDATE or DELETE touched, from any connection, so watchers can tell
+# edits apart from appends and re-read only the edited entries. start_time is the row's
+# stored start_time before the edit, NULL for an id an UPDATE moved a row to. The triggers
+# keep the newest ENTRY_EDIT_LOG_SIZE rows, a watcher further behind reloads everything.
+ENTRY_EDIT_LOG_SIZE = 1000
+ENTRY_EDIT_LOG_DDL = """
+CREATE TABLE IF NOT EXISTS entry_edit_log (
+    seq INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL,
+    start_time
+)
+"""
+_PRUNE_EDIT_LOG = (
+    "DELETE FROM entry_edit_log "
+    f"WHERE seq <= (SELECT MAX(seq) FROM entry_edit_log) - {ENTRY_EDIT_LOG_SIZE};"
+)
+ENTRY_EDIT_LOG_TRIGGERS = {
+    "entries_edit_log_update": "CREATE TRIGGER IF NOT EXISTS entries_edit_log_update "
+    "AFTER UPDATE ON entries BEGIN "
+    "INSERT INTO entry_edit_log (entry_id, start_time) VALUES (OLD.id, OLD.start_time); "
+    "INSERT INTO entry_edit_log (entry_id) SELECT NEW.id WHERE NEW.id != OLD.id; "
+    f"{_PRUNE_EDIT_LOG} END",
+    "entries_edit_log_delete": "CREATE TRIGGER IF NOT EXISTS entries_edit_log_delete "
+    "AFTER DELETE ON entries BEGIN "
+    "INSERT INTO entry_edit_log (entry_id, start_time) VALUES (OLD.id, OLD.start_time); "
+    f"{_PRUNE_EDIT_LOG} END",
+}
+
+
+def projects_ddl(table: str = "projects") -> str:
+    """
+    CREATE TABLE for projects
+    :param table: Table name, Database.rebuild_tables builds a projects_typed copy
+    """
+    return f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    project_name TEXT NOT NULL,
+    client TEXT NOT NULL,
+    rate INTEGER NOT NULL,
+    monthly_frequency INTEGER NOT NULL,
+    weekly_hour_allotment INTEGER NOT NULL
+)
+"""
+
+
+def entries_ddl(timestamps: TimestampCodec, table: str = "entries") -> str:
+    """
+    CREATE TABLE for entries in a timestamp storage mode. Epoch tables CHECK the storage
+    class, so text from a process still running in text mode after a migration is refused.
+    :param timestamps: Codec of the table
+    :param table: Table name, migrations build copies such as entries_epoch
+    """
+    if timestamps.mode == "epoch":
+        time_columns = (
+            "start_time INTEGER NOT NULL CHECK (typeof(start_time) = 'integer'),\n"
+            "    end_time INTEGER NOT NULL CHECK (typeof(end_time) = 'integer')"
+        )
+    else:
+        time_columns = "start_time DATETIME NOT NULL,\n    end_time DATETIME NOT NULL"
+    return f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    project_name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    {time_columns}
+)
+"""
+
+
+def _rollup_key(timestamps: TimestampCodec, row: str) -> str:
+    """
+    Entries are credited to the day they started on. row is NEW or OLD inside a trigger.
+    """
+    return f"{timestamps.day_sql(f'{row}.start_time')}, COALESCE({row}.project_name, '')"
+
+
+def _rollup_seconds(timestamps: TimestampCodec, row: str) -> str:
+    """
+    Seconds an entry lasted, 0 when either time is missing
+    """
+    return f"COALESCE({timestamps.seconds_sql(f'{row}.start_time', f'{row}.end_time')}, 0)"
+
+
+def daily_rollup_triggers(
+    timestamps: TimestampCodec, guard: Optional[Callable[[str], str]] = None
+) -> Dict[str, str]:
+    """
+    Triggers keeping daily_rollup current, written for the entries table's storage mode
+    :param timestamps: Codec of the entries table
+    :param guard: Condition the triggers only fire under, called with NEW or OLD.
+        Used while a chunked backfill fills daily_rollup, see migrations.covered_sql
+    :return: Trigger name -> CREATE TRIGGER statement
+    """
+    new_when = old_when = ""
+    if guard is not None:
+        new_when, old_when = f"WHEN {guard('NEW')}", f"WHEN {guard('OLD')}"
+    rollup_add = f"""
+    INSERT INTO daily_rollup (day, project_name, total_seconds, entry_count)
+    VALUES ({_rollup_key(timestamps, "NEW")}, {_rollup_seconds(timestamps, "NEW")}, 1)
+    ON CONFLICT (day, project_name) DO UPDATE SET
+        total_seconds = total_seconds + excluded.total_seconds,
+        entry_count = entry_count + 1;
+    """
+    rollup_remove = f"""
+    UPDATE daily_rollup SET
+        total_seconds = total_seconds - {_rollup_seconds(timestamps, "OLD")},
+        entry_count = entry_count - 1
+    WHERE (day, project_name) = ({_rollup_key(timestamps, "OLD")});
+    DELETE FROM daily_rollup
+    WHERE (day, project_name) = ({_rollup_key(timestamps, "OLD")}) AND entry_count <= 0;
+    """
+    return {
+        "entries_rollup_insert": "CREATE TRIGGER IF NOT EXISTS entries_rollup_insert "
+        f"AFTER INSERT ON entries {new_when} BEGIN {rollup_add} END",
+        "entries_rollup_delete": "CREATE TRIGGER IF NOT EXISTS entries_rollup_delete "
+        f"AFTER DELETE ON entries {old_when} BEGIN {rollup_remove} END",
+        "entries_rollup_update": "CREATE TRIGGER IF NOT EXISTS entries_rollup_update "
+        f"AFTER UPDATE OF project_name, start_time, end_time ON entries {old_when} "
+        f"BEGIN {rollup_remove} {rollup_add} END",
+    }
+
+
+def daily_rollup_backfill(timestamps: TimestampCodec, where: str = "true") -> str:
+    """
+    INSERT adding entries to daily_rollup, on top of totals already there
+    :param timestamps: Codec of the entries table
+    :param where: Entries to add, every entry by default
+    """
+    return f"""
+    INSERT INTO daily_rollup (day, project_name, total_seconds, entry_count)
+    SELECT {_rollup_key(timestamps, "entries")}, SUM({_rollup_seconds(timestamps, "entries")}),
+        COUNT(*)
+    FROM entries WHERE {where} GROUP BY 1, 2
+    ON CONFLICT (day, project_name) DO UPDATE SET
+        total_seconds = total_seconds + excluded.total_seconds,
+        entry_count = entry_count + excluded.entry_count
+    """
+
+
+def readable_entries_view(timestamps: TimestampCodec) -> str:
+    """
+    entries_readable, the entries table with local text times for querying by hand
+    :param timestamps: Codec of the entries table
+    """
+    return (
+        "CREATE VIEW IF NOT EXISTS entries_readable AS SELECT id, project_name, description, "
+        f"{timestamps.readable_sql('start_time')} AS start_time, "
+        f"{timestamps.readable_sql('end_time')} AS end_time, "
+        f"{timestamps.seconds_sql('start_time', 'end_time')} AS duration_seconds "
+        "FROM entries"
+    )
+
+
+def schema_objects(timestamps: TimestampCodec) -> Dict[str, List[str]]:
+    """
+    Every object timer.db should hold, in creation order. Statements only run for names
+    missing from sqlite_master, so a daily_rollup table created here is backfilled from
+    entries that existed before it, e.g. in databases made by older versions.
+    :param timestamps: Codec of the entries table
+    :return: Object name -> statements creating it
+    """
+    objects = {
+        "projects": [projects_ddl()],
+        "entries": [entries_ddl(timestamps)],
+    }
+    # dataset's create_index compares column sets and can't tell these two apart
+    for index_name, columns in ENTRY_INDEXES.items():
+        objects[index_name] = [
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON entries ({', '.join(columns)})"
+        ]
+    objects["daily_rollup"] = [DAILY_ROLLUP_DDL, daily_rollup_backfill(timestamps)]
+    for name, trigger in daily_rollup_triggers(timestamps).items():
+        objects[name] = [trigger]
+    objects["entry_edit_log"] = [ENTRY_EDIT_LOG_DDL]
+    for name, trigger in ENTRY_EDIT_LOG_TRIGGERS.items():
+        objects[name] = [trigger]
+    if timestamps.mode == "epoch":
+        objects["entries_readable"] = [readable_entries_view(timestamps)]
+    # Rows are written by migrations.record_migrations
+    objects["schema_version"] = [SCHEMA_VERSION_DDL]
+    return objects
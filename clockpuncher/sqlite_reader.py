@@ -0,0 +1,145 @@
+""" Contains a raw sqlite3 read engine for the hot Database queries """
+import datetime
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from clockpuncher.connection_profiles import Pragmas, apply_pragmas
+from clockpuncher.models import Entry
+from clockpuncher.timestamps import (
+    DECLARED_TYPE_QUERY,
+    TIMESTAMP_CODECS,
+    TimestampCodec,
+    codec_for_declared_type,
+)
+
+ENTRY_COLUMNS = ("id", "project_name", "description", "start_time", "end_time")
+
+
+def entry_row_factory(_cursor: sqlite3.Cursor, row: tuple) -> Entry:
+    """
+    sqlite3 row factory that builds an Entry from a row selected in ENTRY_COLUMNS order
+    :param _cursor: Cursor the row came from
+    :param row: Raw row tuple
+    :return: Entry dataclass
+    """
+    return Entry._from_tuple(row)  # pylint: disable=protected-access
+
+
+class SQLiteReader:
+    """
+    Runs read queries straight on a sqlite3 connection, skipping dataset and SQLAlchemy.
+    One connection is opened lazily per thread, mirroring dataset's thread local connections.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: Optional[Pragmas] = None,
+        read_only: bool = False,
+        timestamps: Optional[TimestampCodec] = None,
+    ):
+        """
+        :param db_path: File path of the sqlite database
+        :type db_path: str
+        :param pragmas: Connection profile pragmas applied to each new connection
+        :type pragmas: Pragmas
+        :param read_only: Open connections with mode=ro so sqlite refuses any write
+        :type read_only: bool
+        :param timestamps: Storage mode codec, None reads it from the schema on first use
+        :type timestamps: TimestampCodec
+        """
+        self.db_path = db_path
+        self.pragmas = pragmas or dict()
+        self.read_only = read_only
+        self.timestamps = timestamps
+        self._local = threading.local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        Thread local sqlite3 connection
+        """
+        if not hasattr(self._local, "connection"):
+            if self.read_only:
+                uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+                self._local.connection = sqlite3.connect(uri, uri=True)
+            else:
+                self._local.connection = sqlite3.connect(self.db_path)
+            apply_pragmas(self._local.connection, self.pragmas)
+        return self._local.connection
+
+    def detect_timestamps(self) -> TimestampCodec:
+        """
+        Reads the storage mode from the declared type of entries.start_time
+        :return: The codec, also stored on self.timestamps
+        """
+        row = self.connection.execute(DECLARED_TYPE_QUERY).fetchone()
+        self.timestamps = (
+            codec_for_declared_type(row and row[0]) or TIMESTAMP_CODECS["text"]
+        )
+        return self.timestamps
+
+    def close(self) -> None:
+        """
+        Closes this thread's connection if one was opened
+        """
+        if hasattr(self._local, "connection"):
+            self._local.connection.close()
+            del self._local.connection
+
+    def iter_rows(
+        self,
+        where_clause: str = "",
+        parameters: Optional[Dict] = None,
+        order_by: str = "id",
+        row_factory: Optional[Callable] = None,
+    ) -> Iterator:
+        """
+        Yields entries rows selected in ENTRY_COLUMNS order
+        :param where_clause: Optional 'WHERE ...' using :name placeholders
+        :param parameters: Values for the placeholders, datetimes are converted to their
+            stored form
+        :param order_by: ORDER BY clause contents
+        :param row_factory: Optional sqlite3 row factory, None yields plain tuples
+        :return: Generator of rows
+        """
+        timestamps = self.timestamps or self.detect_timestamps()
+        parameters = {
+            key: timestamps.to_sql(value) if isinstance(value, datetime.datetime) else value
+            for key, value in (parameters or dict()).items()
+        }
+        cursor = self.connection.cursor()
+        cursor.row_factory = row_factory
+        yield from cursor.execute(
+            f"SELECT {', '.join(ENTRY_COLUMNS)} FROM entries {where_clause} "
+            f"ORDER BY {order_by}",
+            parameters,
+        )
+
+    def iter_entries(
+        self,
+        where_clause: str = "",
+        parameters: Optional[Dict] = None,
+        order_by: str = "id",
+    ) -> Iterator[Entry]:
+        """
+        Yields Entries built straight from sqlite3 rows
+        :param where_clause: Optional 'WHERE ...' using :name placeholders
+        :param parameters: Values for the placeholders, datetimes are converted to their
+            stored form
+        :param order_by: ORDER BY clause contents
+        :return: Generator of Entries
+        """
+        return self.iter_rows(where_clause, parameters, order_by, entry_row_factory)
+
+    def get_project_names(self) -> List[str]:
+        """
+        Returns all distinct project names in the projects table
+        :return: List of project names
+        """
+        cursor = self.connection.execute(
+            "SELECT DISTINCT project_name FROM projects ORDER BY project_name"
+        )
+        return [project_name for (project_name,) in cursor]
@@ -0,0 +1,120 @@
+""" Tests for allotment.py """
+import datetime
+import random
+
+import pytest
+
+from clockpuncher.allotment import AllotmentTracker, week_of
+from clockpuncher.models import Entry, Project
+
+TODAY = datetime.date(2021, 3, 17)
+
+
+def _project(name, weekly_hour_allotment):
+    return Project(
+        id=None,
+        weekly_hour_allotment=weekly_hour_allotment,
+        monthly_frequency=2,
+        rate=10,
+        client="",
+        project_name=name,
+    )
+
+
+def _entry(project_name, day, hours):
+    start = datetime.datetime.combine(day, datetime.time(9))
+    return Entry(
+        id=None,
+        project_name=project_name,
+        description="",
+        start_time=start,
+        end_time=start + datetime.timedelta(hours=hours),
+    )
+
+
+def _brute_force(entries, project_name, today, weeks):
+    first_week = week_of(today) - datetime.timedelta(weeks=weeks - 1)
+    return sum(
+        entry.duration.total_seconds() / 3600
+        for entry in entries
+        if entry.project_name == project_name
+        and first_week <= week_of(entry.start_time.date()) <= week_of(today)
+    )
+
+
+def test_week_of():
+    assert week_of(TODAY) == datetime.date(2021, 3, 15)
+    assert week_of(datetime.date(2021, 3, 15)) == datetime.date(2021, 3, 15)
+
+
+def test_AllotmentTracker_status():
+    tracker = AllotmentTracker([_project("alpha", 20)], today=TODAY)
+    tracker.add(_entry("alpha", TODAY, 4))
+    tracker.add(_entry("alpha", TODAY - datetime.timedelta(weeks=2), 10))
+    tracker.add(_entry("alpha", TODAY - datetime.timedelta(weeks=20), 6))
+    tracker.add(_entry("beta", TODAY, 1))
+
+    status = tracker.status("alpha", running_seconds=3600, today=TODAY)
+    assert status.allotment_hours == 20
+    assert status.week_hours == pytest.approx(5)
+    assert status.window_hours == {
+        4: pytest.approx(15),
+        12: pytest.approx(15),
+        52: pytest.approx(21),
+    }
+    assert status.utilisation() == pytest.approx(0.25)
+    assert status.utilisation(4) == pytest.approx(15 / 80)
+    assert tracker.status("beta", today=TODAY).utilisation() is None
+    assert tracker.project_names() == ["alpha", "beta"]
+
+
+def test_AllotmentTracker_remove():
+    tracker = AllotmentTracker([_project("alpha", 20)], today=TODAY)
+    kept = _entry("alpha", TODAY, 4)
+    edited = _entry("alpha", TODAY - datetime.timedelta(weeks=2), 10)
+    tracker.add(kept)
+    tracker.add(edited)
+    tracker.remove(edited)
+    assert tracker.status("alpha", today=TODAY).window_hours == {
+        4: pytest.approx(4),
+        12: pytest.approx(4),
+        52: pytest.approx(4),
+    }
+
+
+def test_AllotmentTracker_seed_from_rollup():
+    tracker = AllotmentTracker(today=TODAY)
+    tracker.seed(
+        [
+            (TODAY, "alpha", 7200.0, 2),
+            (TODAY - datetime.timedelta(days=7), "alpha", 3600.0, 1),
+            (TODAY - datetime.timedelta(weeks=60), "alpha", 3600.0, 1),
+        ]
+    )
+    status = tracker.status("alpha", today=TODAY)
+    assert status.week_hours == pytest.approx(2)
+    assert status.window_hours[52] == pytest.approx(3)
+
+
+def test_AllotmentTracker_advance_matches_rescan():
+    rng = random.Random(0)
+    start = TODAY - datetime.timedelta(weeks=70)
+    tracker = AllotmentTracker(today=start)
+    entries = list()
+    for day_offset in range(0, 7 * 80, 3):
+        day = start + datetime.timedelta(days=day_offset)
+        tracker.advance(day)
+        entry = _entry(rng.choice(["alpha", "beta"]), day, rng.randint(1, 8))
+        tracker.add(entry)
+        entries.append(entry)
+
+        if day_offset % 21 == 0:
+            for project_name in ("alpha", "beta"):
+                status = tracker.status(project_name, today=day)
+                for weeks, hours in status.window_hours.items():
+                    assert hours == pytest.approx(
+                        _brute_force(entries, project_name, day, weeks)
+                    )
+
+    later = start + datetime.timedelta(weeks=200)
+    assert tracker.status("alpha", today=later).window_hours[52] == 0
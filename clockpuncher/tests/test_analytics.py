@@ -0,0 +1,153 @@
+""" Tests for analytics.py """
+import datetime
+import time
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import datetimes, integers, lists, tuples
+
+from clockpuncher.models import Entry, EntryBatch
+
+np = pytest.importorskip("numpy")
+
+# pylint: disable=wrong-import-position
+from clockpuncher.analytics import (
+    DAY_US,
+    HOUR_US,
+    EntryArrays,
+    daily_project_series,
+    session_length_histogram,
+    split_intervals,
+    weekday_hour_heatmap,
+)
+
+
+def _entry(project_name, start, minutes):
+    return Entry(
+        id=None,
+        project_name=project_name,
+        description="",
+        start_time=start,
+        end_time=start + datetime.timedelta(minutes=minutes),
+    )
+
+
+# Monday 2021-03-15
+MONDAY = datetime.datetime(2021, 3, 15)
+
+
+def test_EntryArrays_from_entries():
+    arrays = EntryArrays.from_entries(
+        [_entry("alpha", MONDAY, 30), _entry("beta", MONDAY, -5)]
+    )
+    assert arrays.starts[0] == np.datetime64("2021-03-15T00:00:00.000000")
+    assert arrays.durations_s.tolist() == [1800.0, 0.0]
+    assert arrays.projects == ["alpha", "beta"]
+
+
+def test_EntryArrays_from_batch_copies():
+    batch = EntryBatch.from_entries([_entry("alpha", MONDAY, 30)])
+    arrays = EntryArrays.from_batch(batch)
+    # A view would pin the batch's buffers and this would raise BufferError
+    batch.extend([_entry("beta", MONDAY, 15)])
+    assert len(batch) == 2
+    assert arrays.durations_s.tolist() == [1800.0]
+
+
+def test_EntryArrays_wall_clock(monkeypatch):
+    # EntryBatch holds UTC, the buckets are local wall clock either side of a DST change
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        saturday, monday = datetime.datetime(2021, 3, 13, 9), datetime.datetime(2021, 3, 15, 9)
+        entries = [_entry("alpha", saturday, 30), _entry("alpha", monday, 90)]
+        batch = EntryBatch.from_entries(entries)
+        # The clocks went forward on the Sunday
+        assert batch.start_us[1] - batch.start_us[0] == 47 * HOUR_US
+        arrays = EntryArrays.from_batch(batch)
+        assert arrays.starts.tolist() == [saturday, monday]
+        heatmap = weekday_hour_heatmap(arrays)
+        assert heatmap[5, 9] == pytest.approx(0.5)
+        assert heatmap[0, 9] == pytest.approx(1)
+        assert heatmap[0, 10] == pytest.approx(0.5)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_split_intervals():
+    start = np.array([9 * HOUR_US + 40 * 60_000_000, 2 * HOUR_US, 5 * HOUR_US])
+    end = np.array([11 * HOUR_US + 10 * 60_000_000, 3 * HOUR_US, 5 * HOUR_US])
+    positions, buckets, seconds = split_intervals(start, end, HOUR_US)
+    assert positions.tolist() == [0, 0, 0, 1, 2]
+    assert buckets.tolist() == [9, 10, 11, 2, 5]
+    assert seconds.tolist() == [1200.0, 3600.0, 600.0, 3600.0, 0.0]
+
+
+@given(
+    lists(
+        tuples(
+            datetimes(
+                min_value=datetime.datetime(2000, 1, 1),
+                max_value=datetime.datetime(2030, 1, 1),
+            ),
+            integers(min_value=0, max_value=4 * 24 * 60),
+        ),
+        max_size=30,
+    )
+)
+def test_split_intervals_conserves_time(intervals):
+    arrays = EntryArrays.from_entries(
+        [_entry("alpha", start, minutes) for start, minutes in intervals]
+    )
+    for bucket_us in (HOUR_US, DAY_US):
+        positions, buckets, seconds = split_intervals(
+            arrays.start_us, arrays.end_us, bucket_us
+        )
+        totals = np.bincount(positions, weights=seconds, minlength=len(intervals))
+        assert totals == pytest.approx(arrays.durations_s)
+        assert (seconds <= bucket_us / 1e6).all()
+
+
+def test_weekday_hour_heatmap():
+    arrays = EntryArrays.from_entries(
+        [
+            _entry("alpha", MONDAY + datetime.timedelta(hours=9, minutes=30), 60),
+            # Sunday 23:30 to Monday 00:30
+            _entry("alpha", MONDAY - datetime.timedelta(minutes=30), 60),
+        ]
+    )
+    heatmap = weekday_hour_heatmap(arrays)
+    assert heatmap.shape == (7, 24)
+    assert heatmap[0, 9] == pytest.approx(0.5)
+    assert heatmap[0, 10] == pytest.approx(0.5)
+    assert heatmap[6, 23] == pytest.approx(0.5)
+    assert heatmap[0, 0] == pytest.approx(0.5)
+    assert heatmap.sum() == pytest.approx(2)
+
+
+def test_session_length_histogram():
+    arrays = EntryArrays.from_entries(
+        [_entry("alpha", MONDAY, minutes) for minutes in (1, 10, 10, 45, 600)]
+    )
+    counts, edges = session_length_histogram(arrays, bins=(0, 5, 15, 60))
+    assert edges.tolist() == [0, 5, 15, 60]
+    assert counts.tolist() == [1, 2, 1, 1]
+
+
+def test_daily_project_series():
+    arrays = EntryArrays.from_entries(
+        [
+            _entry("alpha", MONDAY + datetime.timedelta(hours=22), 180),
+            _entry("beta", MONDAY + datetime.timedelta(days=3, hours=1), 90),
+        ]
+    )
+    days, series = daily_project_series(arrays)
+    assert days.tolist() == [
+        datetime.date(2021, 3, 15) + datetime.timedelta(days=day) for day in range(4)
+    ]
+    assert series["alpha"].tolist() == [2.0, 1.0, 0.0, 0.0]
+    assert series["beta"].tolist() == [0.0, 0.0, 0.0, 1.5]
+
+    empty_days, empty_series = daily_project_series(EntryArrays.from_entries([]))
+    assert len(empty_days) == 0 and empty_series == {}
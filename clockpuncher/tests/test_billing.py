@@ -0,0 +1,108 @@
+""" Tests for billing.py """
+import datetime
+import io
+
+import pytest
+
+from clockpuncher.billing import (
+    BillingLine,
+    compute_billing,
+    pay_period_of_day,
+    total_billed,
+    totals_by,
+    write_csv,
+)
+from clockpuncher.models import Entry, Project
+from clockpuncher.tests.test_database import db  # pylint: disable=unused-import
+
+
+def _project(name, client, rate, monthly_frequency):
+    return Project(
+        id=None,
+        weekly_hour_allotment=20,
+        monthly_frequency=monthly_frequency,
+        rate=rate,
+        client=client,
+        project_name=name,
+    )
+
+
+def _daily_entries(project_name, days, hours=2):
+    start = datetime.datetime(2021, 3, 1, 9)
+    return [
+        Entry(
+            id=None,
+            project_name=project_name,
+            description="work",
+            start_time=start + datetime.timedelta(days=day),
+            end_time=start + datetime.timedelta(days=day, hours=hours),
+        )
+        for day in range(days)
+    ]
+
+
+def test_pay_period_of_day():
+    assert pay_period_of_day(datetime.date(2021, 3, 20), 2) == (
+        datetime.date(2021, 3, 16),
+        datetime.date(2021, 4, 1),
+    )
+    assert pay_period_of_day(datetime.date(2021, 3, 20), 0) == pay_period_of_day(
+        datetime.date(2021, 3, 20), 2
+    )
+
+
+def test_compute_billing(db):
+    db.add_project(_project("alpha", "Acme", 50, 2))
+    db.add_project(_project("beta", "Acme", 100, 1))
+    db.add_entries(_daily_entries("alpha", 31))
+    db.add_entries(_daily_entries("beta", 10, hours=1))
+    db.add_entries(_daily_entries("unbilled", 3))
+
+    billing_lines = compute_billing(db)
+    assert [
+        (line.project_name, line.period_start, line.entry_count)
+        for line in billing_lines
+    ] == [
+        ("alpha", datetime.date(2021, 3, 1), 15),
+        ("beta", datetime.date(2021, 3, 1), 10),
+        ("unbilled", datetime.date(2021, 3, 1), 3),
+        ("alpha", datetime.date(2021, 3, 16), 16),
+    ]
+    assert billing_lines[0].hours == pytest.approx(30)
+    assert billing_lines[0].amount == pytest.approx(1500)
+    assert billing_lines[0].period_end == datetime.date(2021, 3, 16)
+    assert billing_lines[1].period_end == datetime.date(2021, 4, 1)
+    assert billing_lines[2].rate == 0 and billing_lines[2].client == ""
+
+    assert total_billed(billing_lines) == pytest.approx(1500 + 1000 + 1600)
+    assert totals_by(billing_lines, "client") == {
+        "Acme": pytest.approx(4100),
+        "": 0,
+    }
+    assert totals_by(billing_lines)["alpha"] == pytest.approx(3100)
+
+    bounded = compute_billing(
+        db, start=datetime.date(2021, 3, 16), end=datetime.date(2021, 3, 18)
+    )
+    assert [(line.project_name, line.entry_count) for line in bounded] == [
+        ("alpha", 2)
+    ]
+
+
+def test_write_csv():
+    line = BillingLine(
+        project_name="alpha",
+        client="Acme",
+        period_start=datetime.date(2021, 3, 1),
+        period_end=datetime.date(2021, 3, 16),
+        seconds=5400.0,
+        entry_count=2,
+        rate=40,
+        amount=60.0,
+    )
+    output = io.StringIO()
+    write_csv([line], output)
+    assert output.getvalue().splitlines() == [
+        "project_name,client,period_start,period_end,seconds,hours,entry_count,rate,amount",
+        "alpha,Acme,2021-03-01,2021-03-16,5400.0,1.5,2,40,60.0",
+    ]
@@ -0,0 +1,83 @@
+""" Tests for change_watcher.py """
+import datetime
+from pathlib import Path
+
+from clockpuncher.change_watcher import ChangeWatcher
+from clockpuncher.database import Database
+from clockpuncher.schema import ENTRY_EDIT_LOG_SIZE
+from clockpuncher.tests.test_database import db  # pylint: disable=unused-import
+from clockpuncher.tests.utils import make_entries
+
+
+def test_ChangeWatcher(db):
+    db.add_entries(make_entries(5))
+    watcher = ChangeWatcher(db.db.engine.url.database, interval=0)
+    assert watcher.last_seen_id == 5
+    assert watcher.poll() is None
+
+    # Another process, e.g. a script, writes through its own connection
+    other = Database(Path(db.db.engine.url.database))
+    other.add_entries(make_entries(3, description="external"))
+    changes = watcher.poll()
+    assert not changes.reload
+    assert [entry.description for entry in changes.new_entries] == [
+        "external 0",
+        "external 1",
+        "external 2",
+    ]
+    assert watcher.last_seen_id == 8
+    assert watcher.poll() is None
+
+    entries = db.get_all_entries(True)
+    other.entries.update(dict(id=2, description="edited"), ["id"])
+    changes = watcher.poll()
+    assert not changes.reload and changes.new_entries == []
+    assert changes.edited == {2: entries[1].start_time}
+    assert [(entry.id, entry.description) for entry in changes.edited_entries] == [
+        (2, "edited")
+    ]
+
+    # Moved twice, the watcher reports where the entry was before the first move
+    other.entries.update(dict(id=4, start_time=entries[0].start_time), ["id"])
+    other.entries.update(dict(id=4, start_time=entries[2].start_time), ["id"])
+    other.entries.delete(id=3)
+    other.add_entries(make_entries(1, description="after delete"))
+    # Edits of entries this poll reads as new aren't reported twice
+    other.entries.update(dict(id=9, description="edited after insert"), ["id"])
+    changes = watcher.poll()
+    assert not changes.reload
+    assert changes.edited == {4: entries[3].start_time, 3: entries[2].start_time}
+    assert [entry.id for entry in changes.edited_entries] == [4]
+    assert changes.edited_entries[0].start_time == entries[2].start_time
+    assert [entry.description for entry in changes.new_entries] == ["edited after insert"]
+    assert watcher.poll() is None
+    watcher.close()
+
+
+def test_ChangeWatcher_fell_behind(db):
+    db.add_entries(make_entries(ENTRY_EDIT_LOG_SIZE + 10))
+    watcher = ChangeWatcher(db.db.engine.url.database, interval=0)
+    other = Database(Path(db.db.engine.url.database))
+    # More edits than entry_edit_log keeps, the oldest ones are gone before the poll
+    other.db.query("UPDATE entries SET description = 'bulk edit'")
+    changes = watcher.poll()
+    assert changes.reload and changes.edited == {}
+    assert other.db["entry_edit_log"].count() == ENTRY_EDIT_LOG_SIZE
+
+    other.entries.delete(id=1)
+    assert watcher.poll().edited == {1: datetime.datetime(2021, 3, 1, 8)}
+    watcher.close()
+
+
+def test_ChangeWatcher_interval(db):
+    now = [0.0]
+    watcher = ChangeWatcher(
+        db.db.engine.url.database, interval=1.0, clock=lambda: now[0]
+    )
+    assert watcher.poll() is None
+    db.add_entries(make_entries(1))
+    now[0] = 0.5
+    assert watcher.poll() is None
+    now[0] = 1.0
+    assert len(watcher.poll().new_entries) == 1
+    watcher.close()
@@ -2,11 +2,15 @@
 import datetime
 import json
 import pickle
+import sqlite3
+import threading
 from collections.abc import Generator
 from pathlib import Path
 
 import pytest
 from hypothesis import assume, given
+from hypothesis.strategies import lists
+from sqlalchemy.exc import OperationalError
 from clockpuncher.platform_local_storage import (
     DEVELOPMENT_DB_PATH,
     PRODUCTION_DB_PATH,
@@ -15,8 +19,12 @@ from clockpuncher.platform_local_storage import (
 )
 
 from clockpuncher.database import Database
-from clockpuncher.models import Entry, Project
-from clockpuncher.tests.utils import entry_build_strategy, project_build_strategy
+from clockpuncher.models import Entry, EntryBatch, Project
+from clockpuncher.tests.utils import (
+    entry_build_strategy,
+    make_entries,
+    project_build_strategy,
+)
 
 
 @pytest.fixture()
@@ -302,3 +310,295 @@ def test_get_all_entries(seed_data):
         idx += 1
 
     assert idx == len(all_entries_eager)
+
+
+@given(entries=lists(entry_build_strategy, max_size=25))
+def test_add_entries(db, entries):
+    starting_count = db.entries.count()
+    inserted = db.add_entries(iter(entries), batch_size=7)
+
+    assert inserted == len(entries)
+    assert db.entries.count() == starting_count + len(entries)
+
+
+@given(entries=lists(entry_build_strategy, min_size=1, max_size=10))
+def test_add_entries_return_ids(db, entries):
+    inserted_ids = db.add_entries(entries, batch_size=3, return_ids=True)
+
+    assert len(inserted_ids) == len(entries)
+    assert len(set(inserted_ids)) == len(entries)
+    for inserted_id, entry in zip(inserted_ids, entries):
+        entry_in_db = db.get_multi_entries(eager_loading=True, id=inserted_id)[0]
+        for key, value in entry.to_dict().items():
+            assert entry_in_db.get(key) == value
+
+
+def test_add_entries_bad_data(db):
+    now = datetime.datetime.now()
+    valid_entry = Entry(
+        id=None, project_name="foo", description="foo", start_time=now, end_time=now
+    )
+    with pytest.raises(ValueError, match="Entry must be an Entry dataclass"):
+        db.add_entries([valid_entry, "a string"])
+    with pytest.raises(ValueError, match="batch_size must be a positive int"):
+        db.add_entries([valid_entry], batch_size=0)
+
+
+def test_entry_indexes(db):
+    db.init_db()
+    index_names = {
+        row["name"]
+        for row in db.db.query("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert {"ix_entries_start_time", "ix_entries_project_name"} <= index_names
+
+    query_plan = " ".join(
+        row["detail"]
+        for row in db.db.query(
+            "EXPLAIN QUERY PLAN SELECT * FROM entries WHERE start_time >= '2021-03-01'"
+        )
+    )
+    assert "USING INDEX ix_entries_start_time" in query_plan
+
+
+def test_get_entries_between(db):
+    entries = make_entries(48)
+    db.add_entries(entries)
+    window_start = entries[10].start_time
+    window_end = entries[20].start_time
+
+    in_window = db.get_entries_between(window_start, window_end)
+    assert [entry.description for entry in in_window] == [
+        entry.description for entry in entries[10:20]
+    ]
+
+    beta_in_window = db.get_entries_between(window_start, window_end, project="beta")
+    assert {entry.project_name for entry in beta_in_window} == {"beta"}
+    assert len(beta_in_window) == 5
+
+    assert len(db.get_entries_between(start=window_end)) == 28
+    assert len(db.get_entries_between(end=window_start)) == 10
+    assert isinstance(db.get_entries_between(eager_loading=False), Generator)
+
+
+def test_get_entries_today(db):
+    now = datetime.datetime.now()
+    yesterday = now - datetime.timedelta(days=1)
+    db.add_entry(Entry(None, "today", "today", now, now))
+    db.add_entry(Entry(None, "yesterday", "yesterday", yesterday, yesterday))
+
+    project_names = {entry.project_name for entry in db.get_entries_today()}
+    assert "today" in project_names
+    assert "yesterday" not in project_names
+
+
+def test_iter_entries(db):
+    entries = make_entries(25)
+    # Out of insertion order and with a duplicate start_time to exercise the id tie-breaker
+    entries[3].start_time = entries[20].start_time
+    inserted_ids = db.add_entries(entries, return_ids=True)
+    expected_order = [
+        entry_id
+        for _, entry_id in sorted(
+            zip((entry.start_time for entry in entries), inserted_ids)
+        )
+    ]
+
+    pages = list(db.iter_entries(chunk_size=4))
+    assert all(len(page) <= 4 for page in pages)
+    assert [entry.id for page in pages for entry in page] == expected_order
+
+    resumed = list(db.iter_entries(chunk_size=4, after_id=expected_order[9]))
+    assert [entry.id for page in resumed for entry in page] == expected_order[10:]
+
+    by_id = list(db.iter_entries(chunk_size=10, after_id=inserted_ids[4], order_by="id"))
+    assert [entry.id for page in by_id for entry in page] == inserted_ids[5:]
+
+    with pytest.raises(ValueError, match="order_by must be"):
+        next(db.iter_entries(order_by="description"))
+
+
+def test_project_duration_totals(db):
+    entries = make_entries(10)
+    db.add_entries(entries)
+
+    totals = db.project_duration_totals()
+    assert [name for name, _ in totals] == ["alpha", "beta"]
+    for _, total_seconds in totals:
+        assert total_seconds == pytest.approx(5 * 45 * 60)
+
+    ranged_totals = dict(
+        db.project_duration_totals(entries[2].start_time, entries[5].start_time)
+    )
+    assert ranged_totals["alpha"] == pytest.approx(2 * 45 * 60)
+    assert ranged_totals["beta"] == pytest.approx(45 * 60)
+    assert db.project_duration_totals(start=entries[-1].end_time) == []
+
+
+def _rollup_rows(db):
+    return [
+        (day, project, round(seconds, 3), count)
+        for day, project, seconds, count in db.get_daily_totals()
+    ]
+
+
+def test_daily_rollup_triggers(db):
+    entries = make_entries(40)
+    inserted_ids = db.add_entries(entries, return_ids=True)
+
+    daily_totals = db.get_daily_totals()
+    assert sum(count for *_, count in daily_totals) == 40
+    assert sum(seconds for _, _, seconds, _ in daily_totals) == pytest.approx(
+        40 * 45 * 60
+    )
+    assert db.get_daily_totals(
+        start=datetime.date(2021, 3, 2), end=datetime.date(2021, 3, 3), project="alpha"
+    ) == [(datetime.date(2021, 3, 2), "alpha", pytest.approx(12 * 45 * 60), 12)]
+
+    db.entries.update(dict(id=inserted_ids[0], project_name="gamma"), ["id"])
+    db.entries.delete(id=inserted_ids[1])
+    maintained_by_triggers = _rollup_rows(db)
+
+    assert "gamma" in {project for _, project, _, _ in maintained_by_triggers}
+    assert db.backfill_daily_rollup() == len(maintained_by_triggers)
+    assert _rollup_rows(db) == maintained_by_triggers
+
+
+def test_sqlite3_read_engine(db):
+    entries = make_entries(30, project_names=("alpha", "beta", "gamma"))
+    db.add_entries(entries)
+    for project_name in ("alpha", "beta"):
+        db.add_project(
+            Project(
+                id=None,
+                weekly_hour_allotment=20,
+                monthly_frequency=2,
+                rate=30,
+                client="client",
+                project_name=project_name,
+            )
+        )
+    fast_db = Database(development=True, read_engine="sqlite3")
+
+    assert fast_db.get_all_entries(True) == db.get_all_entries(True)
+    assert isinstance(fast_db.get_all_entries(False), Generator)
+    assert fast_db.get_multi_entries(True, project_name="beta") == db.get_multi_entries(
+        True, project_name="beta"
+    )
+    assert fast_db.get_multi_entries(
+        True, start_time=entries[3].start_time
+    ) == db.get_multi_entries(True, start_time=entries[3].start_time)
+    assert fast_db.get_entries_between(
+        entries[5].start_time, entries[25].start_time, "gamma"
+    ) == db.get_entries_between(entries[5].start_time, entries[25].start_time, "gamma")
+    assert fast_db.get_project_names() == db.get_project_names()
+
+    with pytest.raises(ValueError, match="read_engine must be one of"):
+        Database(development=True, read_engine="orm")
+
+
+def test_get_entry_batch(db):
+    entries = make_entries(30)
+    db.add_entries(entries)
+    window = (entries[4].start_time, entries[24].start_time)
+
+    batch = db.get_entry_batch(*window, project="alpha")
+    assert isinstance(batch, EntryBatch)
+    assert list(batch) == db.get_entries_between(*window, project="alpha")
+
+    fast_db = Database(development=True, read_engine="sqlite3")
+    assert list(fast_db.get_entry_batch()) == db.get_entries_between()
+
+
+def _pragma(database, name):
+    return next(iter(database.db.query(f"PRAGMA {name}")))[name]
+
+
+def test_connection_profiles(db):
+    db.add_entries(make_entries(3))
+
+    fast_db = Database(development=True, profile="fast", read_engine="sqlite3")
+    assert _pragma(fast_db, "journal_mode") == "wal"
+    assert _pragma(fast_db, "synchronous") == 1
+    assert _pragma(fast_db, "temp_store") == 2
+    assert fast_db._reader.connection.execute("PRAGMA synchronous").fetchone() == (1,)
+
+    readonly_db = Database(development=True, profile="readonly-analytics")
+    assert len(readonly_db.get_all_entries(True)) == 3
+    with pytest.raises(OperationalError, match="readonly"):
+        readonly_db.add_entries(make_entries(1))
+
+    custom_db = Database(development=True, profile={"cache_size": -1234})
+    assert _pragma(custom_db, "cache_size") == -1234
+
+    with pytest.raises(ValueError, match="profile must be one of"):
+        Database(development=True, profile="reckless")
+
+
+def test_get_entries_page(db):
+    entries = make_entries(23)
+    entries[7].start_time = entries[8].start_time
+    db.add_entries(entries)
+    newest_first = sorted(
+        db.get_all_entries(True), key=lambda entry: (entry.start_time, entry.id)
+    )[::-1]
+
+    pages, before = list(), None
+    while True:
+        page = db.get_entries_page(5, before=before)
+        if not page:
+            break
+        pages.append(page)
+        before = (page[-1].start_time, page[-1].id)
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert [entry for page in pages for entry in page] == newest_first
+
+    alpha_page = db.get_entries_page(
+        3, before=(entries[20].start_time, 0), start=entries[4].start_time, project="alpha"
+    )
+    assert [entry.description for entry in alpha_page] == ["task 18", "task 16", "task 14"]
+
+    assert db.count_entries() == 23
+    assert db.count_entries(entries[4].start_time, entries[10].start_time, "beta") == 3
+
+
+def test_busy_timeout(db):
+    # PRAGMA busy_timeout returns its value in a column named timeout
+    assert next(iter(db.db.query("PRAGMA busy_timeout")))["timeout"] == 5000
+    patient_db = Database(development=True, busy_timeout=250)
+    assert next(iter(patient_db.db.query("PRAGMA busy_timeout")))["timeout"] == 250
+    assert db.pragmas["busy_timeout"] == 5000
+
+    with pytest.raises(ValueError, match="busy_timeout"):
+        Database(development=True, busy_timeout=-1)
+
+
+def test_write_transaction(db):
+    db_path = db.db.engine.url.database
+    other = sqlite3.connect(
+        db_path, timeout=0, isolation_level=None, check_same_thread=False
+    )
+    impatient_db = Database(development=True, busy_timeout=0)
+
+    # BEGIN IMMEDIATE holds the write lock from the start of the transaction
+    with db.write_transaction():
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("BEGIN IMMEDIATE")
+
+    # Retries give up once the other writer outlasts them
+    other.execute("BEGIN IMMEDIATE")
+    with pytest.raises(OperationalError, match="locked"):
+        with impatient_db.write_transaction(retries=2, backoff=0.001):
+            pass
+
+    # And succeed once it commits
+    threading.Timer(0.05, other.execute, ("COMMIT",)).start()
+    impatient_db.add_entries(make_entries(2))
+    assert db.count_entries() == 2
+
+    with pytest.raises(RuntimeError):
+        with db.write_transaction():
+            db.add_entry(make_entries(1)[0])
+            raise RuntimeError
+    assert db.count_entries() == 2
+    other.close()
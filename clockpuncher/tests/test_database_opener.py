@@ -0,0 +1,46 @@
+""" Tests for database_opener.py """
+import pytest
+
+from clockpuncher.database import Database
+from clockpuncher.database_opener import DatabaseOpener, MigrationProgress
+from clockpuncher.migrations import LATEST_VERSION, MIGRATIONS
+from clockpuncher.tests.test_migrations import _legacy_database
+
+
+def test_DatabaseOpener_migrates(tmp_path):
+    db_path = tmp_path / "timer.db"
+    other = _legacy_database(db_path, 20)
+    # Another process holds the write lock, so the migration waits on it
+    other.execute("BEGIN IMMEDIATE")
+    opener = DatabaseOpener(db_uri=db_path).start()
+    assert not opener.wait(0.2)
+    assert opener.progress is None
+    with pytest.raises(RuntimeError):
+        opener.result()
+    other.commit()
+
+    assert opener.wait(10)
+    db = opener.result()
+    assert opener.progress == MigrationProgress(MIGRATIONS[0].description, 21, 21)
+    assert str(opener.progress).endswith("21 of 21 rows")
+    assert db._scalar("SELECT MAX(version) FROM schema_version") == LATEST_VERSION
+    assert db.count_entries() == 21
+    other.close()
+
+
+def test_DatabaseOpener_error(tmp_path):
+    db_path = tmp_path / "timer.db"
+    Database(db_path, timestamps="epoch")
+    opener = DatabaseOpener(db_uri=db_path, timestamps="text").start()
+    assert opener.wait(10)
+    with pytest.raises(ValueError, match="stores epoch timestamps"):
+        opener.result()
+    assert opener.progress is None
+
+
+def test_MigrationProgress():
+    assert MigrationProgress("rollup", 250, 1000).fraction == 0.25
+    assert MigrationProgress("rollup", 0, 0).fraction == 1.0
+    assert str(MigrationProgress("rollup", 2500, 10000)) == (
+        "Upgrading timer.db, rollup: 2,500 of 10,000 rows"
+    )
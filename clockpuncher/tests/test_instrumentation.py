@@ -0,0 +1,70 @@
+""" Tests for instrumentation.py """
+import json
+import time
+
+from clockpuncher.database import Database
+from clockpuncher.instrumentation import Instrumentation, RollingTimer, TimingSummary
+from clockpuncher.platform_local_storage import (
+    destroy_development_files,
+    initialize_development_files,
+)
+
+
+def test_RollingTimer():
+    rolling_timer = RollingTimer(window=100)
+    assert rolling_timer.summary() == TimingSummary(0, 0.0, 0.0, 0.0)
+
+    for duration_ms in range(1, 201):
+        rolling_timer.record(duration_ms * 1_000_000)
+
+    summary = rolling_timer.summary()
+    # Only the last 100 samples (101..200 ms) are in the window
+    assert summary.count == 200
+    assert summary.p50 == 150.0
+    assert summary.p95 == 195.0
+    assert summary.max == 200.0
+
+
+def test_Instrumentation_time_and_wrap():
+    instrumentation = Instrumentation()
+
+    with instrumentation.time("block"):
+        time.sleep(0.001)
+
+    def add(left, right):
+        return left + right
+
+    timed_add = instrumentation.wrap(add, "add")
+    assert timed_add(1, 2) == 3
+    assert timed_add.__name__ == "add"
+
+    summaries = instrumentation.summaries()
+    assert list(summaries) == ["add", "block"]
+    assert summaries["block"].max >= 1.0
+    assert summaries["add"].count == 1
+
+
+def test_Instrumentation_instrument_database(tmp_path):
+    initialize_development_files()
+    try:
+        db = Database(development=True)
+        instrumentation = Instrumentation()
+        instrumentation.instrument(db, "db")
+
+        db.get_all_entries()
+        db.get_project_names()
+        db.get_project_names()
+
+        summaries = instrumentation.summaries()
+        assert summaries["db.get_all_entries"].count == 1
+        assert summaries["db.get_project_names"].count == 2
+        assert "db.add_entry" not in summaries
+        # Other Database instances are untouched
+        assert "get_all_entries" not in vars(Database(development=True))
+
+        exported = instrumentation.export_json(tmp_path / "timings.json")
+        data = json.loads(exported.read_text())
+        assert set(data["db.get_project_names"]) == {"count", "p50", "p95", "max"}
+        assert data["db.get_project_names"]["count"] == 2
+    finally:
+        destroy_development_files()
@@ -0,0 +1,228 @@
+""" Tests for the migrations package and Database.init_db upgrades """
+import datetime
+import shutil
+import sqlite3
+
+import dataset
+import pytest
+
+from clockpuncher.database import Database
+from clockpuncher.migrations import (
+    BACKFILL_CHUNK_SIZE,
+    LATEST_VERSION,
+    MIGRATIONS,
+    Backfill,
+    Migration,
+    apply_migrations,
+    finish_backfill,
+    start_backfill,
+)
+from clockpuncher.models import Entry
+
+INSERT_ENTRY = (
+    "INSERT INTO entries (project_name, description, start_time, end_time) "
+    "VALUES (?, '', ?, ?)"
+)
+
+
+def _entry_row(idx):
+    start = datetime.datetime(2021, 3, 1, 8) + datetime.timedelta(minutes=37 * idx)
+    end = start + datetime.timedelta(minutes=20, microseconds=idx)
+    return (
+        ("alpha", "beta", "gamma")[idx % 3],
+        start.isoformat(sep=" ", timespec="microseconds"),
+        end.isoformat(sep=" ", timespec="microseconds"),
+    )
+
+
+def _legacy_database(db_path, rows):
+    # What older versions left behind: dataset inferred tables and nothing else
+    legacy = dataset.connect(f"sqlite:///{db_path}")
+    legacy["entries"].insert(
+        dict(
+            project_name="alpha",
+            description="",
+            start_time=datetime.datetime(2021, 3, 1, 7),
+            end_time=datetime.datetime(2021, 3, 1, 7, 30),
+        )
+    )
+    legacy.engine.dispose()
+    connection = sqlite3.connect(db_path)
+    connection.executemany(INSERT_ENTRY, [_entry_row(idx) for idx in range(rows)])
+    connection.commit()
+    return connection
+
+
+def _approx_totals(db):
+    return [
+        (day, name, pytest.approx(seconds), count)
+        for day, name, seconds, count in db.get_daily_totals()
+    ]
+
+
+def test_rollup_backfill_resumes(tmp_path):
+    db_path = tmp_path / "timer.db"
+    rows = BACKFILL_CHUNK_SIZE * 2 + 500
+    other = _legacy_database(db_path, rows)
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt(description, done, total):
+        assert description == MIGRATIONS[0].description
+        assert (done, total) == (BACKFILL_CHUNK_SIZE, rows + 1)
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        Database(db_path, migration_progress=interrupt)
+
+    # Another process keeps writing around the rows the backfill has and hasn't reached
+    other.execute("UPDATE entries SET project_name = 'delta' WHERE id IN (5, 15000)")
+    other.execute("DELETE FROM entries WHERE id IN (6, 15001, ?)", (rows + 1,))
+    # Reuses the deleted highest id, which the backfill hasn't reached either
+    other.execute(INSERT_ENTRY, _entry_row(0))
+    other.commit()
+    expected = other.execute("SELECT * FROM entries ORDER BY id").fetchall()
+
+    reported = list()
+    db = Database(
+        db_path, migration_progress=lambda _, done, total: reported.append((done, total))
+    )
+    assert reported == [
+        (BACKFILL_CHUNK_SIZE * 2 - 1, rows - 1),
+        (rows - 1, rows - 1),
+    ]
+    assert other.execute("SELECT * FROM entries ORDER BY id").fetchall() == expected
+    # The dataset inferred table is left alone, see test_rebuild_tables
+    columns = other.execute("PRAGMA table_info(entries)").fetchall()
+    assert not any(not_null for _, name, _, not_null, _, _ in columns if name != "id")
+    other.execute(INSERT_ENTRY, _entry_row(7))
+    other.commit()
+    migrated = _approx_totals(db)
+    db.backfill_daily_rollup()
+    assert migrated == db.get_daily_totals()
+
+    assert [row["version"] for row in db.db.query("SELECT version FROM schema_version")] == [
+        migration.version for migration in MIGRATIONS
+    ]
+    assert db.db["backfill_progress"].count() == 0
+    other.close()
+
+
+def test_rebuild_tables(tmp_path, monkeypatch):
+    db_path = tmp_path / "timer.db"
+    other = _legacy_database(db_path, 20)
+    other.execute("UPDATE entries SET description = NULL WHERE id = 2")
+    other.execute("UPDATE entries SET start_time = NULL WHERE id = 3")
+    other.execute("UPDATE entries SET start_time = NULL, end_time = NULL WHERE id = 4")
+    other.commit()
+    db = Database(db_path)
+    expected = other.execute(
+        "SELECT id, project_name, COALESCE(description, ''), COALESCE(start_time, end_time), "
+        "end_time FROM entries WHERE id != 4 ORDER BY id"
+    ).fetchall()
+
+    full_disk = shutil.disk_usage(tmp_path)._replace(free=0)
+    monkeypatch.setattr(shutil, "disk_usage", lambda _: full_disk)
+    with pytest.raises(OSError, match="free bytes"):
+        db.rebuild_tables()
+    names = {name for (name,) in other.execute("SELECT name FROM sqlite_master")}
+    assert "entries_typed" not in names
+    monkeypatch.undo()
+
+    reported = list()
+    assert db.rebuild_tables(chunk_size=8, progress=lambda *args: reported.append(args)) == [
+        "entries"
+    ]
+    assert reported == [("entries", 8, 21), ("entries", 16, 21), ("entries", 21, 21)]
+    assert other.execute("SELECT * FROM entries ORDER BY id").fetchall() == expected
+    assert {
+        name: not_null for _, name, _, not_null, _, _ in other.execute("PRAGMA table_info(entries)")
+    } == dict(id=0, project_name=1, description=1, start_time=1, end_time=1)
+    # VACUUM handed the old table's pages back
+    assert other.execute("PRAGMA freelist_count").fetchone() == (0,)
+    migrated = _approx_totals(db)
+    db.backfill_daily_rollup()
+    assert migrated == db.get_daily_totals()
+    now = datetime.datetime.now()
+    assert db.add_entry(Entry(None, "alpha", "", now, now)) == 22
+    assert db.rebuild_tables() == []
+    other.close()
+
+
+def test_entry_edit_log_migration(tmp_path):
+    db_path = tmp_path / "timer.db"
+    Database(db_path)
+    # What version 1 left behind: a single row counter instead of entry_edit_log
+    connection = sqlite3.connect(db_path)
+    connection.executescript(
+        """
+        DROP TABLE entry_edit_log;
+        DELETE FROM schema_version WHERE version > 1;
+        CREATE TABLE entry_edits (id INTEGER PRIMARY KEY CHECK (id = 1), edits INTEGER NOT NULL);
+        INSERT INTO entry_edits (id, edits) VALUES (1, 0);
+        CREATE TRIGGER entries_edits_update AFTER UPDATE ON entries
+        BEGIN UPDATE entry_edits SET edits = edits + 1; END;
+        CREATE TRIGGER entries_edits_delete AFTER DELETE ON entries
+        BEGIN UPDATE entry_edits SET edits = edits + 1; END;
+        """
+    )
+    connection.executemany(INSERT_ENTRY, [_entry_row(idx) for idx in range(3)])
+    connection.commit()
+
+    db = Database(db_path)
+    names = {name for (name,) in connection.execute("SELECT name FROM sqlite_master")}
+    assert "entry_edits" not in names and "entries_edits_update" not in names
+    assert {"entry_edit_log", "entries_edit_log_update", "entries_edit_log_delete"} <= names
+    connection.execute("UPDATE entries SET description = 'edited' WHERE id = 2")
+    connection.execute("DELETE FROM entries WHERE id = 3")
+    connection.commit()
+    assert connection.execute("SELECT entry_id FROM entry_edit_log").fetchall() == [(2,), (3,)]
+    assert db._scalar("SELECT MAX(version) FROM schema_version") == LATEST_VERSION
+    connection.close()
+
+
+def test_migration_framework(tmp_path):
+    db = Database(tmp_path / "timer.db")
+    assert [row["version"] for row in db.db.query("SELECT version FROM schema_version")] == [
+        migration.version for migration in MIGRATIONS
+    ]
+    connection = sqlite3.connect(tmp_path / "timer.db")
+    connection.executemany(INSERT_ENTRY, [_entry_row(idx) for idx in range(10)])
+    connection.commit()
+    connection.close()
+
+    def upper_case_projects(context):
+        backfill = Backfill(
+            "upper_case_projects",
+            "UPDATE entries SET project_name = upper(project_name) "
+            "WHERE id > :after_id AND id <= :upto_id",
+        )
+        with context.db.write_transaction():
+            start_backfill(context.db, backfill)
+        context.backfill(backfill)
+        with context.db.write_transaction():
+            finish_backfill(context.db, backfill)
+
+    migrations = [
+        *MIGRATIONS,
+        Migration(LATEST_VERSION + 1, "upper case project names", upper_case_projects),
+    ]
+    reported = list()
+    applied = apply_migrations(
+        db,
+        migrations,
+        LATEST_VERSION,
+        chunk_size=4,
+        progress=lambda *args: reported.append(args),
+    )
+    assert applied == [LATEST_VERSION + 1]
+    assert reported == [
+        ("upper case project names", 4, 10),
+        ("upper case project names", 8, 10),
+        ("upper case project names", 10, 10),
+    ]
+    assert set(db.get_project_names()) <= {"ALPHA", "BETA", "GAMMA"}
+    assert {name for _, name, _, _ in db.get_daily_totals()} == {"ALPHA", "BETA", "GAMMA"}
+    assert apply_migrations(db, migrations, LATEST_VERSION + 1) == []
+    assert db._scalar("SELECT MAX(version) FROM schema_version") == LATEST_VERSION + 1
@@ -2,12 +2,14 @@
 # and is provided under the Creative Commons Zero public domain dedication.
 
 import dataclasses
+import datetime
 
+import pytest
 from hypothesis import given
 from hypothesis import strategies as st
 
 import clockpuncher.models as models
-from clockpuncher.tests.utils import INT8_RANGE
+from clockpuncher.tests.utils import INT8_RANGE, entry_build_strategy, epoch_entry_strategy
 
 
 @given(
@@ -73,3 +75,105 @@ def test_fuzz_Project_valid(
         client=client,
         project_name=project_name,
     )
+
+
+@given(
+    id=st.integers(**INT8_RANGE),
+    project_name=st.text(),
+    description=st.text(),
+    start_time=st.datetimes(),
+    end_time=st.datetimes(),
+)
+def test_Entry_from_row(id, project_name, description, start_time, end_time):
+    validated = models.Entry(id, project_name, description, start_time, end_time)
+    row = dict(
+        id=id,
+        project_name=project_name,
+        description=description,
+        start_time=start_time.isoformat(sep=" "),
+        end_time=end_time,
+    )
+    assert models.Entry._from_row(row) == validated
+    assert models.Entry._from_tuple(tuple(row.values())) == validated
+
+
+def test_validation_errors():
+    with pytest.raises(AttributeError, match="2 invalid attributes") as error_info:
+        models.Project(
+            id=None,
+            weekly_hour_allotment=2 ** 63,
+            monthly_frequency=1,
+            rate="thirty",
+            client="client",
+            project_name="project",
+        )
+    assert "weekly_hour_allotment cannot be converted to int8" in str(error_info.value)
+    assert "Attribute rate must match type <class 'int'>" in str(error_info.value)
+
+    coerced = models.Entry(
+        id=None,
+        project_name="project",
+        description="description",
+        start_time="2021-03-01 08:00:00.000000",
+        end_time=datetime.datetime(2021, 3, 1, 9),
+    )
+    assert coerced.start_time == datetime.datetime(2021, 3, 1, 8)
+    with pytest.raises(AttributeError, match="Attribute start_time must match type"):
+        models.Entry(None, "project", "description", "not a date", coerced.end_time)
+
+
+@given(entries=st.lists(epoch_entry_strategy, max_size=30), data=st.data())
+def test_EntryBatch(entries, data):
+    batch = models.EntryBatch.from_entries(entries)
+    assert len(batch) == len(entries)
+    assert list(batch) == entries
+
+    start, stop = sorted(data.draw(st.tuples(st.integers(0, 30), st.integers(0, 30))))
+    assert list(batch[start:stop]) == entries[start:stop]
+
+    assert batch.duration == sum(
+        (entry.duration for entry in entries), datetime.timedelta()
+    )
+    assert list(batch.duration_us) == [
+        entry.duration // datetime.timedelta(microseconds=1) for entry in entries
+    ]
+
+    if entries:
+        project_name = entries[0].project_name
+        assert list(batch.select_project(project_name)) == [
+            entry for entry in entries if entry.project_name == project_name
+        ]
+        pivot = entries[0].start_time
+        assert list(batch.between(start=pivot)) == [
+            entry for entry in entries if entry.start_time >= pivot
+        ]
+        assert batch.project_durations()[project_name] == sum(
+            (entry.duration for entry in entries if entry.project_name == project_name),
+            datetime.timedelta(),
+        )
+
+
+@given(entries=st.lists(entry_build_strategy, min_size=4, max_size=10))
+def test_EntryCollection(entries):
+    collection = models.EntryCollection(entries[:2], max_log=3)
+    assert list(collection) == entries[:2]
+    assert collection.changes_since(None) is None
+    assert collection.changes_since(collection.version) == []
+
+    start_version = collection.version
+    collection.append(entries[2])
+    collection.append(entries[3])
+    assert collection.changes_since(start_version) == entries[2:4]
+    assert collection.changes_since(start_version + 1) == entries[3:4]
+    assert len(collection) == 4
+
+    collection.extend(entries[4:])
+    if len(entries) - 2 > 3:
+        # Log overflowed so a consumer that far behind has to rebuild
+        assert collection.changes_since(start_version) is None
+    assert list(collection) == entries
+
+    replaced_version = collection.version
+    collection.replace(entries[:1])
+    assert collection.changes_since(replaced_version) is None
+    assert list(collection) == entries[:1]
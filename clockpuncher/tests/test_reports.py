@@ -0,0 +1,93 @@
+""" Tests for reports.py """
+import datetime
+
+import pytest
+
+from clockpuncher.billing import compute_billing
+from clockpuncher.models import Project
+from clockpuncher.reports import (
+    ReportRunner,
+    invoice_lines,
+    month_partitions,
+    utilisation_summary,
+)
+from clockpuncher.tests.test_database import db  # pylint: disable=unused-import
+from clockpuncher.tests.utils import make_entries
+
+
+def _projects():
+    return [
+        Project(
+            id=None,
+            weekly_hour_allotment=10,
+            monthly_frequency=frequency,
+            rate=30 * frequency,
+            client="Acme",
+            project_name=name,
+        )
+        for frequency, name in ((1, "alpha"), (2, "beta"))
+    ]
+
+
+def test_month_partitions():
+    assert month_partitions(
+        datetime.datetime(2020, 11, 20), datetime.datetime(2021, 2, 2)
+    ) == [
+        (datetime.datetime(2020, 11, 20), datetime.datetime(2020, 12, 1)),
+        (datetime.datetime(2020, 12, 1), datetime.datetime(2021, 1, 1)),
+        (datetime.datetime(2021, 1, 1), datetime.datetime(2021, 2, 1)),
+        (datetime.datetime(2021, 2, 1), datetime.datetime(2021, 2, 2)),
+    ]
+    moment = datetime.datetime(2021, 1, 1)
+    assert month_partitions(moment, moment) == []
+
+
+def test_ReportRunner(db):
+    for project in _projects():
+        db.add_project(project)
+    entries = make_entries(
+        500,
+        start=datetime.datetime(2021, 1, 3, 8),
+        step=datetime.timedelta(hours=13),
+        duration=datetime.timedelta(minutes=50),
+        project_names=("alpha", "beta", "gamma"),
+    )
+    db.add_entries(entries)
+
+    runner = ReportRunner(db, max_workers=2)
+    in_process = runner.run(parallel=False)
+    assert runner.run(parallel=True) == in_process
+
+    assert sum(totals.entry_count for totals in in_process.weekly.values()) == 500
+    assert sum(totals.seconds for totals in in_process.pay_periods.values()) == (
+        pytest.approx(500 * 50 * 60)
+    )
+    assert list(in_process.weekly) == sorted(in_process.weekly)
+
+    # Same pay period buckets and prices as the rollup based billing
+    projects = db.get_all_projects(eager_loading=True)
+    billed = compute_billing(db)
+    reported = invoice_lines(in_process, projects)
+    assert [
+        line._replace(seconds=pytest.approx(line.seconds)) for line in reported
+    ] == billed
+
+    utilisation = utilisation_summary(in_process, projects)
+    first_alpha_week = next(
+        line for line in utilisation if line.project_name == "alpha"
+    )
+    assert first_alpha_week.utilisation == pytest.approx(first_alpha_week.hours / 10)
+    assert all(
+        line.utilisation is None for line in utilisation if line.project_name == "gamma"
+    )
+
+    bounded = runner.run(datetime.datetime(2021, 2, 1), datetime.datetime(2021, 3, 1))
+    assert sum(totals.entry_count for totals in bounded.weekly.values()) == sum(
+        datetime.datetime(2021, 2, 1) <= entry.start_time < datetime.datetime(2021, 3, 1)
+        for entry in entries
+    )
+
+
+def test_ReportRunner_empty(db):
+    report = ReportRunner(db).run()
+    assert report.weekly == {} and report.pay_periods == {}
@@ -0,0 +1,128 @@
+""" Tests for schema.py and Database.init_db """
+import datetime
+import sqlite3
+
+import dataset
+import pytest
+
+from clockpuncher.database import Database
+from clockpuncher.models import Entry
+from clockpuncher.migrations import MIGRATIONS
+from clockpuncher.schema import schema_objects
+from clockpuncher.timestamps import TIMESTAMP_CODECS
+
+
+def _columns(connection, table):
+    return {
+        name: (declared_type, bool(not_null))
+        for _, name, declared_type, not_null, _, _ in connection.execute(
+            f"PRAGMA table_info({table})"
+        )
+    }
+
+
+def _data_version(connection):
+    return connection.execute("PRAGMA data_version").fetchone()[0]
+
+
+@pytest.mark.parametrize("mode", ["text", "epoch"])
+def test_fresh_schema(tmp_path, mode):
+    db_path = tmp_path / "timer.db"
+    Database(db_path, timestamps=mode)
+    connection = sqlite3.connect(db_path)
+
+    names = {name for (name,) in connection.execute("SELECT name FROM sqlite_master")}
+    assert set(schema_objects(TIMESTAMP_CODECS[mode])) <= names
+    time_type = "INTEGER" if mode == "epoch" else "DATETIME"
+    assert _columns(connection, "entries") == {
+        "id": ("INTEGER", False),
+        "project_name": ("TEXT", True),
+        "description": ("TEXT", True),
+        "start_time": (time_type, True),
+        "end_time": (time_type, True),
+    }
+    assert _columns(connection, "projects")["rate"] == ("INTEGER", True)
+    assert connection.execute("SELECT version FROM schema_version").fetchall() == [
+        (migration.version,) for migration in MIGRATIONS
+    ]
+    assert connection.execute("SELECT COUNT(*) FROM entries").fetchone() == (0,)
+    connection.close()
+
+
+def test_open_existing_database_writes_nothing(tmp_path):
+    db_path = tmp_path / "timer.db"
+    Database(db_path).add_entries(
+        [
+            Entry(
+                id=None,
+                project_name="alpha",
+                description="",
+                start_time=datetime.datetime(2021, 3, 1, 9),
+                end_time=datetime.datetime(2021, 3, 1, 10),
+            )
+        ]
+    )
+    connection = sqlite3.connect(db_path)
+    version = _data_version(connection)
+
+    reopened = Database(db_path, read_engine="sqlite3")
+    assert len(reopened.get_all_entries(True)) == 1
+    assert _data_version(connection) == version
+    connection.close()
+
+
+def test_upgrade_database_made_by_dataset(tmp_path):
+    # Older versions let dataset infer the tables and had no rollup or schema_version
+    db_path = tmp_path / "timer.db"
+    legacy = dataset.connect(f"sqlite:///{db_path}")
+    legacy["entries"].insert(
+        dict(
+            project_name="alpha",
+            description="",
+            start_time=datetime.datetime(2021, 3, 1, 9),
+            end_time=datetime.datetime(2021, 3, 1, 10, 30),
+        )
+    )
+    legacy["projects"].insert(
+        dict(
+            project_name="alpha",
+            client="",
+            rate=1,
+            monthly_frequency=1,
+            weekly_hour_allotment=1,
+        )
+    )
+    legacy["entries"].insert(
+        dict(
+            project_name=None,
+            description=None,
+            start_time=datetime.datetime(2021, 3, 2, 9),
+            end_time=None,
+        )
+    )
+    legacy.engine.dispose()
+
+    db = Database(db_path)
+    assert db.get_daily_totals() == [
+        (datetime.date(2021, 3, 1), "alpha", 5400.0, 1),
+        (datetime.date(2021, 3, 2), "", 0.0, 1),
+    ]
+    assert next(iter(db.db.query("SELECT version FROM schema_version")))["version"] == 1
+
+    # Typed columns are opt-in, they take a copy of each table
+    assert db.rebuild_tables() == ["projects", "entries"]
+    fresh = sqlite3.connect(tmp_path / "fresh.db")
+    Database(tmp_path / "fresh.db")
+    upgraded = sqlite3.connect(db_path)
+    for table in ("entries", "projects"):
+        assert _columns(upgraded, table) == _columns(fresh, table)
+    upgraded.close()
+    fresh.close()
+    assert db.get_all_entries(True)[-1].project_name == ""
+    assert db.get_all_entries(True)[-1].duration == datetime.timedelta(0)
+
+    connection = sqlite3.connect(db_path)
+    version = _data_version(connection)
+    Database(db_path)
+    assert _data_version(connection) == version
+    connection.close()
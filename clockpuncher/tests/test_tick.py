@@ -0,0 +1,99 @@
+""" Tests for gui/tick.py """
+import datetime
+
+import pytest
+
+# The gui package imports dearpygui, which has no 0.6 wheels for newer Pythons
+pytest.importorskip("dearpygui.core")
+
+# pylint: disable=wrong-import-position
+from clockpuncher.gui.tick import TickScheduler
+from clockpuncher.gui.timer import Timer
+
+
+class FakeClock:
+    """
+    Clock for TickScheduler, time only moves when a test or sleep moves it
+    """
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps = list()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _scheduler(clock, idle_frame_time=0.1):
+    return TickScheduler(idle_frame_time=idle_frame_time, clock=clock, sleep=clock.sleep)
+
+
+def test_tick_once_per_second():
+    clock = FakeClock(1000.0)
+    ticks = _scheduler(clock)
+    formatted = list()
+    # Three seconds of a tracking timer at 60 frames per second
+    origin = clock()
+    for _ in range(180):
+        if ticks.tick(origin):
+            formatted.append(Timer.time_digits(datetime.timedelta(seconds=clock() - origin)))
+        clock.now += 1 / 60
+    assert formatted == ["000000", "000001", "000002"]
+
+
+def test_tick_second_boundaries():
+    clock = FakeClock(1000.9)
+    ticks = _scheduler(clock)
+    assert ticks.tick()
+    assert not ticks.tick()
+    clock.now = 1000.999
+    assert not ticks.tick()
+    clock.now = 1001.0
+    assert ticks.tick()
+    assert not ticks.tick()
+    # Seconds count from origin, so 1001.4 is still the same second of a timer started at 1000.5
+    clock.now = 1001.4
+    assert ticks.tick(1000.5)
+    assert not ticks.tick(1000.5)
+    clock.now = 1001.5
+    assert ticks.tick(1000.5)
+    # A new origin, e.g. Switch Task, ticks straight away
+    assert ticks.tick(1001.5)
+
+
+def test_invalidate():
+    clock = FakeClock()
+    ticks = _scheduler(clock)
+    assert ticks.tick()
+    # Nothing changed, so frames in the same second do no per-second work
+    assert [ticks.tick() for _ in range(5)] == [False] * 5
+    ticks.invalidate()
+    assert ticks.tick()
+    assert not ticks.tick()
+
+
+def test_throttle():
+    clock = FakeClock()
+    ticks = _scheduler(clock, idle_frame_time=0.1)
+
+    # Idle frames are padded out to idle_frame_time
+    clock.now += 0.03
+    ticks.throttle(idle=True)
+    assert clock.sleeps == [pytest.approx(0.07)]
+    clock.now += 0.01
+    ticks.throttle(idle=True)
+    assert clock.sleeps[-1] == pytest.approx(0.09)
+
+    # Frames that already took the whole budget aren't slowed down further
+    clock.now += 0.25
+    ticks.throttle(idle=True)
+    assert len(clock.sleeps) == 2
+
+    # While tracking frames run unthrottled
+    clock.now += 0.01
+    ticks.throttle(idle=False)
+    assert len(clock.sleeps) == 2
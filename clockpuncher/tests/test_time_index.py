@@ -0,0 +1,196 @@
+""" Tests for time_index.py """
+import datetime
+import random
+from functools import partial
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import datetimes, integers, lists
+
+from clockpuncher.models import Entry
+from clockpuncher.tests.utils import make_entries
+from clockpuncher.time_index import (
+    TimeIndex,
+    day_start,
+    month_start,
+    pay_period_bounds,
+    week_start,
+)
+
+NOW = datetime.datetime(2021, 3, 17, 15, 30)
+# Entries with ids from 1, seven hours apart from 2021-01-01 09:00
+_entries = partial(
+    make_entries,
+    start=datetime.datetime(2021, 1, 1, 9),
+    step=datetime.timedelta(hours=7),
+    duration=datetime.timedelta(hours=1),
+    project_names=("beta", "alpha"),
+    first_id=1,
+)
+
+
+def _brute_force(entries, start, end):
+    return sorted(
+        (
+            entry
+            for entry in entries
+            if (start is None or start <= entry.start_time)
+            and (end is None or entry.start_time < end)
+        ),
+        key=lambda entry: entry.start_time,
+    )
+
+
+def test_boundaries():
+    assert day_start(NOW) == datetime.datetime(2021, 3, 17)
+    assert week_start(NOW) == datetime.datetime(2021, 3, 15)
+    assert month_start(NOW) == datetime.datetime(2021, 3, 1)
+
+
+@pytest.mark.parametrize(
+    "moment,frequency,expected",
+    [
+        (NOW, 2, (datetime.datetime(2021, 3, 16), datetime.datetime(2021, 4, 1))),
+        (
+            datetime.datetime(2021, 3, 15, 23),
+            2,
+            (datetime.datetime(2021, 3, 1), datetime.datetime(2021, 3, 16)),
+        ),
+        (NOW, 1, (datetime.datetime(2021, 3, 1), datetime.datetime(2021, 4, 1))),
+        (
+            datetime.datetime(2021, 12, 31),
+            4,
+            (datetime.datetime(2021, 12, 24), datetime.datetime(2022, 1, 1)),
+        ),
+        (
+            datetime.datetime(2021, 2, 14),
+            2,
+            (datetime.datetime(2021, 2, 1), datetime.datetime(2021, 2, 15)),
+        ),
+    ],
+)
+def test_pay_period_bounds(moment, frequency, expected):
+    assert pay_period_bounds(moment, frequency) == expected
+
+
+def test_pay_period_bounds_invalid():
+    with pytest.raises(ValueError):
+        pay_period_bounds(NOW, 0)
+
+
+def test_TimeIndex_between():
+    entries = _entries(300)
+    random.Random(0).shuffle(entries)
+    index = TimeIndex(entries)
+    assert len(index) == 300
+
+    for boundary in (day_start(NOW), week_start(NOW), month_start(NOW)):
+        assert index.between(boundary) == _brute_force(entries, boundary, None)
+    assert index.between(*pay_period_bounds(NOW, 2)) == _brute_force(
+        entries, *pay_period_bounds(NOW, 2)
+    )
+    assert index.between() == _brute_force(entries, None, None)
+    assert index.between(project="alpha") == [
+        entry for entry in index.between() if entry.project_name == "alpha"
+    ]
+    assert index.count(month_start(NOW)) == len(index.between(month_start(NOW)))
+
+
+@given(
+    offsets=lists(integers(min_value=0, max_value=24 * 120), max_size=50),
+    start=datetimes(
+        min_value=datetime.datetime(2020, 12, 1), max_value=datetime.datetime(2021, 6, 1)
+    ),
+    span_hours=integers(min_value=0, max_value=24 * 60),
+)
+def test_TimeIndex_add(offsets, start, span_hours):
+    entries = _entries(100)
+    index = TimeIndex(entries)
+    for hours in offsets:
+        entry_start = datetime.datetime(2021, 1, 1) + datetime.timedelta(hours=hours)
+        entry = Entry(
+            id=None,
+            project_name="gamma",
+            description="",
+            start_time=entry_start,
+            end_time=entry_start + datetime.timedelta(minutes=30),
+        )
+        index.add(entry)
+        entries.append(entry)
+
+    end = start + datetime.timedelta(hours=span_hours)
+    assert index.between(start, end) == _brute_force(entries, start, end)
+    for boundary in (day_start(start), week_start(start), month_start(start)):
+        assert index.between(boundary) == _brute_force(entries, boundary, None)
+    for boundary, position in index.boundary_offsets.items():
+        assert position == len(_brute_force(entries, None, boundary))
+
+
+def test_TimeIndex_remove():
+    entries = _entries(100)
+    index = TimeIndex(entries)
+    removed = [entries[0], entries[40], entries[41], entries[99]]
+    for entry in removed:
+        assert index.remove(entry.id, entry.start_time) is entry
+    assert index.remove(entries[40].id, entries[40].start_time) is None
+    # Only an entry with that id and start_time is taken out
+    assert index.remove(entries[1].id, entries[2].start_time) is None
+
+    remaining = [entry for entry in entries if entry not in removed]
+    assert index.between() == remaining
+    for boundary, position in index.boundary_offsets.items():
+        assert position == len(_brute_force(remaining, None, boundary))
+    for moment in (NOW, entries[40].start_time, entries[41].start_time):
+        assert index.between(day_start(moment)) == _brute_force(
+            remaining, day_start(moment), None
+        )
+
+    # Sequence numbers aren't reused, so page cursors stay unique
+    entry = _entries(1, first_id=500, start=entries[96].start_time)[0]
+    index.add(entry)
+    assert index.cursor(entry)[1] > index.cursor(entries[96])[1]
+
+
+def test_TimeIndex_page():
+    entries = _entries(25)
+    index = TimeIndex(entries)
+    newest_first = entries[::-1]
+
+    pages, before = list(), None
+    while True:
+        page = index.page(10, before)
+        if not page:
+            break
+        pages.append(page)
+        before = index.cursor(page[-1])
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [entry for page in pages for entry in page] == newest_first
+
+    range_start = entries[5].start_time
+    range_end = entries[15].start_time
+    assert index.page(100, None, range_start, range_end) == entries[5:15][::-1]
+
+
+def test_TimeIndex_page_unsaved_ties():
+    entries = _entries(6)
+    index = TimeIndex(entries)
+    # Still in the write-behind queue, so no ids, all starting with the newest saved entry
+    unsaved = _entries(5, start=entries[-1].start_time, step=datetime.timedelta(0))
+    for entry in unsaved:
+        entry.id = None
+        index.add(entry)
+    newest_first = (entries + unsaved)[::-1]
+
+    pages, before = list(), None
+    while True:
+        page = index.page(2, before)
+        if not page:
+            break
+        pages.append(page)
+        before = index.cursor(page[-1])
+    paged = [entry for page in pages for entry in page]
+    assert len(paged) == len(newest_first)
+    assert all(entry is expected for entry, expected in zip(paged, newest_first))
+
+    with pytest.raises(ValueError, match="not in the index"):
+        index.cursor(_entries(1)[0])
@@ -0,0 +1,104 @@
+""" Tests for gui/timer.py """
+import datetime
+from unittest.mock import call, patch
+
+import pytest
+
+# The gui package imports dearpygui, which has no 0.6 wheels for newer Pythons
+c = pytest.importorskip("dearpygui.core")
+
+# pylint: disable=wrong-import-position
+from clockpuncher.gui.timer import (
+    DIGITS,
+    SEGMENT_LAYOUT,
+    SEGMENT_POINTS,
+    Digit,
+    Number,
+    Timer,
+)
+
+ON = [120, 255, 120]
+OFF = [255, 255, 255, 0]
+
+
+def _toggled(modify_draw_command):
+    """
+    (canvas, segment tag) -> whether modify_draw_command lit it, one key per call
+    """
+    toggled = dict()
+    for args, kwargs in modify_draw_command.call_args_list:
+        canvas, tag = args
+        toggled[(canvas, tag)] = kwargs["fill"] == ON
+    return toggled
+
+
+def test_segment_points():
+    assert set(SEGMENT_POINTS) == set(SEGMENT_LAYOUT)
+    assert SEGMENT_POINTS["top"][0] == [3, 0]
+    assert SEGMENT_POINTS["bottom_right"][1] == [66, 86.6]
+    assert set().union(*DIGITS.values()) == set(SEGMENT_LAYOUT)
+
+
+def test_Number_render_diff():
+    number = Number(canvas="cell")
+    with patch.object(c, "modify_draw_command") as modify_draw_command:
+        number.render(Digit.num_8, "8")
+        assert _toggled(modify_draw_command) == {
+            ("cell", tag): True for tag in SEGMENT_LAYOUT
+        }
+
+        # 8 -> 0 only turns off the middle bar
+        modify_draw_command.reset_mock()
+        number.render(Digit.num_0, "0")
+        assert modify_draw_command.call_args_list == [call("cell", "center", fill=OFF)]
+
+        # The same digit again touches nothing
+        modify_draw_command.reset_mock()
+        number.render(Digit.num_0, "0")
+        assert modify_draw_command.call_count == 0
+
+        number.clear()
+        assert _toggled(modify_draw_command) == {("cell", tag): False for tag in Digit.num_0}
+
+
+@pytest.mark.parametrize("old", sorted(DIGITS))
+def test_Number_render_every_pair(old):
+    for new in sorted(DIGITS):
+        number = Number(canvas="cell")
+        with patch.object(c, "modify_draw_command") as modify_draw_command:
+            number.render(DIGITS[old], old)
+            modify_draw_command.reset_mock()
+            number.render(DIGITS[new], new)
+        toggled = _toggled(modify_draw_command)
+        assert modify_draw_command.call_count == len(toggled)
+        assert toggled == {
+            ("cell", tag): tag in DIGITS[new]
+            for tag in DIGITS[old].symmetric_difference(DIGITS[new])
+        }
+
+
+def test_Timer_render_changed_cells():
+    timer = Timer()
+    with patch.object(c, "modify_draw_command") as modify_draw_command:
+        timer.render(time_to_render=datetime.timedelta(minutes=59, seconds=59))
+        modify_draw_command.reset_mock()
+        timer.render(time_to_render=datetime.timedelta(hours=1))
+        # 00:59:59 -> 01:00:00, the first hour digit stays 0
+        assert {canvas for canvas, _ in _toggled(modify_draw_command)} == {
+            "hour_1",
+            "min_0",
+            "min_1",
+            "sec_0",
+            "sec_1",
+        }
+        # 5 -> 0 and 9 -> 0 twice, 0 -> 1 in the hours
+        assert modify_draw_command.call_count == 3 + 3 + 3 + 3 + 4
+
+        modify_draw_command.reset_mock()
+        timer.render(time_to_render=datetime.timedelta(hours=1))
+        assert modify_draw_command.call_count == 0
+
+
+def test_time_digits():
+    assert Timer.time_digits(datetime.timedelta(hours=25, minutes=3, seconds=7)) == "010307"
+    assert Timer.time_digits(datetime.datetime(2021, 3, 1, 9, 41, 5, 999)) == "094105"
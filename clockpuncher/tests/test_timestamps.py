@@ -0,0 +1,140 @@
+""" Tests for timestamps.py and epoch timestamp storage in database.py """
+import datetime
+import sqlite3
+from functools import partial
+
+import pytest
+from hypothesis import given
+
+from clockpuncher.database import Database
+from clockpuncher.tests.utils import EPOCH_DATETIMES, make_entries
+from clockpuncher.timestamps import datetime_to_utc_us, utc_us_to_datetime
+
+
+# Seven hours apart, the microseconds check they survive every storage mode
+_entries = partial(
+    make_entries,
+    start=datetime.datetime(2021, 3, 1, 8, 0, 0, 250),
+    step=datetime.timedelta(hours=7),
+)
+
+
+def _stored_types(db):
+    connection = sqlite3.connect(db.db.engine.url.database)
+    types = connection.execute(
+        "SELECT DISTINCT typeof(start_time), typeof(end_time) FROM entries"
+    ).fetchall()
+    connection.close()
+    return types
+
+
+@given(EPOCH_DATETIMES)
+def test_utc_us_round_trip(moment):
+    assert utc_us_to_datetime(datetime_to_utc_us(moment)) == moment
+
+
+def test_epoch_database_matches_text(tmp_path):
+    text_db = Database(tmp_path / "text.db")
+    epoch_db = Database(tmp_path / "epoch.db", timestamps="epoch")
+    for db in (text_db, epoch_db):
+        db.add_entries(_entries(40))
+    assert _stored_types(epoch_db) == [("integer", "integer")]
+    assert epoch_db.timestamps.mode == "epoch"
+
+    start, end = datetime.datetime(2021, 3, 3), datetime.datetime(2021, 3, 8, 3)
+    assert epoch_db.get_all_entries(True) == text_db.get_all_entries(True)
+    assert epoch_db.get_entries_between(start, end) == text_db.get_entries_between(
+        start, end
+    )
+    assert epoch_db.count_entries(start, end, "beta") == text_db.count_entries(
+        start, end, "beta"
+    )
+    assert epoch_db.get_entries_page(5, start=start) == text_db.get_entries_page(
+        5, start=start
+    )
+    assert epoch_db.get_daily_totals() == [
+        (day, name, pytest.approx(seconds), count)
+        for day, name, seconds, count in text_db.get_daily_totals()
+    ]
+    assert epoch_db.project_duration_totals(start) == [
+        (name, pytest.approx(seconds))
+        for name, seconds in text_db.project_duration_totals(start)
+    ]
+    first = text_db.get_all_entries(True)[0]
+    assert epoch_db.get_multi_entries(True, start_time=first.start_time) == [first]
+
+    reader_db = Database(tmp_path / "epoch.db", read_engine="sqlite3")
+    assert reader_db.timestamps.mode == "epoch"
+    assert reader_db.get_entries_between(start, end) == text_db.get_entries_between(
+        start, end
+    )
+    assert len(reader_db.get_entry_batch(start, end)) == len(
+        text_db.get_entry_batch(start, end)
+    )
+
+    readable = next(iter(epoch_db.db.query("SELECT * FROM entries_readable LIMIT 1")))
+    assert readable["start_time"] == "2021-03-01 08:00:00.000250"
+    assert readable["duration_seconds"] == 45 * 60
+
+    with pytest.raises(ValueError, match="stores epoch timestamps"):
+        Database(tmp_path / "epoch.db", timestamps="text")
+    with pytest.raises(ValueError, match="timestamps must be one of"):
+        Database(tmp_path / "other.db", timestamps="unix")
+
+
+def test_migrate_timestamps_resumes(tmp_path):
+    db_path = tmp_path / "timer.db"
+    db = Database(db_path)
+    db.add_entries(_entries(25))
+    rollup_before = {(day, name): seconds for day, name, seconds, _ in db.get_daily_totals()}
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt(copied, total):
+        assert total == 25
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        db.migrate_timestamps(chunk_size=10, progress=interrupt)
+    assert db.timestamps.mode == "text"
+
+    # Another text mode process keeps working mid migration
+    other = Database(db_path)
+    first, last = other.get_all_entries(True)[0], other.get_all_entries(True)[-1]
+    other.entries.update(dict(id=first.id, description="edited"), ["id"])
+    other.entries.delete(id=last.id)
+    other.add_entry(_entries(26)[-1])
+    expected = other.get_all_entries(True)
+
+    reported = list()
+    migrated = db.migrate_timestamps(
+        chunk_size=10, progress=lambda copied, total: reported.append(copied)
+    )
+    assert migrated == 25
+    assert reported == [20, 25]
+    assert db.timestamps.mode == "epoch"
+    assert _stored_types(db) == [("integer", "integer")]
+
+    reopened = Database(db_path)
+    assert reopened.timestamps.mode == "epoch"
+    assert reopened.get_all_entries(True) == expected
+    assert db.get_all_entries(True) == expected
+    assert expected[0].description == "edited"
+    assert "entries_epoch" not in reopened.db.tables
+
+    # Rollup triggers were rebuilt for integer times
+    db.add_entry(_entries(1)[0])
+    totals = {(day, name): seconds for day, name, seconds, _ in db.get_daily_totals()}
+    key = (datetime.date(2021, 3, 1), "alpha")
+    assert totals[key] == pytest.approx(rollup_before[key] + 45 * 60)
+    assert db.migrate_timestamps() == 26
+
+    # Text written by a process that missed the migration is refused
+    connection = sqlite3.connect(db_path)
+    with pytest.raises(sqlite3.IntegrityError):
+        connection.execute(
+            "INSERT INTO entries (project_name, description, start_time, end_time) "
+            "VALUES ('alpha', '', '2021-03-01 08:00:00', '2021-03-01 09:00:00')"
+        )
+    connection.close()
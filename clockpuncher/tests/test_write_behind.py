@@ -0,0 +1,109 @@
+""" Tests for write_behind.py """
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from clockpuncher.tests.test_database import db  # pylint: disable=unused-import
+from clockpuncher.tests.utils import make_entries
+from clockpuncher.write_behind import WriteBehindQueue
+
+
+def test_submit_and_flush(db):
+    writer = WriteBehindQueue(db, batch_size=16).start()
+    entries = make_entries(100)
+    for entry in entries:
+        writer.submit(entry)
+
+    assert writer.flush(timeout=10)
+    status = writer.status
+    assert status.pending == 0
+    assert status.flushed == 100
+    assert status.last_error is None
+    assert str(status).startswith("All entries saved")
+
+    assert db.entries.count() == 100
+    assert all(entry.id is not None for entry in entries)
+    assert db.get_all_entries(True) == entries
+    assert writer.close(timeout=10)
+
+
+def test_close_flushes_pending(db):
+    writer = WriteBehindQueue(db)
+    for entry in make_entries(10):
+        writer.submit(entry)
+    assert writer.status.pending == 10
+    assert str(writer.status) == "Saving 10 entries..."
+
+    writer.start()
+    assert writer.close(timeout=10)
+    assert db.entries.count() == 10
+
+
+def test_submit_never_blocks(db):
+    writer = WriteBehindQueue(db, max_pending=4, batch_size=3)
+    entries = make_entries(10)
+    # Nothing drains the queue yet, a blocking put would hang on the fifth entry
+    for entry in entries:
+        writer.submit(entry)
+    assert writer.status.pending == 10
+
+    writer.start()
+    assert writer.flush(timeout=10)
+    # Spilled entries are written after the queued ones, in submission order
+    assert [entry.id for entry in entries] == list(range(1, 11))
+    assert db.get_all_entries(True) == entries
+    assert writer.close(timeout=10)
+
+
+def test_close_writes_spilled_entries(db):
+    writer = WriteBehindQueue(db, max_pending=2)
+    for entry in make_entries(5):
+        writer.submit(entry)
+    writer.start()
+    assert writer.close(timeout=10)
+    assert db.entries.count() == 5
+
+
+def test_failed_batch_is_retried(db):
+    writer = WriteBehindQueue(db, retry_interval=0.01)
+    locked = OperationalError("INSERT", {}, Exception("database is locked"))
+    entries = make_entries(3)
+    with patch.object(db, "add_entries", side_effect=[locked, [1, 2, 3]]) as add_entries:
+        for entry in entries:
+            writer.submit(entry)
+        writer.start()
+        assert writer.flush(timeout=10)
+        assert add_entries.call_count == 2
+    assert writer.status.last_error is None
+    assert [entry.id for entry in entries] == [1, 2, 3]
+    assert writer.close(timeout=10)
+
+
+def test_failed_batch_is_parked(db):
+    writer = WriteBehindQueue(db, batch_size=2, retry_interval=0.01, max_retries=2)
+    locked = OperationalError("INSERT", {}, Exception("database is locked"))
+    constraint = IntegrityError("INSERT", {}, Exception("NOT NULL constraint failed"))
+    entries = make_entries(6)
+    with patch.object(
+        db, "add_entries", side_effect=[constraint, locked, locked, locked, [5, 6]]
+    ) as add_entries:
+        for entry in entries:
+            writer.submit(entry)
+        writer.start()
+        assert writer.flush(timeout=10)
+        # The constraint error isn't retried, the lock is retried twice then given up on
+        assert add_entries.call_count == 5
+    status = writer.status
+    assert (status.pending, status.flushed, status.failed) == (0, 2, 4)
+    assert status.last_error is locked
+    assert str(status).startswith("Could not save 4 entries")
+    assert writer.failed_entries == entries[:4]
+    assert [entry.id for entry in entries[4:]] == [5, 6]
+    assert not writer.close(timeout=10)
+
+
+def test_submit_bad_data(db):
+    writer = WriteBehindQueue(db)
+    with pytest.raises(ValueError, match="Entry must be an Entry dataclass"):
+        writer.submit("a string")
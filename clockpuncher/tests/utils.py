@@ -1,4 +1,7 @@
 """ Contains utilities and constants for testing """
+import datetime
+from typing import List, Optional, Sequence
+
 from clockpuncher.models import Entry, Project
 from hypothesis.strategies import builds, datetimes, integers, none, text
 
@@ -16,5 +19,43 @@ ENTRY_HYPOTHESIS = {
     "start_time": datetimes(),
     "end_time": datetimes(),
 }
+# Times the epoch microsecond codec in timestamps.py round trips exactly
+EPOCH_DATETIMES = datetimes(
+    min_value=datetime.datetime(1971, 1, 1), max_value=datetime.datetime(2100, 1, 1)
+)
 project_build_strategy = builds(Project, **PROJECT_HYPOTHESIS)
 entry_build_strategy = builds(Entry, **ENTRY_HYPOTHESIS)
+epoch_entry_strategy = builds(
+    Entry, **{**ENTRY_HYPOTHESIS, "start_time": EPOCH_DATETIMES, "end_time": EPOCH_DATETIMES}
+)
+
+
+def make_entries(
+    count: int,
+    start: datetime.datetime = datetime.datetime(2021, 3, 1, 8),
+    step: datetime.timedelta = datetime.timedelta(hours=1),
+    duration: datetime.timedelta = datetime.timedelta(minutes=45),
+    project_names: Sequence[str] = ("alpha", "beta"),
+    description: str = "task",
+    first_id: Optional[int] = None,
+) -> List[Entry]:
+    """
+    count entries starting step apart, cycling through project_names
+    :param count: Number of entries
+    :param start: start_time of the first entry
+    :param step: Time between consecutive start_times
+    :param duration: Length of every entry
+    :param project_names: Project names, assigned round robin
+    :param description: Description prefix, suffixed with the entry's index
+    :param first_id: id of the first entry, counting up. None leaves ids unset
+    """
+    return [
+        Entry(
+            id=None if first_id is None else first_id + idx,
+            project_name=project_names[idx % len(project_names)],
+            description=f"{description} {idx}",
+            start_time=start + step * idx,
+            end_time=start + step * idx + duration,
+        )
+        for idx in range(count)
+    ]
@@ -0,0 +1,228 @@
+""" Contains an in-memory start_time index for filtering loaded entries without SQL """
+import bisect
+import calendar
+import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from clockpuncher.models import Entry
+
+
+def day_start(moment: datetime.datetime) -> datetime.datetime:
+    """
+    Midnight at the start of moment's day
+    """
+    return datetime.datetime.combine(moment.date(), datetime.time.min)
+
+
+def week_start(moment: datetime.datetime) -> datetime.datetime:
+    """
+    Midnight on the Monday of moment's ISO week
+    """
+    return day_start(moment) - datetime.timedelta(days=moment.weekday())
+
+
+def month_start(moment: datetime.datetime) -> datetime.datetime:
+    """
+    Midnight on the first of moment's month
+    """
+    return datetime.datetime(moment.year, moment.month, 1)
+
+
+def next_month_start(moment: datetime.datetime) -> datetime.datetime:
+    """
+    Midnight on the first of the month after moment's month
+    """
+    if moment.month == 12:
+        return datetime.datetime(moment.year + 1, 1, 1)
+    return datetime.datetime(moment.year, moment.month + 1, 1)
+
+
+def pay_period_bounds(
+    moment: datetime.datetime, monthly_frequency: int = 2
+) -> Tuple[datetime.datetime, datetime.datetime]:
+    """
+    Splits moment's month into monthly_frequency periods of whole days and returns the one
+    containing moment. With the default of 2 periods run from the 1st and the 16th.
+    :param moment: Any time inside the wanted period
+    :param monthly_frequency: Pay periods per month, Project.monthly_frequency
+    :return: Half-open (start, end) datetimes
+    """
+    if monthly_frequency < 1:
+        raise ValueError(f"monthly_frequency must be at least 1, not {monthly_frequency}")
+    days_in_month = calendar.monthrange(moment.year, moment.month)[1]
+    periods = min(monthly_frequency, days_in_month)
+    first_days = [1 + period * days_in_month // periods for period in range(periods)]
+    period = bisect.bisect_right(first_days, moment.day) - 1
+    start = month_start(moment).replace(day=first_days[period])
+    if period + 1 < periods:
+        end = start.replace(day=first_days[period + 1])
+    else:
+        end = next_month_start(moment)
+    return start, end
+
+
+class TimeIndex:
+    """
+    Entries kept sorted by start_time with a parallel list of start times for bisect.
+
+    Range filters are half-open on start_time, the same as Database.get_entries_between, and
+    cost two binary searches plus the slice. Offsets of day, ISO week and month boundaries
+    are precomputed on build and kept up to date by add. Each entry also gets a sequence
+    number in the order it was indexed, page cursors break start_time ties with it since
+    entries still in the write-behind queue have no id.
+    """
+
+    def __init__(self, entries: Iterable[Entry] = ()):
+        """
+        :param entries: Entries to index, in any order
+        """
+        self.entries: List[Entry] = sorted(entries, key=lambda entry: entry.start_time)
+        self.starts: List[datetime.datetime] = [
+            entry.start_time for entry in self.entries
+        ]
+        # Ascending within every run of equal start times, add puts new entries last
+        self.sequence: List[int] = list(range(len(self.entries)))
+        self.next_sequence = len(self.entries)
+        self.boundary_offsets: Dict[datetime.datetime, int] = dict()
+        self._index_boundaries()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _index_boundaries(self) -> None:
+        """
+        One pass over the start times recording where each day, week and month begins
+        """
+        self.boundary_offsets.clear()
+        prior_day = None
+        for position, start in enumerate(self.starts):
+            current_day = day_start(start)
+            if current_day == prior_day:
+                continue
+            prior_day = current_day
+            for boundary in (current_day, week_start(start), month_start(start)):
+                self.boundary_offsets.setdefault(boundary, position)
+
+    def offset(self, moment: Optional[datetime.datetime]) -> int:
+        """
+        Position of the first entry starting at or after moment
+        :param moment: Boundary, None means the end of the index
+        :return: bisect_left position, cached for day/week/month boundaries
+        """
+        if moment is None:
+            return len(self.starts)
+        position = self.boundary_offsets.get(moment)
+        if position is None:
+            position = bisect.bisect_left(self.starts, moment)
+        return position
+
+    def add(self, entry: Entry) -> None:
+        """
+        Inserts entry in start_time order, an append when it is the newest entry
+        :param entry: Entry to add, e.g. one just saved from the timer
+        """
+        start = entry.start_time
+        position = bisect.bisect_right(self.starts, start)
+        self.sequence.insert(position, self.next_sequence)
+        self.next_sequence += 1
+        self.starts.insert(position, start)
+        self.entries.insert(position, entry)
+
+        for boundary, boundary_offset in self.boundary_offsets.items():
+            if boundary > start:
+                self.boundary_offsets[boundary] = boundary_offset + 1
+        for boundary in (day_start(start), week_start(start), month_start(start)):
+            if boundary not in self.boundary_offsets:
+                self.boundary_offsets[boundary] = bisect.bisect_left(
+                    self.starts, boundary
+                )
+
+    def remove(self, entry_id: int, start_time: datetime.datetime) -> Optional[Entry]:
+        """
+        Takes a saved entry out of the index, e.g. one another process edited or deleted
+        :param entry_id: id of the entry
+        :param start_time: Its start_time, the entry is found with a binary search
+        :return: The removed Entry, None if no indexed entry matched
+        """
+        lower = bisect.bisect_left(self.starts, start_time)
+        upper = bisect.bisect_right(self.starts, start_time, lower)
+        for position in range(lower, upper):
+            if self.entries[position].id == entry_id:
+                break
+        else:
+            return None
+        del self.starts[position]
+        del self.sequence[position]
+        for boundary, boundary_offset in self.boundary_offsets.items():
+            if boundary > start_time:
+                self.boundary_offsets[boundary] = boundary_offset - 1
+        return self.entries.pop(position)
+
+    def between(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        project: Optional[str] = None,
+    ) -> List[Entry]:
+        """
+        Entries with start <= start_time < end, oldest first
+        :param start: Inclusive lower bound, None for no lower bound
+        :param end: Exclusive upper bound, None for no upper bound
+        :param project: Only keep entries for this project name
+        :return: List slice of the index
+        """
+        lower = 0 if start is None else self.offset(start)
+        selected = self.entries[lower : self.offset(end)]
+        if project is not None:
+            selected = [entry for entry in selected if entry.project_name == project]
+        return selected
+
+    def count(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+    ) -> int:
+        """
+        Number of entries with start <= start_time < end, without copying them
+        :param start: Inclusive lower bound, None for no lower bound
+        :param end: Exclusive upper bound, None for no upper bound
+        """
+        lower = 0 if start is None else self.offset(start)
+        return max(0, self.offset(end) - lower)
+
+    def cursor(self, entry: Entry) -> Tuple[datetime.datetime, int]:
+        """
+        Page cursor of an indexed entry, e.g. the last one on a page
+        :param entry: Entry object in the index
+        :return: (start_time, sequence number)
+        """
+        lower = bisect.bisect_left(self.starts, entry.start_time)
+        upper = bisect.bisect_right(self.starts, entry.start_time, lower)
+        for position in range(lower, upper):
+            if self.entries[position] is entry:
+                return entry.start_time, self.sequence[position]
+        raise ValueError(f"{entry} is not in the index")
+
+    def page(
+        self,
+        limit: int,
+        before: Optional[Tuple[datetime.datetime, int]] = None,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+    ) -> List[Entry]:
+        """
+        Newest first page, like Database.get_entries_page but with cursors from cursor
+        :param limit: Max entries returned
+        :param before: cursor of the last entry on the previous page
+        :param start: Inclusive lower bound on start_time
+        :param end: Exclusive upper bound on start_time
+        :return: Up to limit entries, newest first
+        """
+        lower = 0 if start is None else self.offset(start)
+        upper = self.offset(end)
+        if before is not None:
+            before_start, before_sequence = before
+            tie_start = bisect.bisect_left(self.starts, before_start, lower, upper)
+            tie_end = bisect.bisect_right(self.starts, before_start, tie_start, upper)
+            upper = bisect.bisect_left(self.sequence, before_sequence, tie_start, tie_end)
+        return self.entries[max(lower, upper - limit) : upper][::-1]
@@ -0,0 +1,234 @@
+""" Contains a background writer so GUI callbacks never wait on database inserts """
+import datetime
+import queue
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy.exc import OperationalError
+
+from clockpuncher.database import Database
+from clockpuncher.models import Entry
+
+_STOP = object()
+# Errors another connection's lock causes, worth retrying. Anything else won't clear up.
+TRANSIENT_ERRORS = ("database is locked", "database is busy")
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether a failed write may succeed if retried later
+    """
+    return isinstance(error, OperationalError) and any(
+        message in str(error) for message in TRANSIENT_ERRORS
+    )
+
+
+class WriteBehindStatus(NamedTuple):
+    """
+    Snapshot of the writer state for display
+    """
+
+    pending: int
+    flushed: int
+    failed: int
+    last_flush: Optional[datetime.datetime]
+    last_error: Optional[Exception]
+
+    def __str__(self) -> str:
+        if self.failed:
+            return f"Could not save {self.failed} entries: {self.last_error}"
+        if self.last_error is not None:
+            return f"Save failed, retrying {self.pending} entries: {self.last_error}"
+        if self.pending:
+            return f"Saving {self.pending} entries..."
+        if self.last_flush is None:
+            return ""
+        return f"All entries saved {self.last_flush.strftime('%H:%M:%S')}"
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue drained by a writer thread that group commits entries with add_entries.
+
+    submit never blocks, entries past max_pending spill into an unbounded overflow list that
+    is written once the queue drains. Once written, each Entry has its id set in place so
+    objects already handed to the GUI pick up their database id.
+    Batches failing on another connection's lock are retried up to max_retries times.
+    Batches that can't be written are parked in failed_entries, with the error in
+    status.last_error, and the writer moves on to the entries queued after them.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        max_pending: int = 1024,
+        batch_size: int = 256,
+        retry_interval: float = 1.0,
+        max_retries: int = 30,
+    ):
+        """
+        :param db: Database to write to, the writer thread gets its own connection
+        :param max_pending: Queue bound, further entries wait in the overflow list
+        :param batch_size: Max entries written per transaction
+        :param retry_interval: Seconds to wait before retrying a batch that hit a lock
+        :param max_retries: Retries before a batch that keeps hitting a lock is parked
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.max_retries = max_retries
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        # Submitted after everything in _queue, e.g. while a locked database stalls the writer
+        self._overflow: List = list()
+        self._condition = threading.Condition()
+        self._submitted = 0
+        self._flushed = 0
+        self._failed: List[Entry] = list()
+        self._last_flush: Optional[datetime.datetime] = None
+        self._last_error: Optional[Exception] = None
+        self._thread = threading.Thread(
+            target=self._run, name="clockpuncher-writer", daemon=True
+        )
+
+    def start(self) -> "WriteBehindQueue":
+        """
+        Starts the writer thread
+        :return: self for chaining
+        """
+        self._thread.start()
+        return self
+
+    def submit(self, entry: Entry) -> None:
+        """
+        Queues entry to be written
+        :param entry: Entry to insert, its id is filled in once committed
+        """
+        if not isinstance(entry, Entry):
+            raise ValueError(f"Entry must be an Entry dataclass, not {type(entry)}")
+        with self._condition:
+            self._submitted += 1
+        self._put(entry)
+
+    def _put(self, item) -> None:
+        """
+        Queues item without blocking, it goes to the overflow list if the queue is full or
+        entries are already waiting there, so items stay in submission order
+        """
+        with self._condition:
+            if not self._overflow:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    pass
+            self._overflow.append(item)
+
+    @property
+    def status(self) -> WriteBehindStatus:
+        """
+        Current pending, flushed and failed counts, last flush time and last error
+        """
+        with self._condition:
+            return WriteBehindStatus(
+                pending=self._submitted - self._flushed - len(self._failed),
+                flushed=self._flushed,
+                failed=len(self._failed),
+                last_flush=self._last_flush,
+                last_error=self._last_error,
+            )
+
+    @property
+    def failed_entries(self) -> List[Entry]:
+        """
+        Entries given up on, in submission order
+        """
+        with self._condition:
+            return list(self._failed)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until everything submitted so far is committed or parked as failed
+        :param timeout: Max seconds to wait, None waits forever
+        :return: True if every entry was handled, False on timeout. See status.failed
+        """
+        with self._condition:
+            target = self._submitted
+            return self._condition.wait_for(
+                lambda: self._flushed + len(self._failed) >= target, timeout=timeout
+            )
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Flushes pending entries and stops the writer thread. Call on shutdown.
+        :param timeout: Max seconds to wait for the final flush
+        :return: True if every submitted entry was written
+        """
+        if self._thread.is_alive():
+            self._put(_STOP)
+            self._thread.join(timeout)
+        status = self.status
+        return status.pending == 0 and status.failed == 0
+
+    def _next_batch(self) -> List:
+        """
+        Takes up to batch_size items, the queue first and then the overflow list, which only
+        holds items submitted after everything queued. Blocks while both are empty.
+        """
+        batch = list()
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        with self._condition:
+            spilled = self._overflow[: self.batch_size - len(batch)]
+            del self._overflow[: len(spilled)]
+        batch.extend(spilled)
+        if not batch:
+            batch.append(self._queue.get())
+        return batch
+
+    def _write(self, batch: List[Entry]) -> None:
+        """
+        Writes batch in one transaction, retrying while it is locked out.
+        Parks the batch in failed_entries if it can't be written.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                inserted_ids = self.db.add_entries(
+                    batch, batch_size=len(batch), return_ids=True
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                with self._condition:
+                    self._last_error = error
+                    if not is_transient(error) or attempt == self.max_retries:
+                        self._failed.extend(batch)
+                        self._condition.notify_all()
+                        return
+                time.sleep(self.retry_interval)
+                continue
+
+            for entry, inserted_id in zip(batch, inserted_ids):
+                entry.id = inserted_id
+            with self._condition:
+                self._flushed += len(batch)
+                self._last_flush = datetime.datetime.now()
+                # Keep the error explaining parked entries on display
+                if not self._failed:
+                    self._last_error = None
+                self._condition.notify_all()
+            return
+
+    def _run(self) -> None:
+        """
+        Writer thread loop, exits after writing everything submitted before close
+        """
+        stopping = False
+        while not stopping:
+            batch = self._next_batch()
+            if _STOP in batch:
+                stopping = True
+                batch = batch[: batch.index(_STOP)]
+            for start in range(0, len(batch), self.batch_size):
+                self._write(batch[start : start + self.batch_size])